@@ -0,0 +1,151 @@
+# ============================================
+# 📁 apps/housing/affinity.py
+# ============================================
+"""
+Profil d'affinité utilisateur pour l'algorithme génétique.
+
+Regroupe en mémoire tout ce que GeneticAlgorithm.calculate_fitness lisait
+en base logement par logement :
+
+  - interactions : housing_id → (viewed, liked, saved)
+  - category_counts : nombre d'interactions par catégorie
+  - budget et position préférés (champs de l'utilisateur)
+
+Le profil est chargé en une requête, conservé dans le cache Django et
+mis à jour incrémentalement par les signaux de UserInteraction
+(voir signals.py) ; AFFINITY_PROFILE_TTL borne la dérive éventuelle
+(changement de catégorie d'un logement, écriture par queryset.update()).
+"""
+
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import UserInteraction
+
+
+CACHE_KEY = 'housing:affinity:{user_id}'
+
+
+def _cache_key(user_id) -> str:
+    return CACHE_KEY.format(user_id=user_id)
+
+
+def _ttl() -> int:
+    return getattr(settings, 'AFFINITY_PROFILE_TTL', 3600)
+
+
+class AffinityProfile:
+    """Interactions et affinités d'un utilisateur, indexées pour le scoring"""
+
+    def __init__(self, user_id, interactions=None, category_counts=None,
+                 interaction_categories=None):
+        self.user_id = user_id
+        self.interactions: Dict[int, Tuple[bool, bool, bool]] = interactions or {}
+        self.category_counts: Dict[int, int] = category_counts or {}
+        # housing_id → catégorie au moment de l'interaction (pour les suppressions)
+        self.interaction_categories: Dict[int, Optional[int]] = interaction_categories or {}
+        # Renseignés depuis l'utilisateur à chaque lecture (pas de requête)
+        self.preferred_max_price = None
+        self.preferred_lat = None
+        self.preferred_lng = None
+
+    @classmethod
+    def load(cls, user) -> 'AffinityProfile':
+        """Construit le profil en une seule requête"""
+        profile = cls(user.pk)
+        rows = UserInteraction.objects.filter(user_id=user.pk).order_by().values_list(
+            'housing_id', 'housing__category_id', 'viewed', 'liked', 'saved'
+        )
+        for housing_id, category_id, viewed, liked, saved in rows:
+            profile._add(housing_id, category_id, viewed, liked, saved)
+        return profile
+
+    def _add(self, housing_id, category_id, viewed, liked, saved):
+        if housing_id not in self.interactions:
+            self.category_counts[category_id] = self.category_counts.get(category_id, 0) + 1
+            self.interaction_categories[housing_id] = category_id
+        self.interactions[housing_id] = (viewed, liked, saved)
+
+    def attach_user(self, user) -> 'AffinityProfile':
+        """Copie le budget et la position préférés de l'utilisateur"""
+        self.preferred_max_price = getattr(user, 'preferred_max_price', None)
+        self.preferred_lat = getattr(user, 'preferred_location_lat', None)
+        self.preferred_lng = getattr(user, 'preferred_location_lng', None)
+        return self
+
+    # ------------------------------------------------------------------
+    # Mises à jour incrémentales
+    # ------------------------------------------------------------------
+
+    def record(self, interaction: UserInteraction):
+        """Ajoute ou met à jour une interaction (appelé par post_save)"""
+        self._add(
+            interaction.housing_id, interaction.housing.category_id,
+            interaction.viewed, interaction.liked, interaction.saved,
+        )
+
+    def forget(self, housing_id: int):
+        """Retire une interaction (appelé par post_delete)"""
+        if self.interactions.pop(housing_id, None) is None:
+            return
+        category_id = self.interaction_categories.pop(housing_id, None)
+        remaining = self.category_counts.get(category_id, 0) - 1
+        if remaining > 0:
+            self.category_counts[category_id] = remaining
+        else:
+            self.category_counts.pop(category_id, None)
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def preference_score(self, housing) -> float:
+        """
+        Critère « préférence utilisateur » de calculate_fitness :
+        interaction directe avec le logement, sinon affinité de catégorie.
+        """
+        flags = self.interactions.get(housing.id)
+        if flags is not None:
+            viewed, liked, saved = flags
+            score = 0.3  # Base
+            if viewed:
+                score += 0.2
+            if liked:
+                score += 0.3
+            if saved:
+                score += 0.2
+            return min(1.0, score)
+        return min(0.7, self.category_counts.get(housing.category_id, 0) * 0.1)
+
+
+def get_affinity_profile(user) -> AffinityProfile:
+    """Profil courant de l'utilisateur (depuis le cache, chargé si absent)"""
+    key = _cache_key(user.pk)
+    profile: Optional[AffinityProfile] = cache.get(key)
+    if profile is None:
+        profile = AffinityProfile.load(user)
+        cache.set(key, profile, _ttl())
+    return profile.attach_user(user)
+
+
+def record_interaction(interaction: UserInteraction):
+    """Répercute une interaction écrite sur le profil en cache (s'il existe)"""
+    key = _cache_key(interaction.user_id)
+    profile: Optional[AffinityProfile] = cache.get(key)
+    if profile is not None:
+        profile.record(interaction)
+        cache.set(key, profile, _ttl())
+
+
+def forget_interaction(user_id, housing_id):
+    key = _cache_key(user_id)
+    profile: Optional[AffinityProfile] = cache.get(key)
+    if profile is not None:
+        profile.forget(housing_id)
+        cache.set(key, profile, _ttl())
+
+
+def invalidate_affinity_profile(user_id):
+    cache.delete(_cache_key(user_id))
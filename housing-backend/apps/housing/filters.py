@@ -4,6 +4,7 @@
 # ============================================
  
 import django_filters
+from rest_framework import filters
 from .models import Housing
  
 class HousingFilter(django_filters.FilterSet):
@@ -36,4 +37,19 @@ class HousingFilter(django_filters.FilterSet):
             'latitude':     ['gte', 'lte'],
             'longitude':    ['gte', 'lte'],
         }
- 
\ No newline at end of file
+ 
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    Paramètre ?search= servi par l'index plein texte (apps.recherche.fulltext).
+    Retombe sur le SearchFilter classique (icontains sur search_fields)
+    si aucun moteur plein texte n'est disponible pour la base.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        from apps.recherche import fulltext
+
+        query = request.query_params.get(self.search_param, '')
+        if not query.strip() or fulltext.get_backend() is None:
+            return super().filter_queryset(request, queryset, view)
+        return fulltext.filter_queryset(queryset, query)
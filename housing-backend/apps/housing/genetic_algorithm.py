@@ -3,10 +3,12 @@
 # GENETIC_ALGORITHM.PY - Algorithme Génétique
 # ============================================
 
-import math
 import random
 from django.utils import timezone
-from .models import Housing, UserInteraction
+from .models import Housing
+from .affinity import get_affinity_profile
+from apps.recherche.geo import haversine
+from apps.recherche.ranking import topk_mmr
 
 
 class GeneticAlgorithm:
@@ -15,12 +17,21 @@ class GeneticAlgorithm:
     selon les préférences et comportements utilisateur
     """
     
-    def __init__(self, user, housings, generations=3, elite_size=0.3, mutation_rate=0.1):
+    def __init__(self, user, housings, generations=3, elite_size=0.3, mutation_rate=0.1, profile=None):
         self.user = user
+        # Profil d'affinité (une requête ou le cache) : plus de requête par logement
+        self.profile = profile or get_affinity_profile(user)
         self.housings = list(housings)
         self.generations = generations
         self.elite_size = int(len(housings) * elite_size)
         self.mutation_rate = mutation_rate
+        # Engagement maximal du lot, calculé une fois (normalisation popularité)
+        self.max_engagement = max(
+            (h.views_count + (h.likes_count * 2) for h in self.housings),
+            default=0
+        ) or 1
+        # Fitness déjà calculées (identiques d'une génération à l'autre)
+        self._fitness = {}
     
     def calculate_fitness(self, housing):
         """
@@ -33,24 +44,25 @@ class GeneticAlgorithm:
         - 15% : Préférences utilisateur (historique)
         - 10% : Récence (nouveaux logements)
         """
+        if housing.id in self._fitness:
+            return self._fitness[housing.id]
         
         # 1. Adéquation prix (30%)
-        if hasattr(self.user, 'preferred_max_price') and self.user.preferred_max_price:
-            if housing.price <= self.user.preferred_max_price:
+        max_price = self.profile.preferred_max_price
+        if max_price:
+            if housing.price <= max_price:
                 price_score = 1.0
             else:
-                diff_ratio = (housing.price - self.user.preferred_max_price) / self.user.preferred_max_price
+                diff_ratio = (housing.price - max_price) / max_price
                 price_score = max(0, 1 - diff_ratio)
         else:
             price_score = 0.5
         
         # 2. Proximité (25%)
-        if (hasattr(self.user, 'preferred_location_lat') and 
-            self.user.preferred_location_lat and 
-            housing.latitude):
+        if self.profile.preferred_lat and housing.latitude:
             distance = self.haversine_distance(
-                self.user.preferred_location_lat,
-                self.user.preferred_location_lng,
+                self.profile.preferred_lat,
+                self.profile.preferred_lng,
                 housing.latitude,
                 housing.longitude
             )
@@ -61,34 +73,11 @@ class GeneticAlgorithm:
         
         # 3. Popularité (20%)
         # Normalisation basée sur les vues et likes
-        max_engagement = max(
-            h.views_count + (h.likes_count * 2) 
-            for h in self.housings
-        ) or 1
         engagement = housing.views_count + (housing.likes_count * 2)
-        popularity_score = min(1.0, engagement / max_engagement)
+        popularity_score = min(1.0, engagement / self.max_engagement)
         
         # 4. Préférence utilisateur (15%)
-        try:
-            interaction = UserInteraction.objects.get(
-                user=self.user,
-                housing=housing
-            )
-            preference_score = 0.3  # Base
-            if interaction.viewed:
-                preference_score += 0.2
-            if interaction.liked:
-                preference_score += 0.3
-            if interaction.saved:
-                preference_score += 0.2
-            preference_score = min(1.0, preference_score)
-        except UserInteraction.DoesNotExist:
-            # Vérifier si l'utilisateur aime cette catégorie
-            same_category_interactions = UserInteraction.objects.filter(
-                user=self.user,
-                housing__category=housing.category
-            ).count()
-            preference_score = min(0.7, same_category_interactions * 0.1)
+        preference_score = self.profile.preference_score(housing)
         
         # 5. Récence (10%)
         days = housing.days_since_published
@@ -103,25 +92,13 @@ class GeneticAlgorithm:
             0.10 * recency_score
         )
         
+        self._fitness[housing.id] = fitness
         return fitness
     
     @staticmethod
     def haversine_distance(lat1, lon1, lat2, lon2):
         """Calcule la distance en km entre deux points GPS"""
-        R = 6371  # Rayon de la Terre en km
-        
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        delta_lat = math.radians(lat2 - lat1)
-        delta_lon = math.radians(lon2 - lon1)
-        
-        a = (math.sin(delta_lat / 2) ** 2 +
-             math.cos(lat1_rad) * math.cos(lat2_rad) *
-             math.sin(delta_lon / 2) ** 2)
-        
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        
-        return R * c
+        return haversine(lat1, lon1, lat2, lon2)
     
     def select_elites(self, scored_population):
         """Sélectionne les meilleurs logements (élites)"""
@@ -195,3 +172,16 @@ def apply_genetic_algorithm(user, housings_queryset):
     
     ga = GeneticAlgorithm(user, housings_queryset)
     return ga.run()
+
+
+def apply_topk_mmr(user, housings_queryset, k=None):
+    """
+    Alternative déterministe à apply_genetic_algorithm : chaque logement
+    est noté une fois avec la même fitness, puis les k meilleurs sont
+    diversifiés (catégorie, quartier, tranche de prix).
+
+    Usage:
+        ranked_housings = apply_topk_mmr(user, housings, k=20)
+    """
+    ga = GeneticAlgorithm(user, housings_queryset)
+    return topk_mmr(ga.housings, ga.calculate_fitness, k=k)
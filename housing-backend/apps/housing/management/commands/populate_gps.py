@@ -6,8 +6,9 @@
 # ============================================================
 
 from django.core.management.base import BaseCommand
-from django.db.models import Q
+from django.db.models import Avg, Q
 from apps.housing.models import Housing
+from apps.recherche.location_lexicon import location_key
 import random
 
 # Coordonnées GPS par quartier (centre approximatif)
@@ -95,6 +96,10 @@ CITY_COORDS = {
     'Sangmelima': (2.9456, 11.9814),
 }
 
+# Recherche tolérante aux accents / tirets : "Biyem Assi" == "Biyem-Assi"
+DISTRICT_COORDS_BY_KEY = {location_key(name): coords for name, coords in DISTRICT_COORDS.items()}
+CITY_COORDS_BY_KEY = {location_key(name): coords for name, coords in CITY_COORDS.items()}
+
 
 class Command(BaseCommand):
     help = 'Peuple les coordonnées GPS des logements sans coordonnées'
@@ -143,6 +148,14 @@ class Command(BaseCommand):
 
         self.stdout.write(f'\n📍 {total} logements à traiter...\n')
 
+        # Quartiers absents de DISTRICT_COORDS : centre des logements déjà géolocalisés
+        district_centroids = {
+            row['district_id']: (row['lat'], row['lng'])
+            for row in Housing.objects.filter(
+                district__isnull=False, latitude__isnull=False, longitude__isnull=False
+            ).values('district_id').annotate(lat=Avg('latitude'), lng=Avg('longitude'))
+        }
+
         for housing in qs:
             base_lat, base_lng = None, None
             source = ''
@@ -150,16 +163,20 @@ class Command(BaseCommand):
             # ── 1. Chercher par quartier ──────────────────────────
             if housing.district:
                 district_name = housing.district.name
-                if district_name in DISTRICT_COORDS:
-                    base_lat, base_lng = DISTRICT_COORDS[district_name]
+                coords = DISTRICT_COORDS_BY_KEY.get(location_key(district_name))
+                if coords is None:
+                    coords = district_centroids.get(housing.district_id)
+                if coords is not None:
+                    base_lat, base_lng = float(coords[0]), float(coords[1])
                     source = f'quartier "{district_name}"'
                     by_district += 1
 
             # ── 2. Fallback par ville ─────────────────────────────
             if base_lat is None and housing.city:
                 city_name = housing.city.name
-                if city_name in CITY_COORDS:
-                    base_lat, base_lng = CITY_COORDS[city_name]
+                coords = CITY_COORDS_BY_KEY.get(location_key(city_name))
+                if coords is not None:
+                    base_lat, base_lng = coords
                     source = f'ville "{city_name}"'
                     by_city += 1
 
@@ -0,0 +1,12 @@
+# ============================================
+# 📁 apps/housing/pagination.py
+# ============================================
+
+from rest_framework.pagination import PageNumberPagination
+
+
+class NearbyPagination(PageNumberPagination):
+    """Pagination de /api/housings/nearby/ (la carte peut demander de grandes pages)"""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 500
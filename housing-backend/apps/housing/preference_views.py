@@ -183,16 +183,30 @@ class UserPreferenceView(APIView):
 
 class RecommendedHousingsView(APIView):
     """
-    GET /api/housings/recommended/
-    Retourne exactement 3 logements uniques via algo génétique.
+    GET /api/housings/recommended/?ranking_mode=genetic|topk_mmr
+    Retourne exactement 3 logements uniques.
+
+    - préférences du quiz (UserPreference) : compute_fitness ;
+    - connecté sans préférences : profil d'affinité (interactions,
+      catégories aimées, budget et position, voir affinity.py) via
+      genetic_algorithm.GeneticAlgorithm ;
+    - anonyme : popularité.
+
+    ranking_mode=topk_mmr remplace le tirage génétique par un classement
+    déterministe (top-k diversifié, apps.recherche.ranking.topk_mmr).
+    Nombre de requêtes constant, quelle que soit la taille du catalogue.
     """
     permission_classes = [AllowAny]
 
     def get(self, request):
-        from .models      import Housing
+        from .models      import Housing, Favorite, SavedHousing
         from .serializers import HousingListSerializer
+        from .genetic_algorithm import GeneticAlgorithm, apply_topk_mmr
+        from apps.recherche.ranking import topk_mmr
 
         MAX = 3  # limite absolue
+        ranking_mode = request.query_params.get('ranking_mode', 'genetic')
+        user = request.user if request.user and request.user.is_authenticated else None
 
         try:
             qs = Housing.objects.filter(
@@ -203,9 +217,9 @@ class RecommendedHousingsView(APIView):
 
             # Récupérer les préférences si connecté
             preferences = {}
-            if request.user and request.user.is_authenticated:
+            if user is not None:
                 try:
-                    p = request.user.preference
+                    p = user.preference
                     preferences = {
                         'city':          p.city or '',
                         'category':      p.category or '',
@@ -222,7 +236,22 @@ class RecommendedHousingsView(APIView):
             candidates = list(qs[:100])
 
             if preferences:
-                recommended = genetic_recommend(candidates, preferences, n=MAX)
+                if ranking_mode == 'topk_mmr':
+                    recommended = topk_mmr(candidates, lambda h: compute_fitness(h, preferences), k=MAX)
+                else:
+                    recommended = genetic_recommend(candidates, preferences, n=MAX)
+            elif user is not None and candidates:
+                # Profil d'affinité en cache : aucune requête par logement
+                if ranking_mode == 'topk_mmr':
+                    recommended = apply_topk_mmr(user, candidates, k=MAX)
+                else:
+                    recommended = GeneticAlgorithm(user, candidates).run()
+                seen, unique = set(), []
+                for h in recommended:
+                    if h.id not in seen:
+                        seen.add(h.id)
+                        unique.append(h)
+                recommended = unique[:MAX]
             else:
                 # Anonyme : tri par popularité + déduplication
                 sorted_c = sorted(
@@ -238,9 +267,15 @@ class RecommendedHousingsView(APIView):
                     if len(recommended) >= MAX:
                         break
 
-            serializer = HousingListSerializer(
-                recommended, many=True, context={'request': request}
-            )
+            context = {'request': request}
+            if user is not None:
+                context['liked_ids'] = set(
+                    Favorite.objects.filter(user=user).values_list('housing_id', flat=True)
+                )
+                context['saved_ids'] = set(
+                    SavedHousing.objects.filter(user=user).values_list('housing_id', flat=True)
+                )
+            serializer = HousingListSerializer(recommended, many=True, context=context)
             return Response(serializer.data)
 
         except Exception as e:
@@ -70,9 +70,15 @@ class HousingListSerializer(serializers.ModelSerializer):
     
     def get_main_image(self, obj):
         request = self.context.get('request')
-        main_img = obj.images.filter(is_main=True).first()
-        if not main_img:
-            main_img = obj.images.first()
+        prefetched = getattr(obj, '_prefetched_objects_cache', {}).get('images')
+        if prefetched is not None:
+            # Images déjà chargées par prefetch_related (triées -is_main)
+            images = list(prefetched)
+            main_img = next((img for img in images if img.is_main), images[0] if images else None)
+        else:
+            main_img = obj.images.filter(is_main=True).first()
+            if not main_img:
+                main_img = obj.images.first()
         
         if main_img and main_img.image:
             if request:
@@ -81,12 +87,17 @@ class HousingListSerializer(serializers.ModelSerializer):
         return None
     
     def get_is_liked(self, obj):
+        # Ensemble d'ids préchargé par la vue (une requête pour toute la liste)
+        if 'liked_ids' in self.context:
+            return obj.id in self.context['liked_ids']
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return Favorite.objects.filter(user=request.user, housing=obj).exists()
         return False
     
     def get_is_saved(self, obj):
+        if 'saved_ids' in self.context:
+            return obj.id in self.context['saved_ids']
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return SavedHousing.objects.filter(user=request.user, housing=obj).exists()
@@ -0,0 +1,25 @@
+# ============================================
+# 📁 apps/housing/signals.py
+# ============================================
+"""
+Signaux qui tiennent à jour les profils d'affinité en cache
+(voir affinity.py) quand une interaction est écrite ou supprimée.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .affinity import record_interaction, forget_interaction
+from .models import UserInteraction
+
+
+@receiver(post_save, sender=UserInteraction)
+def interaction_saved(sender, instance, **kwargs):
+    transaction.on_commit(lambda: record_interaction(instance))
+
+
+@receiver(post_delete, sender=UserInteraction)
+def interaction_deleted(sender, instance, **kwargs):
+    user_id, housing_id = instance.user_id, instance.housing_id
+    transaction.on_commit(lambda: forget_interaction(user_id, housing_id))
@@ -7,7 +7,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Avg, Count, Sum, Min, Max
+from django.db.models import Q, Avg, Count, Sum
 from .models import (
     Category, HousingType, Housing, HousingImage,
     Favorite, SavedHousing, UserInteraction, Comment, Testimonial
@@ -19,10 +19,11 @@ from .serializers import (
     TestimonialSerializer
 )
 from .permissions import IsOwnerOrReadOnly
-from .filters import HousingFilter
-import traceback
+from .filters import HousingFilter, FullTextSearchFilter
 
-import math as math_module  # uniquement si math n'est pas déjà importé en haut
+from apps.recherche.facets import facet_engine
+from apps.recherche.spatial_index import spatial_index
+from .pagination import NearbyPagination
 
 
 
@@ -60,7 +61,7 @@ class HousingViewSet(viewsets.ModelViewSet):
         'owner', 'category', 'housing_type', 'region', 'city', 'district'
     ).prefetch_related('images')
 
-    filter_backends  = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends  = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
     filterset_class  = HousingFilter   # ← AJOUTER CETTE SEULE LIGNE
     search_fields    = ['title', 'description', 'city__name', 'district__name']
     ordering_fields  = ['price', 'created_at', 'views_count', 'likes_count', 'area', 'rooms']
@@ -81,7 +82,7 @@ class HousingViewSet(viewsets.ModelViewSet):
     # ----------------------------
     def get_permissions(self):
         # Actions publiques (lecture seule)
-        if self.action in ['list', 'retrieve', 'search_advanced', 'recommended', 'nearby', 'stats_map']:
+        if self.action in ['list', 'retrieve', 'search_advanced', 'nearby', 'stats_map']:
             return [AllowAny()]
         
         # Actions publiques mais qui peuvent enregistrer des stats
@@ -150,16 +151,27 @@ class HousingViewSet(viewsets.ModelViewSet):
     # ----------------------------
     @action(detail=False, methods=['get'])
     def search_advanced(self, request):
+        """
+        GET /api/housings/search_advanced/?…filtres de la liste…
+
+        Liste paginée + `stats` : total, prix moyen / min / max, décompte
+        par catégorie et, sous `facets`, toutes les facettes
+        (apps.recherche.facets : une passe, en cache par filtres).
+        """
         queryset = self.filter_queryset(self.get_queryset())
         sort_by = request.query_params.get('sortBy', 'recent')
         queryset = self.apply_sorting(queryset, sort_by)
 
+        facets = facet_engine.compute(queryset, self._facet_filters(request))
         stats = {
-            'total': queryset.count(),
-            'avg_price': queryset.aggregate(Avg('price'))['price__avg'] or 0,
-            'min_price': queryset.aggregate(Min('price'))['price__min'] or 0,
-            'max_price': queryset.aggregate(Max('price'))['price__max'] or 0,
-            'categories': queryset.values('category__name').annotate(count=Count('id')),
+            'total': facets['total'],
+            'avg_price': facets['price']['avg'] or 0,
+            'min_price': facets['price']['min'] or 0,
+            'max_price': facets['price']['max'] or 0,
+            'categories': [
+                {'category__name': c['name'], 'count': c['count']} for c in facets['categories']
+            ],
+            'facets': facets,
         }
 
         page = self.paginate_queryset(queryset)
@@ -171,41 +183,22 @@ class HousingViewSet(viewsets.ModelViewSet):
 
         serializer = self.get_serializer(queryset, many=True)
         return Response({
-            'count': queryset.count(),
+            'count': facets['total'],
             'stats': stats,
             'results': serializer.data
         })
 
+    def _facet_filters(self, request):
+        """Paramètres de la requête qui changent le résultat (clé du cache de facettes)"""
+        keys = set(self.filterset_class.base_filters) | {FullTextSearchFilter.search_param}
+        return {k: v for k, v in request.query_params.items() if k in keys and v != ''}
+
     # ----------------------------
     # RECOMMANDATIONS
     # ----------------------------
-    @action(detail=False, methods=['get'])
-    def recommended(self, request):
-        try:
-            housings = Housing.objects.filter(is_visible=True, status='disponible').select_related(
-                'owner', 'category', 'housing_type', 'region', 'city', 'district'
-            ).prefetch_related('images')
-
-            if not housings.exists():
-                return Response([], status=status.HTTP_200_OK)
-
-            if request.user.is_authenticated:
-                try:
-                    from .genetic_algorithm import apply_genetic_algorithm
-                    ranked_housings = apply_genetic_algorithm(request.user, housings)
-                except Exception as e:
-                    print(f"⚠️ Genetic algorithm error: {e}")
-                    ranked_housings = housings.order_by('-views_count', '-likes_count')[:20]
-            else:
-                ranked_housings = housings.order_by('-views_count', '-likes_count')[:20]
-
-            serializer = HousingListSerializer(ranked_housings, many=True, context={'request': request})
-            return Response(serializer.data)
-        except Exception as e:
-            print(f"❌ Error in recommended endpoint: {e}")
-            traceback.print_exc()
-            return Response({"error": "Erreur lors du chargement des recommandations"},
-                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    # GET /api/housings/recommended/ est servi par
+    # preference_views.RecommendedHousingsView (chemin explicite de urls.py,
+    # avant le routeur) : préférences, profil d'affinité et ranking_mode.
 
     # ----------------------------
     # ACTIONS UTILISATEURS - ✅ CORRIGÉ
@@ -325,64 +318,61 @@ class HousingViewSet(viewsets.ModelViewSet):
     def nearby(self, request):
         """
         GET /api/housings/nearby/?lat=3.848&lng=11.502&radius=5
- 
-        Retourne les logements dans un rayon `radius` km autour du point (lat, lng).
+        GET /api/housings/nearby/?lat=3.848&lng=11.502&k=10
+
+        Retourne les logements dans un rayon `radius` km autour du point (lat, lng),
+        ou les `k` plus proches (limités à `radius` si fourni).
         Utilisé par la carte pour la fonctionnalité "Autour de moi".
+
+        Résultats triés par distance (puis id) et paginés (`page`, `page_size`).
         """
         try:
             lat    = float(request.query_params.get('lat',    3.848))
             lng    = float(request.query_params.get('lng',    11.502))
-            radius = float(request.query_params.get('radius', 5))
+            radius = request.query_params.get('radius')
+            k      = request.query_params.get('k')
+            radius = float(radius) if radius not in (None, '') else None
+            k      = int(k) if k not in (None, '') else None
         except (ValueError, TypeError):
             return Response(
-                {'error': 'lat, lng et radius doivent être des nombres valides'},
+                {'error': 'lat, lng, radius et k doivent être des nombres valides'},
                 status=status.HTTP_400_BAD_REQUEST
             )
- 
-        # Bounding box approchée pour pré-filtrer rapidement en BDD
-        lat_delta = radius / 111.0
-        lng_delta = radius / (111.0 * math_module.cos(math_module.radians(lat)))
- 
-        qs = Housing.objects.filter(
-            is_visible=True,
-            latitude__range  = (lat - lat_delta, lat + lat_delta),
-            longitude__range = (lng - lng_delta, lng + lng_delta),
-        ).exclude(
-            latitude__isnull=True
-        ).exclude(
-            longitude__isnull=True
-        ).select_related(
+        if (radius is not None and radius < 0) or (k is not None and k <= 0):
+            return Response(
+                {'error': 'radius doit être positif et k strictement positif'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Index spatial en mémoire : paires (distance, id) triées
+        if k is not None:
+            ranked = spatial_index.nearest(lat, lng, k, max_radius_km=radius)
+        else:
+            ranked = spatial_index.within_radius(lat, lng, radius if radius is not None else 5)
+
+        paginator = NearbyPagination()
+        page = paginator.paginate_queryset(ranked, request, view=self)
+
+        # Hydratation de la seule page affichée
+        page_ids = [pk for _, pk in page]
+        housings = Housing.objects.filter(id__in=page_ids, is_visible=True).select_related(
             'owner', 'category', 'housing_type', 'region', 'city', 'district'
-        ).prefetch_related('images')
- 
-        # Filtre Haversine précis
-        def _haversine(la1, lo1, la2, lo2):
-            R = 6371
-            d2r = math_module.pi / 180
-            dLa = (la2 - la1) * d2r
-            dLo = (lo2 - lo1) * d2r
-            a = (math_module.sin(dLa / 2) ** 2 +
-                 math_module.cos(la1 * d2r) * math_module.cos(la2 * d2r) *
-                 math_module.sin(dLo / 2) ** 2)
-            return R * 2 * math_module.atan2(math_module.sqrt(a), math_module.sqrt(1 - a))
- 
-        results = []
-        for h in qs:
-            d = _haversine(lat, lng, float(h.latitude), float(h.longitude))
-            if d <= radius:
-                results.append((d, h))
- 
-        # Trier par distance croissante
-        results.sort(key=lambda x: x[0])
-        housings_list = [h for _, h in results]
- 
+        ).prefetch_related('images').in_bulk()
+
+        housings_list, distances = [], []
+        for distance, pk in page:
+            housing = housings.get(pk)
+            if housing is not None:
+                housings_list.append(housing)
+                distances.append(distance)
+
         serializer = HousingListSerializer(
             housings_list, many=True, context={'request': request}
         )
-        return Response({
-            'count'  : len(housings_list),
-            'results': serializer.data,
-        })
+        data = serializer.data
+        for item, distance in zip(data, distances):
+            item['distance'] = round(distance, 2)
+        return paginator.get_paginated_response(data)
  
     @action(detail=False, methods=['get'])
     def stats_map(self, request):
@@ -390,17 +380,19 @@ class HousingViewSet(viewsets.ModelViewSet):
         GET /api/housings/stats_map/
  
         Statistiques pour la barre d'info de la carte :
-        total, prix moyen, prix minimum.
-        Accepte les mêmes filtres que la liste principale.
+        total, prix moyen, prix minimum, et les facettes de la zone
+        (compteurs des filtres). Accepte les mêmes filtres que la liste
+        principale.
         """
         qs = self.filter_queryset(self.get_queryset())
-        data = qs.aggregate(
-            total     = Count('id'),
-            avg_price = Avg('price'),
-            min_price = Min('price'),
-            max_price = Max('price'),
-        )
-        return Response(data)
+        facets = facet_engine.compute(qs, self._facet_filters(request))
+        return Response({
+            'total':     facets['total'],
+            'avg_price': facets['price']['avg'],
+            'min_price': facets['price']['min'],
+            'max_price': facets['price']['max'],
+            'facets':    facets,
+        })
  
 
 
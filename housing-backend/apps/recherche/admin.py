@@ -8,7 +8,7 @@
 from django.contrib import admin
 from .models import (
     NearbyPlace, ChatbotConversation, ChatbotMessage,
-    SearchHistory, SearchPreference,
+    SearchHistory, SearchPreference, CriteriaCacheEntry,
 )
 
 
@@ -51,7 +51,7 @@ class ChatbotMessageAdmin(admin.ModelAdmin):
     fieldsets = (
         ('Informations', {
             'fields': ('conversation', 'role', 'is_voice',
-                       'audio_file', 'search_results'),
+                       'audio_file', 'search_results', 'criteria_hash'),
         }),
         ('🇫🇷 Contenu (Français)', {
             'fields': ('content_fr',),
@@ -91,4 +91,12 @@ class SearchHistoryAdmin(admin.ModelAdmin):
 class SearchPreferenceAdmin(admin.ModelAdmin):
     list_display    = ['user', 'updated_at']
     search_fields   = ['user__username']
-    readonly_fields = ['updated_at']
\ No newline at end of file
+    readonly_fields = ['updated_at']
+
+
+@admin.register(CriteriaCacheEntry)
+class CriteriaCacheEntryAdmin(admin.ModelAdmin):
+    list_display    = ['query_text', 'method', 'language', 'lexicon_version', 'expires_at']
+    list_filter     = ['method', 'language']
+    search_fields   = ['query_text']
+    readonly_fields = ['key', 'lexicon_version', 'created_at']
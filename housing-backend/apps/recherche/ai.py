@@ -4,8 +4,21 @@
 # # """
 import re
 import json
+import hashlib
+import threading
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
 
+from .criteria_cache import criteria_cache
+from .llm_client import CircuitOpen, LLMBusy, budget_for, get_llm_client
+from .llm_health import ollama_health
+from .lexicon import LexiconMatcher, by_group, first_by_rank, values_by_length
+from .location_lexicon import (
+    CityEntry, DistrictEntry, location_key, location_lexicon, name_variants,
+)
+
 
 # ---------------------------------------------------------------------------
 # Dictionnaires de référence
@@ -88,7 +101,7 @@ FEATURES_FR = {
     'clôture': 'clôture', 'cloture': 'clôture',
     'eau courante': 'eau', 'eau': 'eau',
     'électricité': 'electricite', 'electricite': 'electricite',
-    'climatisation': 'climatisation', 'clim': 'climatisation',
+    'climatisation': 'climatisation', 'climatisé': 'climatisation', 'clim': 'climatisation',
     'wifi': 'wifi', 'internet': 'wifi',
     'cuisine équipée': 'cuisine', 'cuisine': 'cuisine',
     'salle de bain': 'bain', 'douche': 'bain',
@@ -161,104 +174,203 @@ def _parse_amount(raw: str, query: str, position: int) -> int:
 
 
 # ---------------------------------------------------------------------------
-# Extraction principale
+# Lexique compilé et expressions précompilées
 # ---------------------------------------------------------------------------
 
-def extract_search_criteria_simple(user_query: str, language: str = 'fr') -> dict:
-    """
-    Extraction de critères depuis un texte libre (sans IA externe).
-    
-    Retourne un dict avec :
-      city, district_name, category_name, furnished,
-      min_price, max_price, min_rooms, min_area,
-      features, nearby_places, sort, intent,
-      text_query  ← termes résiduels pour recherche fulltext
-                    (≠ 'query' brute qui causait de faux filtres)
-    """
-    query = user_query.lower().strip()
-    # Normaliser les espaces insécables et apostrophes
-    query = query.replace('\u00a0', ' ').replace('\u2019', "'").replace('\u2018', "'")
-    criteria = {}
+FURNISHED_KEYWORDS = {
+    'fr': {
+        'furnished': ['meublé', 'meuble', 'équipé', 'moderne', 'tout équipé'],
+        'unfurnished': ['vide', 'simple', 'non meublé', 'non-meublé'],
+    },
+    'en': {
+        'furnished': ['furnished', 'equipped', 'modern', 'fully equipped'],
+        'unfurnished': ['unfurnished', 'empty', 'bare'],
+    },
+}
 
-    cities     = CITIES_CAMEROON.get(language, CITIES_CAMEROON['fr'])
-    categories = CATEGORIES_EN if language == 'en' else CATEGORIES_FR
-    features_d = FEATURES_EN   if language == 'en' else FEATURES_FR
-    nearby_d   = NEARBY_EN     if language == 'en' else NEARBY_FR
+PROXIMITY_WORDS = ['près', 'proche', 'autour', 'proximité',
+                   'near', 'close to', 'next to', 'around', 'beside']
 
-    # ── 1. VILLE ──────────────────────────────────────────────────────────
-    for key, canonical in cities.items():
-        if re.search(rf'\b{re.escape(key)}\b', query):
-            criteria['city'] = canonical
-            break
+SORT_KEYWORDS = {
+    'recent': ['urgent', 'rapidement', 'vite', 'asap', 'immediately'],
+    'price_asc': ['pas cher', 'économique', 'abordable', 'budget',
+                  'cheap', 'affordable', 'low cost'],
+    'price_desc': ['luxe', 'haut de gamme', 'standing', 'luxury', 'premium'],
+}
 
-    # ── 2. QUARTIER ───────────────────────────────────────────────────────
+# Ordre de priorité quand plusieurs intentions de tri sont présentes
+SORT_PRIORITY = ('recent', 'price_asc', 'price_desc')
+
+# Accords acceptés après un mot-clé ("meublée", "sécurisés", "rooms")
+LEXICON_SUFFIXES = {
+    'fr': ('e', 's', 'es'),
+    'en': ('s',),
+}
+
+
+def _keyword_group(words, value=True) -> dict:
+    return {word: value for word in words}
+
+
+def location_groups(language: str = 'fr'):
+    """
+    Groupes 'city' et 'district' du lexique : dictionnaires de référence
+    ci-dessus, complétés (et reliés à leurs identifiants) par les villes
+    et quartiers de la base (voir location_lexicon.py).
+
+    Returns:
+        (villes, quartiers, empreinte des lieux en base)
+    """
+    language = 'en' if language == 'en' else 'fr'
+    db_cities, db_districts, fingerprint = location_lexicon.dictionaries(language)
+    by_city_key = {location_key(entry.name): entry for entry in db_cities.values()}
+    by_district_key = {
+        (location_key(entry.name), location_key(entry.city or '')): entry
+        for entry in db_districts.values()
+    }
+
+    # Dictionnaires de référence d'abord : leur ordre reste la priorité
+    cities = {}
+    for key, name in CITIES_CAMEROON.get(language, CITIES_CAMEROON['fr']).items():
+        cities[key] = db_cities.get(key) or by_city_key.get(location_key(name)) or CityEntry(name, None)
+    districts = {}
     for key, (district, city) in DISTRICTS_MAP.items():
-        if key in query:
-            criteria['district_name'] = district
-            if not criteria.get('city'):
-                criteria['city'] = city
-            break
+        districts[key] = (
+            by_district_key.get((location_key(district), location_key(city)))
+            or DistrictEntry(district, city, None, getattr(cities.get(location_key(city)), 'id', None))
+        )
+    for key, entry in db_cities.items():
+        cities.setdefault(key, entry)
+    for key, entry in db_districts.items():
+        districts.setdefault(key, entry)
+    # Variantes des entrées de référence absentes de la base ("biyem assi")
+    for lexicon in (cities, districts):
+        for key, entry in list(lexicon.items()):
+            for variant in name_variants(key):
+                lexicon.setdefault(variant, entry)
+    return cities, districts, fingerprint
 
-    # ── 3. CATÉGORIE ─────────────────────────────────────────────────────
-    for key, canonical in categories.items():
-        if re.search(rf'\b{re.escape(key)}\b', query):
-            criteria['category_name'] = canonical
-            break
 
-    # ── 4. MEUBLÉ / VIDE ─────────────────────────────────────────────────
-    if language == 'fr':
-        furnished_kw   = ['meublé', 'meuble', 'équipé', 'moderne', 'tout équipé']
-        unfurnished_kw = ['vide', 'simple', 'non meublé', 'non-meublé']
-    else:
-        furnished_kw   = ['furnished', 'equipped', 'modern', 'fully equipped']
-        unfurnished_kw = ['unfurnished', 'empty', 'bare']
+# Lexique compilé par langue : (empreinte des lieux, LexiconMatcher)
+_search_lexicons = {}
+_search_lexicons_lock = threading.Lock()
 
-    if any(w in query for w in furnished_kw):
-        criteria['furnished'] = True
-    elif any(w in query for w in unfurnished_kw):
-        criteria['furnished'] = False
 
-    # ── 5. PRIX ──────────────────────────────────────────────────────────
-    #
-    # Patterns gérés (FR + EN) :
-    #   "50 000 FCFA", "50000 FCFA", "50k", "50 k", "50 mille"
-    #   "moins de 80 000", "max 80000", "entre 30 000 et 60 000"
-    #   "à partir de 30000", "plus de 30000"
-    #   "pour 500" / "à 500" / "budget 500"  ← 3-4 chiffres → ×1000
-    #
-    # Règle d'interprétation des montants courts (contexte immobilier camerounais) :
-    #   100–9999   sans suffixe → ×1000   (500 → 500 000 FCFA)
-    #   ≥ 10 000   sans suffixe → valeur brute
-    #   + suffixe k/mille       → ×1000 quelque soit la taille
+def search_lexicon(language: str = 'fr') -> LexiconMatcher:
+    """
+    Lexique de extract_search_criteria_simple, compilé une fois par langue
+    et recompilé seulement quand une ville ou un quartier change.
+    """
+    language = 'en' if language == 'en' else 'fr'
+    fingerprint = location_lexicon.fingerprint()
+    compiled = _search_lexicons.get(language)
+    if compiled is not None and compiled[0] == fingerprint:
+        return compiled[1]
+
+    with _search_lexicons_lock:
+        cities, districts, fingerprint = location_groups(language)
+        furnished = FURNISHED_KEYWORDS[language]
+        matcher = LexiconMatcher({
+            'city': cities,
+            'district': districts,
+            'category': CATEGORIES_EN if language == 'en' else CATEGORIES_FR,
+            'furnished': _keyword_group(furnished['furnished']),
+            'unfurnished': _keyword_group(furnished['unfurnished']),
+            'feature': FEATURES_EN if language == 'en' else FEATURES_FR,
+            'nearby': NEARBY_EN if language == 'en' else NEARBY_FR,
+            'proximity': _keyword_group(PROXIMITY_WORDS),
+            'sort': {word: sort for sort in SORT_KEYWORDS for word in SORT_KEYWORDS[sort]},
+        }, suffixes=LEXICON_SUFFIXES[language])
+        _search_lexicons[language] = (fingerprint, matcher)
+        return matcher
+
+
+# À incrémenter quand les règles d'extraction (regex, priorités) changent :
+# invalide les critères mémorisés (voir criteria_cache.py)
+EXTRACTOR_VERSION = 1
+
+
+@lru_cache(maxsize=None)
+def _static_lexicon_version() -> str:
+    payload = json.dumps([
+        EXTRACTOR_VERSION, CITIES_CAMEROON, DISTRICTS_MAP,
+        CATEGORIES_FR, CATEGORIES_EN, FEATURES_FR, FEATURES_EN,
+        NEARBY_FR, NEARBY_EN, FURNISHED_KEYWORDS, PROXIMITY_WORDS,
+        SORT_KEYWORDS, LEXICON_SUFFIXES,
+    ], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def lexicon_version() -> str:
+    """Empreinte des lexiques (y compris villes et quartiers en base) et des règles"""
+    raw = f'{_static_lexicon_version()}:{location_lexicon.fingerprint()}'
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+
+# Montant : "50 000" ou "50000"
+AMT = r'(\d{1,3}(?:[\s\u00a0]\d{3})+|\d{1,6})'
+
+_AMOUNT_SUFFIX_RE = re.compile(r'\bk\b|\bmille\b')
+_PRICE_RANGE_RE = re.compile(
+    rf'(?:entre|from|between)\s+{AMT}\s*(?:et|à|and|-)\s+{AMT}'
+)
+_PRICE_MAX_RE = re.compile(
+    rf'(?:moins de|maximum|max|jusqu\'à|jusqu.à|less than|under|up to|at most)\s*{AMT}'
+)
+_PRICE_FCFA_RE = re.compile(rf'{AMT}\s*(?:fcfa|xaf)\b')
+_PRICE_K_RE = re.compile(r'(\d{1,4})\s*(?:k|mille)\b')
+# \b après les chiffres : empêche de capturer "5000" dans "50000"
+# Lookahead négatif : ignore chambres, m2, personnes, etc.
+_PRICE_SHORT_RE = re.compile(
+    r'(?:pour|budget|loyer|prix|tarif)'
+    r'\s+(\d{1,4})\b(?!\s*(?:000|chambres?|pieces?|personnes?|m[2]|ans?|mois|jours?|bedroom|\d))'
+)
+_PRICE_BARE_RE = re.compile(r'\b(\d{5,6})\b')
+_PRICE_MIN_RE = re.compile(
+    rf'(?:plus de|minimum|au moins|at least|from|more than|à partir de)\s*{AMT}'
+)
+_ROOMS_RE = re.compile(r'(\d+)\s*(?:chambres?|pièces?|bedrooms?|rooms?)')
+_AREA_RE = re.compile(r'(\d+)\s*m[²2]')
+_WORD_RE = re.compile(r'\b[a-záàâäéèêëíìîïóòôöúùûüñç]{3,}\b')
+
+STOP_WORDS = frozenset({
+    'je', 'cherche', 'un', 'une', 'le', 'la', 'les', 'des', 'de', 'du',
+    'à', 'a', 'en', 'pour', 'avec', 'dans', 'sur', 'qui', 'et', 'ou',
+    'pas', 'non', 'très', 'plus', 'moins', 'ma', 'mon', 'mes',
+    'studio', 'chambre', 'appartement', 'maison', 'villa',
+    'meublé', 'meuble', 'vide', 'simple',
+    'fcfa', 'xaf', 'f', 'k', 'mille',
+    'i', 'am', 'looking', 'for', 'a', 'an', 'the', 'in', 'with',
+    'near', 'close', 'to', 'bedroom', 'apartment', 'furnished',
+})
+
+
+def _to_fcfa(raw: str, query_str: str, end_pos: int) -> int:
+    """
+    Convertit un montant capturé en FCFA.
+    Gère :  espaces internes ("50 000"),  suffixe k/mille, montants courts (×1000).
+    """
+    digits = raw.replace(' ', '').replace('\u00a0', '')
+    value  = int(digits)
+    suffix = query_str[end_pos: end_pos + 8].lower()
 
-    AMT = r'(\d{1,3}(?:[\s\u00a0]\d{3})+|\d{1,6})'  # "50 000" ou "50000"
-
-    def _to_fcfa(raw: str, query_str: str, end_pos: int) -> int:
-        """
-        Convertit un montant capturé en FCFA.
-        Gère :  espaces internes ("50 000"),  suffixe k/mille, montants courts (×1000).
-        """
-        digits = raw.replace(' ', '').replace('\u00a0', '')
-        value  = int(digits)
-        suffix = query_str[end_pos: end_pos + 8].lower()
-
-        if re.search(r'\bk\b|\bmille\b', suffix):
-            # Suffixe explicite → toujours ×1000
-            if value < 10000:
-                value *= 1000
-        elif value < 10000:
-            # Montant court sans suffixe → ×1000 (contexte immobilier)
-            # Exemples : 500 → 500 000, 50 → 50 000, 100 → 100 000
+    if _AMOUNT_SUFFIX_RE.search(suffix):
+        # Suffixe explicite → toujours ×1000
+        if value < 10000:
             value *= 1000
-        # Sinon (≥ 10 000 sans suffixe) → valeur brute : 50000, 150000…
+    elif value < 10000:
+        # Montant court sans suffixe → ×1000 (contexte immobilier)
+        # Exemples : 500 → 500 000, 50 → 50 000, 100 → 100 000
+        value *= 1000
+    # Sinon (≥ 10 000 sans suffixe) → valeur brute : 50000, 150000…
 
-        return value
+    return value
 
+
+def _extract_prices(query: str, criteria: dict):
+    """Prix min / max (voir les patterns gérés dans extract_search_criteria_simple)"""
     # 5a. Fourchette : entre X et Y
-    range_m = re.search(
-        rf'(?:entre|from|between)\s+{AMT}\s*(?:et|à|and|-)\s+{AMT}',
-        query
-    )
+    range_m = _PRICE_RANGE_RE.search(query)
     if range_m:
         p1 = _to_fcfa(range_m.group(1), query, range_m.end(1))
         p2 = _to_fcfa(range_m.group(2), query, range_m.end(2))
@@ -266,31 +378,22 @@ def extract_search_criteria_simple(user_query: str, language: str = 'fr') -> dic
         criteria['max_price'] = max(p1, p2)
     else:
         # 5b. Prix max — mots-clés explicites
-        max_m = re.search(
-            rf'(?:moins de|maximum|max|jusqu\'à|jusqu.à|less than|under|up to|at most)\s*{AMT}',
-            query
-        )
+        max_m = _PRICE_MAX_RE.search(query)
         if max_m:
             criteria['max_price'] = _to_fcfa(max_m.group(1), query, max_m.end(1))
         else:
             # 5c. Montant suivi de FCFA / XAF
-            fcfa_m = re.search(rf'{AMT}\s*(?:fcfa|xaf)\b', query)
+            fcfa_m = _PRICE_FCFA_RE.search(query)
             if fcfa_m:
                 criteria['max_price'] = _to_fcfa(fcfa_m.group(1), query, fcfa_m.end(1))
             else:
                 # 5d. Suffixe k ou mille : "50k", "50 mille"
-                k_m = re.search(r'(\d{1,4})\s*(?:k|mille)\b', query)
+                k_m = _PRICE_K_RE.search(query)
                 if k_m:
                     criteria['max_price'] = int(k_m.group(1)) * 1000
                 else:
-                    # 5e. CAS CORRIGE : "pour 500", "budget 500", "loyer 500"
-                    # \b apres les chiffres : empeche de capturer "5000" dans "50000"
-                    # Lookahead negatif : ignore chambres, m2, personnes, etc.
-                    PRIX_PREP = r'(?:pour|budget|loyer|prix|tarif)'
-                    short_m = re.search(
-                        rf'{PRIX_PREP}' + r'\s+(\d{1,4})\b(?!\s*(?:000|chambres?|pieces?|personnes?|m[2]|ans?|mois|jours?|bedroom|\d))',
-                        query
-                    )
+                    # 5e. "pour 500", "budget 500", "loyer 500"
+                    short_m = _PRICE_SHORT_RE.search(query)
                     if short_m:
                         val = int(short_m.group(1))
                         # Minimum 10 pour eviter des valeurs absurdes
@@ -298,15 +401,12 @@ def extract_search_criteria_simple(user_query: str, language: str = 'fr') -> dic
                             criteria['max_price'] = val * 1000
                     else:
                         # 5f. Nombre seul ≥ 5 chiffres : "50000", "150000"
-                        bare_m = re.search(r'\b(\d{5,6})\b', query)
+                        bare_m = _PRICE_BARE_RE.search(query)
                         if bare_m:
                             criteria['max_price'] = int(bare_m.group(1))
 
         # 5g. Prix min — mots-clés explicites
-        min_m = re.search(
-            rf'(?:plus de|minimum|au moins|at least|from|more than|à partir de)\s*{AMT}',
-            query
-        )
+        min_m = _PRICE_MIN_RE.search(query)
         if min_m:
             criteria['min_price'] = _to_fcfa(min_m.group(1), query, min_m.end(1))
 
@@ -315,54 +415,108 @@ def extract_search_criteria_simple(user_query: str, language: str = 'fr') -> dic
         if k in criteria and criteria[k] < 1000:
             del criteria[k]
 
+
+# ---------------------------------------------------------------------------
+# Extraction principale
+# ---------------------------------------------------------------------------
+
+def extract_search_criteria_simple(user_query: str, language: str = 'fr') -> dict:
+    """
+    Extraction de critères depuis un texte libre (sans IA externe).
+    
+    Retourne un dict avec :
+      city, district_name, category_name, furnished,
+      min_price, max_price, min_rooms, min_area,
+      features, nearby_places, sort, intent,
+      text_query  ← termes résiduels pour recherche fulltext
+                    (≠ 'query' brute qui causait de faux filtres)
+
+    Tous les mots-clés (villes, quartiers, catégories, équipements, lieux,
+    tri…) sont reconnus en une seule passe par le lexique compilé
+    (search_lexicon) : limites de mot et expression la plus longue
+    (« non meublé » → vide, « supermarché » ≠ « marché »).
+    """
+    query = user_query.lower().strip()
+    # Normaliser les espaces insécables et apostrophes
+    query = query.replace('\u00a0', ' ').replace('\u2019', "'").replace('\u2018', "'")
+    criteria = {}
+
+    hits = by_group(search_lexicon(language).find(query))
+
+    # ── 1. VILLE ──────────────────────────────────────────────────────────
+    # Identifiants renseignés quand la ville / le quartier existe en base
+    city_hit = first_by_rank(hits.get('city'))
+    if city_hit:
+        criteria['city'] = city_hit.value.name
+        if city_hit.value.id:
+            criteria['city_id'] = city_hit.value.id
+
+    # ── 2. QUARTIER ───────────────────────────────────────────────────────
+    district_hit = first_by_rank(hits.get('district'))
+    if district_hit:
+        district = district_hit.value
+        criteria['district_name'] = district.name
+        if district.id:
+            criteria['district_id'] = district.id
+        if not criteria.get('city') and district.city:
+            criteria['city'] = district.city
+            if district.city_id:
+                criteria['city_id'] = district.city_id
+
+    # ── 3. CATÉGORIE ─────────────────────────────────────────────────────
+    category_hit = first_by_rank(hits.get('category'))
+    if category_hit:
+        criteria['category_name'] = category_hit.value
+
+    # ── 4. MEUBLÉ / VIDE ─────────────────────────────────────────────────
+    if 'furnished' in hits:
+        criteria['furnished'] = True
+    elif 'unfurnished' in hits:
+        criteria['furnished'] = False
+
+    # ── 5. PRIX ──────────────────────────────────────────────────────────
+    #
+    # Patterns gérés (FR + EN) :
+    #   "50 000 FCFA", "50000 FCFA", "50k", "50 k", "50 mille"
+    #   "moins de 80 000", "max 80000", "entre 30 000 et 60 000"
+    #   "à partir de 30000", "plus de 30000"
+    #   "pour 500" / "à 500" / "budget 500"  ← 3-4 chiffres → ×1000
+    #
+    # Règle d'interprétation des montants courts (contexte immobilier camerounais) :
+    #   100–9999   sans suffixe → ×1000   (500 → 500 000 FCFA)
+    #   ≥ 10 000   sans suffixe → valeur brute
+    #   + suffixe k/mille       → ×1000 quelque soit la taille
+    _extract_prices(query, criteria)
+
     # ── 6. CHAMBRES ──────────────────────────────────────────────────────
-    room_pat = r'(\d+)\s*(?:chambres?|pièces?|bedrooms?|rooms?)'
-    room_m   = re.search(room_pat, query)
+    room_m = _ROOMS_RE.search(query)
     if room_m:
         criteria['min_rooms'] = int(room_m.group(1))
 
     # ── 7. SUPERFICIE ────────────────────────────────────────────────────
-    area_m = re.search(r'(\d+)\s*m[²2]', query)
+    area_m = _AREA_RE.search(query)
     if area_m:
         criteria['min_area'] = int(area_m.group(1))
 
     # ── 8. ÉQUIPEMENTS ────────────────────────────────────────────────────
-    found_features = []
-    # Trier par longueur décroissante pour favoriser les expressions longues
-    for keyword, feature in sorted(features_d.items(), key=lambda x: -len(x[0])):
-        if keyword in query:
-            found_features.append(feature)
+    # Expressions longues d'abord, sans doublon
+    found_features = values_by_length(hits.get('feature'))
     if found_features:
-        criteria['features'] = list(dict.fromkeys(found_features))  # déduplique en ordre
+        criteria['features'] = found_features
 
     # ── 9. LIEUX À PROXIMITÉ ─────────────────────────────────────────────
-    proximity_words = ['près', 'proche', 'autour', 'proximité',
-                       'near', 'close to', 'next to', 'around', 'beside']
-    nearby_intent = any(w in query for w in proximity_words)
-
-    found_nearby = []
-    for keyword, place_type in sorted(nearby_d.items(), key=lambda x: -len(x[0])):
-        if keyword in query:
-            found_nearby.append(place_type)
-            nearby_intent = True
-
+    found_nearby = values_by_length(hits.get('nearby'))
     if found_nearby:
-        criteria['nearby_places'] = list(dict.fromkeys(found_nearby))
-    if nearby_intent:
+        criteria['nearby_places'] = found_nearby
+    if found_nearby or 'proximity' in hits:
         criteria['intent'] = 'nearby'
 
     # ── 10. INTENTIONS DE TRI ────────────────────────────────────────────
-    urgent_w = ['urgent', 'rapidement', 'vite', 'asap', 'immediately']
-    cheap_w  = ['pas cher', 'économique', 'abordable', 'budget',
-                 'cheap', 'affordable', 'low cost']
-    luxury_w = ['luxe', 'haut de gamme', 'standing', 'luxury', 'premium']
-
-    if any(w in query for w in urgent_w):
-        criteria['sort'] = 'recent'
-    elif any(w in query for w in cheap_w):
-        criteria['sort'] = 'price_asc'
-    elif any(w in query for w in luxury_w):
-        criteria['sort'] = 'price_desc'
+    sorts = {hit.value for hit in hits.get('sort', ())}
+    for sort in SORT_PRIORITY:
+        if sort in sorts:
+            criteria['sort'] = sort
+            break
 
     # ── 11. TERMES RÉSIDUELS pour recherche fulltext ──────────────────────
     #
@@ -372,29 +526,16 @@ def extract_search_criteria_simple(user_query: str, language: str = 'fr') -> dic
     #
     # On extrait uniquement les mots-clés non reconnus qui pourraient
     # être utiles (ex : nom propre d'un lieu, surnom de quartier…)
-    
-    STOP_WORDS = {
-        'je', 'cherche', 'un', 'une', 'le', 'la', 'les', 'des', 'de', 'du',
-        'à', 'a', 'en', 'pour', 'avec', 'dans', 'sur', 'qui', 'et', 'ou',
-        'pas', 'non', 'très', 'plus', 'moins', 'ma', 'mon', 'mes',
-        'studio', 'chambre', 'appartement', 'maison', 'villa',
-        'meublé', 'meuble', 'vide', 'simple',
-        'fcfa', 'xaf', 'f', 'k', 'mille',
-        'i', 'am', 'looking', 'for', 'a', 'an', 'the', 'in', 'with',
-        'near', 'close', 'to', 'bedroom', 'apartment', 'furnished',
-    }
+    stop_words = STOP_WORDS
     # Ajouter les villes / quartiers détectés comme stop words
-    if criteria.get('city'):
-        STOP_WORDS.add(criteria['city'].lower())
-        # Variantes
-        for k, v in cities.items():
-            if v == criteria['city']:
-                STOP_WORDS.add(k)
-    if criteria.get('district_name'):
-        STOP_WORDS.add(criteria['district_name'].lower())
-
-    words = re.findall(r'\b[a-záàâäéèêëíìîïóòôöúùûüñç]{3,}\b', query)
-    residual = [w for w in words if w not in STOP_WORDS]
+    if criteria.get('city') or criteria.get('district_name'):
+        stop_words = set(STOP_WORDS)
+        # Variantes (accents, tirets) découpées en mots
+        for name in (criteria.get('city'), criteria.get('district_name')):
+            for variant in name_variants(name or ''):
+                stop_words.update(variant.split())
+
+    residual = [w for w in _WORD_RE.findall(query) if w not in stop_words]
 
     # text_query = les termes résiduels pertinents (peut être vide)
     criteria['text_query'] = ' '.join(residual) if residual else ''
@@ -470,23 +611,82 @@ def describe_criteria(criteria: dict, language: str = 'fr') -> str:
 # ---------------------------------------------------------------------------
 
 def extract_search_criteria(user_query: str, method: str = 'simple', language: str = 'fr') -> dict:
+    """
+    Critères d'une requête en langage naturel, mémorisés par
+    criteria_cache (LRU en mémoire, table pour les méthodes LLM).
+    """
+    return criteria_cache.get_or_extract(
+        user_query, method, language,
+        extract=lambda query: _extract_uncached(query, method, language),
+        version=lexicon_version(),
+        model=_llm_model(method),
+    )
+
+
+async def aextract_search_criteria(user_query: str, method: str = 'simple', language: str = 'fr') -> dict:
+    """
+    Variante async pour les vues ASGI : l'appel Ollama passe par le client
+    HTTP async, le reste (règles, lexiques, table de cache) par sync_to_async.
+    """
+    if method != 'ollama':
+        return await sync_to_async(extract_search_criteria)(user_query, method, language)
+
+    async def extract(query):
+        criteria = await _aollama_criteria(query) if ollama_health.is_available() else None
+        if criteria is None:
+            return await sync_to_async(extract_search_criteria_simple)(query, language), False
+        return await sync_to_async(_attach_location_ids)(criteria, language), True
+
+    return await criteria_cache.aget_or_extract(
+        user_query, method, language,
+        extract=extract,
+        version=await sync_to_async(lexicon_version)(),
+        model=_llm_model(method),
+    )
+
+
+def _llm_model(method: str) -> str:
     if method == 'ollama':
-        return _extract_ollama(user_query, language)
+        return getattr(settings, 'OLLAMA_MODEL', 'mistral')
+    if method == 'openai':
+        return 'gpt-3.5-turbo'
+    return ''
+
+
+def _extract_uncached(user_query: str, method: str, language: str):
+    """(critères, mémorisable) : un repli sur les règles n'est pas mémorisé"""
+    if method == 'ollama':
+        # Serveur absent (état partagé, lu en O(1)) : règles sans attendre
+        criteria = _ollama_criteria(user_query) if ollama_health.is_available() else None
     elif method == 'openai':
-        return _extract_openai(user_query, language)
-    return extract_search_criteria_simple(user_query, language)
+        criteria = _openai_criteria(user_query)
+    else:
+        return extract_search_criteria_simple(user_query, language), True
+    if criteria is None:
+        return extract_search_criteria_simple(user_query, language), False
+    return _attach_location_ids(criteria, language), True
+
+
+def _attach_location_ids(criteria: dict, language: str) -> dict:
+    """Relie la ville / le quartier nommés par un LLM aux lignes de la base"""
+    cities, districts, _ = location_groups(language)
+    city = cities.get(str(criteria.get('city') or '').lower())
+    if city is not None and city.id:
+        criteria['city_id'] = city.id
+    district = districts.get(str(criteria.get('district_name') or '').lower())
+    if district is not None and district.id and criteria.get('city_id', district.city_id) == district.city_id:
+        criteria['district_id'] = district.id
+    return criteria
 
 
 # ---------------------------------------------------------------------------
-# Ollama / OpenAI (inchangés)
+# Ollama / OpenAI
 # ---------------------------------------------------------------------------
 
-def _extract_ollama(user_query, language='fr'):
-    try:
-        import requests
-        ollama_url   = getattr(settings, 'OLLAMA_API_URL', 'http://localhost:11434')
-        ollama_model = getattr(settings, 'OLLAMA_MODEL', 'mistral')
-        prompt = f"""
+def _ollama_request(user_query) -> dict:
+    """Corps de l'appel /api/generate d'extraction des critères"""
+    ollama_model = getattr(settings, 'OLLAMA_MODEL', 'mistral')
+    prompt = f"""
 Analyse cette demande de logement et extrais les critères au format JSON.
 Demande: "{user_query}"
 Retourne UNIQUEMENT un JSON valide (omets les champs non mentionnés):
@@ -501,46 +701,75 @@ Retourne UNIQUEMENT un JSON valide (omets les champs non mentionnés):
   "nearby_places": ["school","supermarket"]
 }}
 """
-        response = requests.post(
-            f"{ollama_url}/api/generate",
-            json={"model": ollama_model, "prompt": prompt, "stream": False, "temperature": 0.1},
-            timeout=10
-        )
-        if response.status_code == 200:
-            result = response.json()['response']
-            json_match = re.search(r'\{.*\}', result, re.DOTALL)
-            if json_match:
-                c = json.loads(json_match.group())
-                c['text_query'] = ''
-                return c
+    return {"model": ollama_model, "prompt": prompt, "stream": False, "temperature": 0.1}
+
+
+def _parse_llm_criteria(result: str):
+    """Premier objet JSON de la réponse du modèle, ou None"""
+    json_match = re.search(r'\{.*\}', result, re.DOTALL)
+    if json_match:
+        c = json.loads(json_match.group())
+        c['text_query'] = ''
+        return c
+    return None
+
+
+def _ollama_criteria(user_query):
+    """Critères extraits par Ollama, ou None si le modèle est indisponible"""
+    try:
+        result = get_llm_client('ollama').post_json(
+            '/api/generate', _ollama_request(user_query), operation='extract',
+        )['response']
+        ollama_health.report_success()
+        return _parse_llm_criteria(result)
+    except (CircuitOpen, LLMBusy) as e:
+        # Modèle hors service ou saturé : repli silencieux sur les règles
+        ollama_health.report_error(e)
     except Exception as e:
         print(f"⚠️ Erreur Ollama: {e}")
-    return extract_search_criteria_simple(user_query, language)
+        ollama_health.report_error(e)
+    return None
 
 
-def _extract_openai(user_query, language='fr'):
+async def _aollama_criteria(user_query):
+    """Variante async de _ollama_criteria (aucun thread bloqué pendant l'appel)"""
+    try:
+        result = (await get_llm_client('ollama').apost_json(
+            '/api/generate', _ollama_request(user_query), operation='extract',
+        ))['response']
+        ollama_health.report_success()
+        return _parse_llm_criteria(result)
+    except (CircuitOpen, LLMBusy) as e:
+        ollama_health.report_error(e)
+    except Exception as e:
+        print(f"⚠️ Erreur Ollama: {e}")
+        ollama_health.report_error(e)
+    return None
+
+
+def _openai_criteria(user_query):
+    """Critères extraits par OpenAI, ou None si l'API est indisponible"""
     try:
         import openai
         openai.api_key = getattr(settings, 'OPENAI_API_KEY', None)
         if not openai.api_key:
-            return extract_search_criteria_simple(user_query, language)
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "Assistant immobilier Cameroun, retourne uniquement du JSON."},
-                {"role": "user", "content": f'Extrais les critères JSON de: "{user_query}"'}
-            ],
-            temperature=0.3, max_tokens=300
-        )
-        result = response.choices[0].message.content.strip()
-        json_match = re.search(r'\{.*\}', result, re.DOTALL)
-        if json_match:
-            c = json.loads(json_match.group())
-            c['text_query'] = ''
-            return c
+            return None
+        budget = budget_for('extract')
+        with get_llm_client('openai').guard('extract', budget):
+            response = openai.ChatCompletion.create(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": "Assistant immobilier Cameroun, retourne uniquement du JSON."},
+                    {"role": "user", "content": f'Extrais les critères JSON de: "{user_query}"'}
+                ],
+                temperature=0.3, max_tokens=300, request_timeout=budget,
+            )
+        return _parse_llm_criteria(response.choices[0].message.content.strip())
+    except (CircuitOpen, LLMBusy):
+        pass
     except Exception as e:
         print(f"⚠️ Erreur OpenAI: {e}")
-    return extract_search_criteria_simple(user_query, language)
+    return None
 
 
 # ---------------------------------------------------------------------------
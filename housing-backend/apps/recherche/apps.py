@@ -8,4 +8,14 @@ from django.apps import AppConfig
 class RechercheConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.recherche'
-    verbose_name = 'Recherche Intelligente'
\ No newline at end of file
+    verbose_name = 'Recherche Intelligente'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        from django.conf import settings
+        if getattr(settings, 'WHISPER_PRELOAD', False):
+            # Pool de transcription démarré (modèle chargé) avant la première requête
+            from .transcription import transcription_service
+            if transcription_service.available():
+                transcription_service.pool
@@ -0,0 +1,190 @@
+# ============================================
+# 📁 apps/recherche/async_views.py
+# ============================================
+"""
+Vues async (ASGI) du chatbot et de la recherche NLP.
+
+Sous un serveur ASGI (uvicorn config.asgi:application), une requête en
+attente du LLM ne retient aucun worker : l'appel Ollama passe par le
+client HTTP async (llm_client.apost_json) et seules les étapes ORM
+(cache des critères, filtres, sérialisation, conversation) passent par
+sync_to_async. Les réponses sont identiques à celles des vues DRF
+synchrones, dont les étapes de recherche sont réutilisées telles quelles.
+
+DRF ne gère pas les vues async : ce sont des vues Django. L'utilisateur
+est authentifié par les classes DRF habituelles (JWT, session, jeton).
+"""
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .ai import aextract_search_criteria
+from .chatbot import LocalChatbot
+from .chatbot_views import ChatbotQueryAPIView
+from .pagination import InvalidCursor
+from .snapshots import SnapshotExpired
+from .views import NLPSearchAPIView
+
+
+def _json_body(request) -> dict:
+    """Corps JSON de la requête ({} si vide ou invalide)"""
+    try:
+        data = json.loads(request.body or b'{}')
+    except (ValueError, UnicodeDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _authenticated_user(request):
+    """Utilisateur authentifié par les classes DRF du projet, sinon None"""
+    drf_request = Request(
+        request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    )
+    try:
+        user = drf_request.user
+    except APIException:
+        return None
+    return user if user.is_authenticated else None
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncNLPSearchView(View):
+    """
+    🔤 Recherche en langage naturel, version async
+
+    POST /api/recherche/nlp/async/
+    Même corps et même réponse que POST /api/recherche/nlp/.
+    """
+    http_method_names = ['post', 'options']
+
+    async def post(self, request):
+        data = _json_body(request)
+        user_query = str(data.get('query', '')).strip()
+        language = data.get('language', 'fr')
+        method = data.get('method', 'simple')
+
+        if not user_query:
+            return JsonResponse({'error': 'query requis'}, status=400)
+
+        try:
+            page = max(1, int(data.get('page', 1)))
+        except (TypeError, ValueError):
+            return JsonResponse({'error': 'page doit être un entier'}, status=400)
+
+        try:
+            # 1. Extraction des critères (appel LLM async)
+            criteria = await aextract_search_criteria(user_query, method=method, language=language)
+            criteria['language'] = language
+
+            # 2-10. Recherche et réponse
+            user = await sync_to_async(_authenticated_user)(request)
+            payload = await sync_to_async(NLPSearchAPIView()._search_payload)(
+                request, user_query, criteria, data.get('user_lat'), data.get('user_lng'), user=user,
+                cursor=data.get('cursor'), search_id=data.get('search_id'), page=page
+            )
+            return JsonResponse(payload)
+
+        except InvalidCursor as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        except SnapshotExpired as e:
+            return JsonResponse({'error': str(e)}, status=410)
+
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            return JsonResponse({
+                'query':   user_query,
+                'error':   str(e),
+                'results': [],
+                'count':   0,
+            }, status=500)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncChatbotQueryView(View):
+    """
+    🤖 API Chatbot, version async
+
+    POST /api/recherche/chatbot/async/
+    Même corps et même réponse que POST /api/recherche/chatbot/.
+    """
+    http_method_names = ['post', 'options']
+
+    async def post(self, request):
+        data = _json_body(request)
+        user_message = str(data.get('message', '')).strip()
+        method = data.get('method', 'simple')
+
+        if not user_message:
+            return JsonResponse({'error': 'Message vide'}, status=400)
+
+        try:
+            criteria = await aextract_search_criteria(user_message, method=method)
+            payload = await sync_to_async(ChatbotQueryAPIView()._search_payload)(
+                request, user_message, criteria, data.get('user_lat'), data.get('user_lng')
+            )
+            return JsonResponse(payload)
+
+        except Exception as e:
+            print(f"❌ Erreur chatbot: {e}")
+            import traceback
+            traceback.print_exc()
+
+            return JsonResponse({
+                'message': user_message,
+                'bot_response': "Désolé, je n'ai pas compris votre demande. Pouvez-vous reformuler ?",
+                'error': str(e),
+                'results': []
+            }, status=500)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncChatbotConversationView(View):
+    """
+    💬 Conversation avec l'assistant (LocalChatbot), version async
+
+    POST /api/recherche/chatbot/conversation/
+    Body: {
+        "message": "Bonjour",
+        "session_id": "…",  # optionnel
+        "language": "fr|en",  # optionnel
+        "is_voice": false  # optionnel
+    }
+    Réponse : {session_id, message, results, intent}
+    """
+    http_method_names = ['post', 'options']
+
+    async def post(self, request):
+        data = _json_body(request)
+        user_message = str(data.get('message', '')).strip()
+
+        if not user_message:
+            return JsonResponse({'error': 'Message vide'}, status=400)
+
+        chatbot = LocalChatbot(
+            language=data.get('language', 'fr'),
+            model=getattr(settings, 'OLLAMA_MODEL', 'mistral'),
+        )
+        try:
+            user = await sync_to_async(_authenticated_user)(request)
+            reply = await chatbot.achat(
+                user_message,
+                session_id=data.get('session_id'),
+                user=user,
+                is_voice=bool(data.get('is_voice', False)),
+            )
+            return JsonResponse(reply)
+
+        except Exception as e:
+            print(f"❌ Erreur chatbot: {e}")
+            return JsonResponse({'error': 'Erreur interne'}, status=500)
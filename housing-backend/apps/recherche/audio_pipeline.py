@@ -0,0 +1,344 @@
+# ============================================
+# 📁 apps/recherche/audio_pipeline.py
+# ============================================
+"""
+Préparation en mémoire des messages vocaux avant reconnaissance.
+
+    octets reçus → décodage → mono 16 kHz → détection de parole (VAD)
+                 → segments parlés seuls → WAV en mémoire (BytesIO)
+
+Rien n'est écrit sur disque : le WAV se décode avec le module `wave`, les
+autres formats (mp3, m4a, ogg, webm…) passent par pydub, qui envoie les
+octets à ffmpeg par tube (stdin / stdout) quand on lui donne un BytesIO.
+
+La détection de parole est énergétique, trame par trame (30 ms) : le
+niveau de bruit est estimé sur l'enregistrement lui-même (10e centile des
+trames), une trame est parlée si elle le dépasse de VOICE_VAD_MARGIN_DB.
+Les clics isolés (< VOICE_VAD_MIN_SPEECH_MS) sont ignorés et chaque
+segment garde VOICE_VAD_PADDING_MS de contexte de part et d'autre, pour
+ne pas couper les attaques et fins de mots. Le silence de début, de fin
+et les longues pauses ne sont plus envoyés au moteur de reconnaissance.
+
+Usage:
+    prepared = prepare_audio(request.FILES['audio'])
+    if prepared.is_silent:
+        ...
+    with sr.AudioFile(prepared.wav()) as source:   # SpeechRecognition
+        ...
+    model.transcribe(prepared.samples)              # Whisper (float32 16 kHz)
+
+Nécessite NumPy ; pydub et ffmpeg pour les formats autres que WAV.
+"""
+
+import io
+import os
+import wave
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+
+# Fréquence attendue par Google Speech, Sphinx et Whisper
+TARGET_SAMPLE_RATE = 16000
+
+# Extension → format pydub / ffmpeg
+FORMAT_MAP = {
+    '.mp3': 'mp3',
+    '.m4a': 'm4a',
+    '.mp4': 'mp4',
+    '.ogg': 'ogg',
+    '.oga': 'ogg',
+    '.opus': 'ogg',
+    '.webm': 'webm',
+    '.flac': 'flac',
+    '.wav': 'wav',
+}
+
+
+class AudioDecodeError(Exception):
+    """Audio illisible, ou format non pris en charge sans pydub / ffmpeg"""
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ----------------------------------------------------------------------
+# Lecture et décodage
+# ----------------------------------------------------------------------
+
+def read_source(source) -> Tuple[bytes, str]:
+    """
+    Octets et nom d'un audio : chemin, octets, ou fichier ouvert
+    (UploadedFile de Django, BytesIO…)
+    """
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source), ''
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            return f.read(), os.fspath(source)
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return source.read(), getattr(source, 'name', '') or ''
+
+
+def _audio_format(data: bytes, name: str) -> str:
+    if data[:4] == b'RIFF' and data[8:12] == b'WAVE':
+        return 'wav'
+    _, ext = os.path.splitext(name)
+    return FORMAT_MAP.get(ext.lower(), 'mp3')
+
+
+def _pcm_to_float(frames: bytes, sample_width: int, channels: int) -> 'np.ndarray':
+    """PCM entier entrelacé → float32 mono dans [-1, 1] (canaux moyennés)"""
+    if sample_width == 1:
+        ints = np.frombuffer(frames, dtype=np.uint8).astype(np.int16) - 128
+    elif sample_width == 2:
+        ints = np.frombuffer(frames, dtype='<i2')
+    elif sample_width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3)
+        ints = (raw[:, 0].astype(np.int32) | (raw[:, 1].astype(np.int32) << 8)
+                | (raw[:, 2].astype(np.int32) << 16))
+        ints = np.where(ints >= 1 << 23, ints - (1 << 24), ints)
+    elif sample_width == 4:
+        ints = np.frombuffer(frames, dtype='<i4')
+    else:
+        raise AudioDecodeError(f'Échantillons de {sample_width} octets non pris en charge')
+
+    scale = 1.0 / float(1 << (8 * sample_width - 1))
+    channels = max(1, channels)
+    usable = len(ints) - len(ints) % channels
+    # Somme des canaux par tranches entrelacées : pas de copie (n, canaux)
+    mono = ints[0:usable:channels].astype(np.float32)
+    for channel in range(1, channels):
+        mono += ints[channel:usable:channels]
+    mono *= scale / channels
+    return mono
+
+
+def decode(data: bytes, name: str = '') -> Tuple['np.ndarray', int]:
+    """
+    Décode un audio en mémoire.
+
+    Returns:
+        (échantillons float32 mono, fréquence d'échantillonnage)
+    """
+    audio_format = _audio_format(data, name)
+
+    if audio_format == 'wav':
+        try:
+            with wave.open(io.BytesIO(data), 'rb') as wav:
+                frames = wav.readframes(wav.getnframes())
+                return (
+                    _pcm_to_float(frames, wav.getsampwidth(), wav.getnchannels()),
+                    wav.getframerate(),
+                )
+        except (wave.Error, EOFError) as e:
+            # WAV non PCM (float, ADPCM…) : ffmpeg s'en charge
+            if not _pydub_available():
+                raise AudioDecodeError(f'WAV illisible : {e}') from e
+
+    if not _pydub_available():
+        raise AudioDecodeError(
+            f'Format {audio_format} non décodable : installez pydub et ffmpeg'
+        )
+    from pydub import AudioSegment
+    try:
+        segment = AudioSegment.from_file(io.BytesIO(data), format=audio_format)
+    except Exception as e:
+        raise AudioDecodeError(f'Décodage {audio_format} impossible : {e}') from e
+    return (
+        _pcm_to_float(segment.raw_data, segment.sample_width, segment.channels),
+        segment.frame_rate,
+    )
+
+
+def _pydub_available() -> bool:
+    try:
+        import pydub  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+# ----------------------------------------------------------------------
+# Rééchantillonnage
+# ----------------------------------------------------------------------
+
+def resample(samples: 'np.ndarray', rate: int, target_rate: int = TARGET_SAMPLE_RATE) -> 'np.ndarray':
+    """
+    Rééchantillonnage par FFT (bande limitée : pas de repliement en
+    sous-échantillonnage, contrairement à une interpolation linéaire)
+    """
+    if rate == target_rate or len(samples) == 0:
+        return samples.astype(np.float32, copy=False)
+    target_length = max(1, int(round(len(samples) * target_rate / rate)))
+    spectrum = np.fft.rfft(samples)
+    resampled = np.fft.irfft(spectrum, target_length) * (target_length / len(samples))
+    return resampled.astype(np.float32)
+
+
+# ----------------------------------------------------------------------
+# Détection de parole
+# ----------------------------------------------------------------------
+
+def _runs(mask: 'np.ndarray') -> List[Tuple[int, int]]:
+    """Plages [début, fin[ des valeurs vraies d'un masque booléen"""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+
+def voiced_segments(samples: 'np.ndarray', rate: int, frame_ms: Optional[int] = None,
+                    margin_db: Optional[float] = None, floor_db: Optional[float] = None,
+                    min_speech_ms: Optional[int] = None,
+                    padding_ms: Optional[int] = None) -> List[Tuple[int, int]]:
+    """
+    Segments parlés, en indices d'échantillons [début, fin[.
+
+    Args:
+        frame_ms: durée d'une trame d'analyse
+        margin_db: écart au bruit de fond pour qu'une trame soit parlée
+        floor_db: niveau (dBFS) sous lequel une trame est toujours silencieuse
+        min_speech_ms: durée minimale d'un segment (les clics sont ignorés)
+        padding_ms: contexte gardé avant et après chaque segment
+    """
+    frame_ms = frame_ms or _setting('VOICE_VAD_FRAME_MS', 30)
+    margin_db = _setting('VOICE_VAD_MARGIN_DB', 10.0) if margin_db is None else margin_db
+    floor_db = _setting('VOICE_VAD_FLOOR_DB', -55.0) if floor_db is None else floor_db
+    min_speech_ms = _setting('VOICE_VAD_MIN_SPEECH_MS', 120) if min_speech_ms is None else min_speech_ms
+    padding_ms = _setting('VOICE_VAD_PADDING_MS', 200) if padding_ms is None else padding_ms
+
+    frame = max(1, rate * frame_ms // 1000)
+    n_frames = len(samples) // frame
+    if n_frames == 0:
+        return []
+
+    frames = samples[:n_frames * frame].reshape(n_frames, frame).astype(np.float64)
+    energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-12)
+
+    noise_db = np.percentile(energy_db, 10)
+    if np.percentile(energy_db, 90) - noise_db < margin_db:
+        # Niveau quasi constant : tout parlé (ou tout silencieux)
+        voiced = energy_db > floor_db
+    else:
+        voiced = energy_db > max(noise_db + margin_db, floor_db)
+
+    # Clics isolés retirés, puis contexte ajouté autour des segments
+    min_frames = max(1, -(-min_speech_ms // frame_ms))
+    pad_frames = -(-padding_ms // frame_ms)
+    kept = np.zeros(n_frames, dtype=bool)
+    for start, end in _runs(voiced):
+        if end - start >= min_frames:
+            kept[max(0, start - pad_frames):min(n_frames, end + pad_frames)] = True
+
+    segments = []
+    for start, end in _runs(kept):
+        end_sample = len(samples) if end == n_frames else end * frame
+        segments.append((int(start * frame), int(end_sample)))
+    return segments
+
+
+# ----------------------------------------------------------------------
+# Pipeline complet
+# ----------------------------------------------------------------------
+
+class PreparedAudio:
+    """
+    Audio mono 16 kHz réduit aux segments parlés.
+
+    `segments` : plages [début, fin[ retenues, en échantillons à
+    `sample_rate` sur la chronologie de l'enregistrement d'origine.
+    """
+
+    def __init__(self, samples: 'np.ndarray', sample_rate: int, input_seconds: float,
+                 segments: List[Tuple[int, int]]):
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.input_seconds = input_seconds
+        self.segments = segments
+
+    @property
+    def voiced_seconds(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+    @property
+    def is_silent(self) -> bool:
+        return len(self.samples) == 0
+
+    def wav(self) -> io.BytesIO:
+        """WAV PCM 16 bits en mémoire, positionné au début"""
+        pcm = (np.clip(self.samples, -1.0, 1.0) * 32767.0).astype('<i2')
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(pcm.tobytes())
+        buffer.seek(0)
+        return buffer
+
+
+def prepare_audio(source, target_rate: int = TARGET_SAMPLE_RATE, trim: bool = True) -> PreparedAudio:
+    """
+    Décode, rééchantillonne et réduit un audio à ses segments parlés.
+
+    La détection de parole tourne à la fréquence d'origine : seuls les
+    segments retenus sont rééchantillonnés (leurs bords tombent dans le
+    contexte silencieux ajouté autour de la parole).
+
+    Args:
+        source: chemin, octets ou fichier ouvert (UploadedFile, BytesIO…)
+        trim: False pour garder tout l'enregistrement
+
+    Raises:
+        AudioDecodeError: audio illisible
+        ImportError: NumPy absent
+    """
+    if not NUMPY_AVAILABLE:
+        raise ImportError('NumPy est requis pour la préparation audio (pip install numpy)')
+
+    data, name = read_source(source)
+    samples, rate = decode(data, name)
+    if not rate:
+        raise AudioDecodeError("Fréquence d'échantillonnage inconnue")
+    input_seconds = len(samples) / rate
+
+    if not trim:
+        samples = resample(samples, rate, target_rate)
+        return PreparedAudio(samples, target_rate, input_seconds, [(0, len(samples))])
+
+    segments = voiced_segments(samples, rate)
+    if not segments:
+        return PreparedAudio(samples[:0], target_rate, input_seconds, [])
+    voiced = np.concatenate([resample(samples[start:end], rate, target_rate) for start, end in segments])
+    ratio = target_rate / rate
+    return PreparedAudio(
+        voiced, target_rate, input_seconds,
+        [(int(round(start * ratio)), int(round(end * ratio))) for start, end in segments],
+    )
+
+
+def whisper_input(source):
+    """
+    Entrée pour Whisper : segments parlés (float32 mono 16 kHz, passés au
+    processus de transcription sans fichier), ou None si l'audio est
+    silencieux. Un chemin dont le format n'est pas décodable ici (pydub
+    absent) est rendu tel quel : Whisper le lit lui-même avec ffmpeg.
+
+    Raises:
+        AudioDecodeError: audio non décodable (hors chemin de fichier)
+    """
+    try:
+        prepared = prepare_audio(source)
+    except (AudioDecodeError, ImportError) as e:
+        if isinstance(source, (str, os.PathLike)):
+            return os.fspath(source)
+        raise AudioDecodeError(str(e)) from e
+    return None if prepared.is_silent else prepared.samples
@@ -9,13 +9,51 @@ Pour le LLM local, nous utilisons Ollama avec le modèle Mistral-7B ou Llama2
 
 import json
 import uuid
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 
-from .models import ChatbotConversation, ChatbotMessage
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
+
+from .audio_pipeline import AudioDecodeError, prepare_audio, whisper_input
+from .lexicon import LexiconMatcher
+from .llm_client import LLMUnavailable, get_llm_client
+from .llm_health import ollama_health
+from .conversation_window import ConversationWindow, conversation_store
+from .hydrator import hydrate_summaries
+from .result_cache import criteria_digest
+from .transcription import TranscriptionError, transcription_service
 from .search_engine import NaturalLanguageSearchEngine
 
 
+# Mots-clés d'intention, par langue
+INTENT_KEYWORDS = {
+    'fr': {
+        'greeting': ['bonjour', 'salut', 'hello', 'bonsoir', 'coucou'],
+        'help': ['aide', 'aider', 'comment', 'faire'],
+        'search': ['cherche', 'recherche', 'trouver', 'logement', 'logements',
+                   'appartement', 'appartements', 'maison', 'maisons',
+                   'studio', 'studios', 'chambre', 'chambres'],
+    },
+    'en': {
+        'greeting': ['hello', 'hi', 'hey', 'good morning', 'good evening'],
+        'help': ['help', 'how', 'what can you do'],
+        'search': ['search', 'searching', 'find', 'looking for', 'apartment', 'apartments',
+                   'house', 'houses', 'studio', 'studios', 'room', 'rooms'],
+    },
+}
+
+INTENT_PRIORITY = ('greeting', 'help', 'search')
+
+
+@lru_cache(maxsize=None)
+def intent_lexicon(language: str = 'fr') -> LexiconMatcher:
+    """Lexique d'intentions compilé une fois par langue"""
+    groups = INTENT_KEYWORDS['en' if language == 'en' else 'fr']
+    return LexiconMatcher({intent: dict.fromkeys(words, intent) for intent, words in groups.items()})
+
+
 class LocalChatbot:
     """
     Chatbot utilisant un LLM local via Ollama
@@ -30,16 +68,14 @@ class LocalChatbot:
         self.language = language
         self.model = model
         self.search_engine = NaturalLanguageSearchEngine(language=language)
-        self.ollama_available = self._check_ollama()
+    
+    @property
+    def ollama_available(self) -> bool:
+        return self._check_ollama()
     
     def _check_ollama(self) -> bool:
-        """Vérifie si Ollama est disponible"""
-        try:
-            import requests
-            response = requests.get('http://localhost:11434/api/tags', timeout=2)
-            return response.status_code == 200
-        except:
-            return False
+        """Vérifie si Ollama est disponible (état partagé, sonde en arrière-plan)"""
+        return ollama_health.is_available()
     
     def chat(
         self,
@@ -60,78 +96,145 @@ class LocalChatbot:
         Returns:
             Dictionnaire avec réponse et résultats
         """
-        # Créer ou récupérer la conversation
-        if not session_id:
-            session_id = str(uuid.uuid4())
+        window = self._open_conversation(user_message, session_id, user, is_voice)
         
-        conversation, created = ChatbotConversation.objects.get_or_create(
-            session_id=session_id,
-            defaults={'user': user, 'language': self.language}
-        )
+        # Analyser l'intention
+        intent = self._analyze_intent(user_message)
+        response = self._respond(intent, user_message, user, window)
+        
+        # Sauvegarder la réponse
+        self._save_reply(window, response)
         
-        # Sauvegarder le message utilisateur
-        ChatbotMessage.objects.create(
-            conversation=conversation,
-            role='user',
-            content=user_message,
-            is_voice=is_voice
+        return {
+            'session_id': window.session_id,
+            'message': response['message'],
+            'results': response.get('results'),
+            'intent': intent
+        }
+    
+    async def achat(
+        self,
+        user_message: str,
+        session_id: Optional[str] = None,
+        user=None,
+        is_voice: bool = False
+    ) -> Dict:
+        """
+        Variante async de chat() pour les vues ASGI
+        
+        L'appel au LLM passe par le client HTTP async : une conversation en
+        attente du modèle n'occupe aucun thread. Les accès au cache et à la
+        base (fenêtre de conversation, recherche) passent par sync_to_async.
+        """
+        window = await sync_to_async(self._open_conversation)(
+            user_message, session_id, user, is_voice
         )
         
-        # Analyser l'intention
         intent = self._analyze_intent(user_message)
-        
-        if intent == 'search':
-            # Recherche de logements
-            response = self._handle_search(user_message, user)
-        elif intent == 'greeting':
-            response = self._handle_greeting()
-        elif intent == 'help':
-            response = self._handle_help()
+        if intent == 'general':
+            response = await self._ahandle_general(user_message, window)
         else:
-            response = self._handle_general(user_message, conversation)
+            response = await sync_to_async(self._respond)(intent, user_message, user, window)
         
-        # Sauvegarder la réponse
-        ChatbotMessage.objects.create(
-            conversation=conversation,
-            role='assistant',
-            content=response['message'],
-            search_results=response.get('results', [])
-        )
+        await sync_to_async(self._save_reply)(window, response)
         
         return {
-            'session_id': session_id,
+            'session_id': window.session_id,
             'message': response['message'],
             'results': response.get('results'),
             'intent': intent
         }
     
-    def _analyze_intent(self, message: str) -> str:
-        """Analyse l'intention du message"""
-        message_lower = message.lower()
+    def chat_stream(
+        self,
+        user_message: str,
+        session_id: Optional[str] = None,
+        user=None,
+        is_voice: bool = False
+    ) -> Iterator[Tuple[str, Dict]]:
+        """
+        Variante de chat() en flux, pour les Server-Sent Events
         
-        # Salutations
-        greetings_fr = ['bonjour', 'salut', 'hello', 'bonsoir', 'coucou']
-        greetings_en = ['hello', 'hi', 'hey', 'good morning', 'good evening']
-        greetings = greetings_fr if self.language == 'fr' else greetings_en
+        Produit des couples (événement, données) :
+            ('meta', {session_id, intent}) immédiatement,
+            ('results', {results, total_count}) pour une recherche,
+            ('token', {text}) au fil de la génération du LLM,
+            ('done', {session_id}) une fois la réponse enregistrée.
         
-        if any(word in message_lower for word in greetings):
-            return 'greeting'
+        La réponse de l'assistant est enregistrée à la fin du flux, ou avec
+        le texte déjà produit si le client se déconnecte avant.
+        """
+        window = self._open_conversation(user_message, session_id, user, is_voice)
+        intent = self._analyze_intent(user_message)
+        yield 'meta', {'session_id': window.session_id, 'intent': intent}
         
-        # Aide
-        help_keywords_fr = ['aide', 'aider', 'comment', 'faire']
-        help_keywords_en = ['help', 'how', 'what can you do']
-        help_keywords = help_keywords_fr if self.language == 'fr' else help_keywords_en
+        parts: List[str] = []
+        response: Dict = {}
+        try:
+            if intent == 'general' and self.ollama_available:
+                history = self._get_conversation_history(window)
+                try:
+                    for text in self._stream_ollama(user_message, history):
+                        parts.append(text)
+                        yield 'token', {'text': text}
+                    ollama_health.report_success()
+                except LLMUnavailable as e:
+                    print(f"Erreur Ollama: {e}")
+                    ollama_health.report_error(e)
+                    if not parts:
+                        parts.append(self._fallback_response(user_message)['message'])
+                        yield 'token', {'text': parts[-1]}
+            else:
+                response = self._respond(intent, user_message, user, window)
+                if intent == 'search':
+                    results = response.get('results') or []
+                    yield 'results', {'results': results, 'total_count': response.get('total_count', len(results))}
+                parts.append(response['message'])
+                yield 'token', {'text': response['message']}
+        finally:
+            self._save_reply(window, {**response, 'message': ''.join(parts)})
         
-        if any(word in message_lower for word in help_keywords):
-            return 'help'
+        yield 'done', {'session_id': window.session_id}
+    
+    def _open_conversation(self, user_message: str, session_id: Optional[str], user, is_voice: bool) -> ConversationWindow:
+        """Ouvre la fenêtre de la session (créée si besoin) et y ajoute le message utilisateur"""
+        if not session_id:
+            session_id = str(uuid.uuid4())
         
-        # Recherche (par défaut)
-        search_keywords_fr = ['cherche', 'trouver', 'logement', 'appartement', 'maison', 'studio', 'chambre']
-        search_keywords_en = ['search', 'find', 'looking for', 'apartment', 'house', 'studio', 'room']
-        search_keywords = search_keywords_fr if self.language == 'fr' else search_keywords_en
+        window = conversation_store.open(session_id, user=user, language=self.language)
+        conversation_store.append(window, 'user', user_message, is_voice=is_voice)
+        return window
+    
+    def _respond(self, intent: str, user_message: str, user, window: ConversationWindow) -> Dict:
+        """Réponse complète selon l'intention"""
+        if intent == 'search':
+            # Recherche de logements
+            return self._handle_search(user_message, user)
+        if intent == 'greeting':
+            return self._handle_greeting()
+        if intent == 'help':
+            return self._handle_help()
+        return self._handle_general(user_message, window)
+    
+    def _save_reply(self, window: ConversationWindow, response: Dict):
+        """
+        Ajoute la réponse de l'assistant à la fenêtre (écriture en base différée)
         
-        if any(word in message_lower for word in search_keywords):
-            return 'search'
+        Seuls les identifiants classés et l'empreinte des critères sont
+        conservés ; les fiches sont hydratées à la relecture.
+        """
+        conversation_store.append(
+            window, 'assistant', response['message'],
+            search_results=response.get('result_ids', []),
+            criteria_hash=response.get('criteria_hash', ''),
+        )
+    
+    def _analyze_intent(self, message: str) -> str:
+        """Analyse l'intention du message (salutation > aide > recherche)"""
+        found = {hit.group for hit in intent_lexicon(self.language).find(message.lower())}
+        for intent in INTENT_PRIORITY:
+            if intent in found:
+                return intent
         
         # Si nombres ou prix mentionnés, c'est probablement une recherche
         if any(char.isdigit() for char in message):
@@ -143,11 +246,14 @@ class LocalChatbot:
         """Gère une requête de recherche"""
         # Utiliser le moteur de recherche en langage naturel
         search_result = self.search_engine.parse_and_search(message, user)
+        result_ids = [housing.id for housing in search_result['results']]
         
         return {
             'message': search_result['response'],
             'results': self._format_results(search_result['results']),
-            'total_count': search_result['total_count']
+            'total_count': search_result['total_count'],
+            'result_ids': result_ids,
+            'criteria_hash': criteria_digest(search_result['criteria']),
         }
     
     def _handle_greeting(self) -> Dict:
@@ -222,47 +328,87 @@ The more specific you are, the better the results!"""
         
         return {'message': message}
     
-    def _handle_general(self, message: str, conversation: ChatbotConversation) -> Dict:
+    def _handle_general(self, message: str, window: ConversationWindow) -> Dict:
         """Gère les messages généraux avec le LLM"""
         if not self.ollama_available:
             return self._fallback_response(message)
         
         try:
             # Préparer le contexte de conversation
-            history = self._get_conversation_history(conversation)
+            history = self._get_conversation_history(window)
             
             # Appeler Ollama
             response = self._call_ollama(message, history)
+            ollama_health.report_success()
             
             return {'message': response}
         except Exception as e:
             print(f"Erreur Ollama: {e}")
+            ollama_health.report_error(e)
             return self._fallback_response(message)
     
-    def _call_ollama(self, message: str, history: List[Dict]) -> str:
-        """Appelle l'API Ollama"""
-        import requests
-        
-        system_prompt = self._get_system_prompt()
-        
-        messages = [{'role': 'system', 'content': system_prompt}]
-        messages.extend(history)
-        messages.append({'role': 'user', 'content': message})
+    async def _ahandle_general(self, message: str, window: ConversationWindow) -> Dict:
+        """Variante async de _handle_general"""
+        if not self.ollama_available:
+            return self._fallback_response(message)
         
-        response = requests.post(
-            'http://localhost:11434/api/chat',
-            json={
+        try:
+            history = self._get_conversation_history(window)
+            response = await get_llm_client('ollama').apost_json(
+                '/api/chat',
+                {
+                    'model': self.model,
+                    'messages': self._chat_messages(message, history),
+                    'stream': False
+                },
+                operation='chat',
+            )
+            ollama_health.report_success()
+            return {'message': response['message']['content']}
+        except Exception as e:
+            print(f"Erreur Ollama: {e}")
+            ollama_health.report_error(e)
+            return self._fallback_response(message)
+    
+    def _call_ollama(self, message: str, history: List[Dict]) -> str:
+        """Appelle l'API Ollama (LLMUnavailable si indisponible ou trop lent)"""
+        response = get_llm_client('ollama').post_json(
+            '/api/chat',
+            {
                 'model': self.model,
-                'messages': messages,
+                'messages': self._chat_messages(message, history),
                 'stream': False
             },
-            timeout=30
+            operation='chat',
         )
-        
-        if response.status_code == 200:
-            return response.json()['message']['content']
-        else:
-            raise Exception(f"Ollama error: {response.status_code}")
+        return response['message']['content']
+    
+    def _stream_ollama(self, message: str, history: List[Dict]) -> Iterator[str]:
+        """Appelle l'API Ollama en flux : produit les morceaux de texte au fil de l'eau"""
+        chunks = get_llm_client('ollama').stream_json(
+            '/api/chat',
+            {
+                'model': self.model,
+                'messages': self._chat_messages(message, history),
+                'stream': True
+            },
+            operation='chat',
+        )
+        for chunk in chunks:
+            if chunk.get('error'):
+                raise LLMUnavailable(f"ollama : {chunk['error']}")
+            text = (chunk.get('message') or {}).get('content')
+            if text:
+                yield text
+            if chunk.get('done'):
+                break
+    
+    def _chat_messages(self, message: str, history: List[Dict]) -> List[Dict]:
+        """Prompt système, historique puis message utilisateur"""
+        messages = [{'role': 'system', 'content': self._get_system_prompt()}]
+        messages.extend(history)
+        messages.append({'role': 'user', 'content': message})
+        return messages
     
     def _get_system_prompt(self) -> str:
         """Retourne le prompt système"""
@@ -277,13 +423,9 @@ You help users find apartments, houses, studios, etc.
 You are friendly, professional and precise.
 If the user is looking for housing, encourage them to be specific about their criteria."""
     
-    def _get_conversation_history(self, conversation: ChatbotConversation) -> List[Dict]:
-        """Récupère l'historique de conversation"""
-        messages = conversation.messages.order_by('created_at')[-10:]  # 10 derniers messages
-        return [
-            {'role': msg.role, 'content': msg.content}
-            for msg in messages
-        ]
+    def _get_conversation_history(self, window: ConversationWindow) -> List[Dict]:
+        """Historique depuis la fenêtre en mémoire, sans le message courant (ajouté par _chat_messages)"""
+        return window.history()[:-1]
     
     def _fallback_response(self, message: str) -> Dict:
         """Réponse de secours si Ollama n'est pas disponible"""
@@ -311,20 +453,8 @@ Example: "I'm looking for a 2 bedroom apartment in Yaoundé, maximum 120000 FCFA
         return {'message': response}
     
     def _format_results(self, results) -> List[Dict]:
-        """Formate les résultats pour le JSON"""
-        return [
-            {
-                'id': housing.id,
-                'title': housing.title,
-                'price': float(housing.price),
-                'city': housing.city.name,
-                'district': housing.district.name if housing.district else None,
-                'rooms': housing.rooms,
-                'area': float(housing.area) if housing.area else None,
-                'image': housing.images.filter(is_main=True).first().image.url if housing.images.filter(is_main=True).exists() else None
-            }
-            for housing in results
-        ]
+        """Formate les résultats pour le JSON (deux requêtes, quel que soit leur nombre)"""
+        return hydrate_summaries(housing.id for housing in results)
 
 
 class VoiceRecognition:
@@ -338,15 +468,18 @@ class VoiceRecognition:
         Transcrit un fichier audio en texte
         
         Utilise la bibliothèque SpeechRecognition avec Google Speech API
-        (gratuite pour usage limité)
+        (gratuite pour usage limité), sur les seuls segments parlés
+        préparés en mémoire (audio_pipeline.py)
         """
         try:
             import speech_recognition as sr
             
-            recognizer = sr.Recognizer()
+            prepared = prepare_audio(audio_file)
+            if prepared.is_silent:
+                return ""
             
-            # Lire le fichier audio
-            with sr.AudioFile(audio_file) as source:
+            recognizer = sr.Recognizer()
+            with sr.AudioFile(prepared.wav()) as source:
                 audio = recognizer.record(source)
             
             # Transcrire
@@ -362,15 +495,18 @@ class VoiceRecognition:
         """
         Transcrit avec Whisper (OpenAI) - Option locale
         
+        Le modèle (WHISPER_MODEL) reste chargé dans le pool de processus du
+        service de transcription : seule l'inférence est payée, hors du
+        worker HTTP. Seuls les segments parlés lui sont envoyés.
+        
         Installation: pip install openai-whisper
         """
         try:
-            import whisper
-            
-            model = whisper.load_model("base")  # ou "small", "medium"
-            result = model.transcribe(audio_file, language=self.language)
-            
-            return result["text"]
-        except Exception as e:
+            audio = whisper_input(audio_file)
+            if audio is None:
+                return ""
+            return transcription_service.transcribe(audio, language=self.language)['text']
+        except (AudioDecodeError, TranscriptionError) as e:
             print(f"Erreur Whisper: {e}")
-            return ""
\ No newline at end of file
+            return ""
+
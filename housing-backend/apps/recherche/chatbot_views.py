@@ -9,13 +9,20 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
-from django.db.models import Q
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+import json
 
 from apps.housing.models import Housing, Category, City, District
 from apps.housing.serializers import HousingListSerializer
 from .ai import extract_search_criteria, generate_response, suggest_alternatives
-from .scoring import compute_smart_score
-from .utils import haversine
+from .chatbot import LocalChatbot
+from .conversation_window import conversation_store
+from .scoring import SCORING_FIELDS, compute_smart_score
+from .geo import housing_distances
+from .pagination import batches, top_k
+from . import fulltext, result_cache
 
 
 class ChatbotQueryAPIView(APIView):
@@ -48,66 +55,8 @@ class ChatbotQueryAPIView(APIView):
             # 1. Extraire les critères de la requête
             criteria = extract_search_criteria(user_message, method=method)
             
-            # 2. Ajouter coordonnées si fournies
-            if user_lat and user_lng:
-                criteria['lat'] = float(user_lat)
-                criteria['lng'] = float(user_lng)
-            
-            # 3. Construire la requête
-            queryset = Housing.objects.filter(
-                is_visible=True,
-                status='disponible'
-            ).select_related(
-                'owner', 'category', 'housing_type', 'city', 'district'
-            ).prefetch_related('images')
-            
-            # Appliquer les filtres
-            queryset = self._apply_criteria_filters(queryset, criteria)
-            
-            # 4. Calculer scores si géolocalisation
-            results = []
-            if user_lat and user_lng:
-                for housing in queryset:
-                    if housing.latitude and housing.longitude:
-                        distance = haversine(
-                            float(user_lat), float(user_lng),
-                            housing.latitude, housing.longitude
-                        )
-                        housing.distance = round(distance, 2)
-                        housing.score = compute_smart_score(housing, criteria, distance)
-                    else:
-                        housing.score = compute_smart_score(housing, criteria)
-                    results.append(housing)
-                
-                # Trier par score
-                results.sort(key=lambda x: x.score, reverse=True)
-                results = results[:10]  # Top 10
-            else:
-                results = list(queryset[:10])
-            
-            # 5. Sérialiser
-            serializer = HousingListSerializer(
-                results,
-                many=True,
-                context={'request': request}
-            )
-            
-            # 6. Générer réponse naturelle
-            bot_response = generate_response(criteria, len(results))
-            
-            # 7. Suggestions si peu de résultats
-            suggestions = []
-            if len(results) < 3:
-                suggestions = suggest_alternatives(criteria)
-            
-            return Response({
-                'message': user_message,
-                'bot_response': bot_response,
-                'criteria': criteria,
-                'count': len(results),
-                'results': serializer.data,
-                'suggestions': suggestions
-            })
+            # 2-7. Recherche et réponse
+            return Response(self._search_payload(request, user_message, criteria, user_lat, user_lng))
             
         except Exception as e:
             print(f"❌ Erreur chatbot: {e}")
@@ -121,23 +70,115 @@ class ChatbotQueryAPIView(APIView):
                 'results': []
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    def _search_payload(self, request, user_message, criteria, user_lat, user_lng) -> dict:
+        """Étapes 2 à 7 : filtres, classement, sérialisation et réponse (synchrone, ORM)"""
+        # 2. Ajouter coordonnées si fournies
+        if user_lat and user_lng:
+            criteria['lat'] = float(user_lat)
+            criteria['lng'] = float(user_lng)
+        
+        # 3. Construire la requête
+        queryset = Housing.objects.filter(
+            is_visible=True,
+            status='disponible'
+        ).select_related(
+            'owner', 'category', 'housing_type', 'city', 'district'
+        ).prefetch_related('images')
+        
+        # 4. Filtres et scores si géolocalisation (ou résultat en cache)
+        cached = result_cache.CachedSearch('chatbot', criteria, criteria.get('city_id'))
+        payload = cached.get()
+        if payload is not None:
+            results = result_cache.hydrate(queryset, payload['ids'])
+            for housing in results:
+                if housing.id in payload['scores']:
+                    housing.score = payload['scores'][housing.id]
+                if payload['distances'].get(housing.id) is not None:
+                    housing.distance = payload['distances'][housing.id]
+        else:
+            queryset = self._apply_criteria_filters(queryset, criteria)
+            results = self._ranked_results(queryset, criteria, user_lat, user_lng)
+            cached.set({
+                'ids': [h.id for h in results],
+                'scores': {h.id: h.score for h in results if hasattr(h, 'score')},
+                'distances': {h.id: getattr(h, 'distance', None) for h in results},
+            })
+        
+        # 5. Sérialiser
+        serializer = HousingListSerializer(
+            results,
+            many=True,
+            context={'request': request}
+        )
+        
+        # 6. Générer réponse naturelle
+        bot_response = generate_response(criteria, len(results))
+        
+        # 7. Suggestions si peu de résultats
+        suggestions = []
+        if len(results) < 3:
+            suggestions = suggest_alternatives(criteria)
+        
+        return {
+            'message': user_message,
+            'bot_response': bot_response,
+            'criteria': criteria,
+            'count': len(results),
+            'results': serializer.data,
+            'suggestions': suggestions
+        }
+    
+    def _ranked_results(self, queryset, criteria, user_lat, user_lng):
+        """
+        Top 10 : par score si géolocalisation, sinon ordre du queryset
+        
+        Avec géolocalisation, le queryset est parcouru par lots (colonnes du
+        scoring seulement) et seuls les 10 meilleurs sont gardés puis
+        rechargés en entier (tas borné, pagination.py).
+        """
+        if not (user_lat and user_lng):
+            return list(queryset[:10])
+        
+        rows = queryset.select_related(None).select_related('city', 'housing_type').only(
+            *SCORING_FIELDS, 'latitude', 'longitude'
+        ).prefetch_related(None).order_by()
+        
+        def scored():
+            for batch in batches(rows):
+                distances = housing_distances(float(user_lat), float(user_lng), batch)
+                for housing, distance in zip(batch, distances):
+                    if distance is not None:
+                        housing.distance = round(distance, 2)
+                        housing.score = compute_smart_score(housing, criteria, distance)
+                    else:
+                        housing.score = compute_smart_score(housing, criteria)
+                    yield housing
+        
+        best = {h.id: h for h in top_k(scored(), lambda h: (-h.score, h.id), 10).items}
+        results = result_cache.hydrate(queryset, list(best))
+        for housing in results:
+            housing.score = best[housing.id].score
+            if hasattr(best[housing.id], 'distance'):
+                housing.distance = best[housing.id].distance
+        return results
+    
     def _apply_criteria_filters(self, queryset, criteria):
         """Applique les critères extraits au queryset"""
         
         # Recherche textuelle
         if criteria.get('query'):
-            queryset = queryset.filter(
-                Q(title__icontains=criteria['query']) |
-                Q(description__icontains=criteria['query']) |
-                Q(additional_features__icontains=criteria['query'])
-            )
+            queryset = fulltext.filter_queryset(queryset, criteria['query'])
         
         # Ville
-        if criteria.get('city'):
+        if criteria.get('city_id'):
+            queryset = queryset.filter(city_id=criteria['city_id'])
+        elif criteria.get('city'):
             queryset = queryset.filter(city__name__icontains=criteria['city'])
         
         # Quartier
-        if criteria.get('district_name'):
+        if criteria.get('district_id'):
+            queryset = queryset.filter(district_id=criteria['district_id'])
+        elif criteria.get('district_name'):
             queryset = queryset.filter(district__name__icontains=criteria['district_name'])
         
         # Catégorie
@@ -168,6 +209,83 @@ class ChatbotQueryAPIView(APIView):
         return queryset
 
 
+class ChatbotStreamAPIView(APIView):
+    """
+    📡 API Chatbot en flux (Server-Sent Events)
+    
+    POST /api/recherche/chatbot/stream/
+    Body: {
+        "message": "Je cherche un studio à Yaoundé pour 50000 FCFA",
+        "session_id": "…",  # optionnel
+        "language": "fr|en"  # optionnel
+    }
+    
+    Événements : meta (session, intention), results (logements trouvés,
+    avant tout texte), token (morceaux de la réponse du LLM), done
+    (message enregistré).
+    """
+    permission_classes = [AllowAny]
+    
+    def post(self, request):
+        user_message = request.data.get('message', '').strip()
+        if not user_message:
+            return Response(
+                {'error': 'Message vide'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        chatbot = LocalChatbot(
+            language=request.data.get('language', 'fr'),
+            model=getattr(settings, 'OLLAMA_MODEL', 'mistral'),
+        )
+        user = request.user if request.user.is_authenticated else None
+        events = chatbot.chat_stream(
+            user_message,
+            session_id=request.data.get('session_id'),
+            user=user,
+            is_voice=bool(request.data.get('is_voice', False)),
+        )
+        
+        response = StreamingHttpResponse(self._sse(events), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # pas de mise en tampon par nginx
+        return response
+    
+    @staticmethod
+    def _sse(events):
+        """Met en forme chaque événement au format text/event-stream"""
+        try:
+            for event, data in events:
+                payload = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+                yield f'event: {event}\ndata: {payload}\n\n'
+        except Exception as e:
+            print(f"❌ Erreur flux chatbot: {e}")
+            yield f'event: error\ndata: {json.dumps({"error": "Erreur interne"})}\n\n'
+        finally:
+            events.close()
+
+
+class ChatbotTranscriptAPIView(APIView):
+    """
+    📜 Reprise d'une conversation
+    
+    GET /api/recherche/chatbot/conversation/<session_id>/
+    
+    Messages de la session ; les résultats des réponses sont hydratés en
+    un lot avec les données actuelles des annonces.
+    """
+    permission_classes = [AllowAny]
+    
+    def get(self, request, session_id):
+        transcript = conversation_store.transcript(session_id, request=request)
+        # Conversation d'un autre utilisateur : même réponse qu'une session inconnue
+        if transcript is None or (transcript['user_id'] and transcript['user_id'] != request.user.id):
+            return Response({'error': 'Conversation introuvable'}, status=status.HTTP_404_NOT_FOUND)
+        
+        transcript.pop('user_id')
+        return Response(transcript)
+
+
 class ChatbotSuggestionsAPIView(APIView):
     """
     💡 Suggestions de recherche
@@ -0,0 +1,222 @@
+# ============================================
+# 📁 apps/recherche/conversation_window.py
+# ============================================
+"""
+Fenêtre glissante des conversations du chatbot.
+
+Par session, le cache garde l'identifiant de la ChatbotConversation et
+les CHATBOT_HISTORY_TURNS derniers tours (un tour = message utilisateur
++ réponse). Le contexte envoyé au LLM est construit depuis cette fenêtre :
+un tour de conversation ne lit pas la table des messages, quelle que soit
+la longueur de la conversation.
+
+Les ChatbotMessage sont écrits en différé par lots (HistoryRecorder,
+réglages CHATBOT_MESSAGES_SYNC / _FLUSH_SIZE / _FLUSH_INTERVAL) ; leur
+created_at est donc l'heure d'écriture du lot, l'ordre des messages
+restant celui des identifiants.
+
+Requêtes par tour :
+  - fenêtre en cache : aucune (l'écriture est différée)
+  - fenêtre absente (nouvelle session, expiration) : get_or_create de la
+    conversation + une lecture des derniers messages
+
+Un message de l'assistant ne stocke que les identifiants classés des
+logements proposés (search_results) et l'empreinte des critères
+(criteria_hash) ; transcript() les hydrate en un lot à la réouverture
+d'une conversation, avec les données actuelles des annonces.
+
+Fonctionne avec tout backend de cache Django, choisi par
+CHATBOT_WINDOW_CACHE_ALIAS. Avec locmem, la fenêtre est propre au
+processus : une session servie par un autre processus y repart de la base.
+"""
+
+import atexit
+import json
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .history import HistoryRecorder
+from .hydrator import hydrate_summaries
+from .models import ChatbotConversation, ChatbotMessage
+
+
+KEY_PREFIX = 'chatbot:window'
+
+
+def _cache():
+    return caches[getattr(settings, 'CHATBOT_WINDOW_CACHE_ALIAS', 'default')]
+
+
+def _ttl() -> int:
+    return getattr(settings, 'CHATBOT_WINDOW_TTL', 3600)
+
+
+def _max_messages() -> int:
+    # N tours complets + le message utilisateur en cours
+    return 2 * getattr(settings, 'CHATBOT_HISTORY_TURNS', 5) + 1
+
+
+class ConversationWindow:
+    """Conversation ouverte : identifiant en base et derniers messages"""
+
+    def __init__(self, session_id: str, conversation_id: int, messages: List[Dict]):
+        self.session_id = session_id
+        self.conversation_id = conversation_id
+        self.messages = messages
+
+    def history(self) -> List[Dict]:
+        """Messages de la fenêtre au format des API de chat ({role, content})"""
+        return [dict(message) for message in self.messages]
+
+
+class ConversationStore:
+    """Fenêtres en cache, messages écrits par lots"""
+
+    def __init__(self):
+        self.recorder = HistoryRecorder(ChatbotMessage, 'CHATBOT_MESSAGES')
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f'{KEY_PREFIX}:{session_id}'
+
+    def open(self, session_id: str, user=None, language: str = 'fr') -> ConversationWindow:
+        """Fenêtre de la session, depuis le cache ou reconstruite depuis la base"""
+        state = _cache().get(self._key(session_id))
+        if state is not None:
+            return ConversationWindow(session_id, state['conversation_id'], state['messages'])
+
+        conversation, created = ChatbotConversation.objects.get_or_create(
+            session_id=session_id,
+            defaults={'user': user, 'language': language}
+        )
+        messages = [] if created else self._load_messages(conversation.id)
+        window = ConversationWindow(session_id, conversation.id, messages)
+        self._store(window)
+        return window
+
+    def append(self, window: ConversationWindow, role: str, content: str, **fields):
+        """Ajoute un message à la fenêtre et le met en file d'écriture"""
+        window.messages.append({'role': role, 'content': content})
+        del window.messages[:-_max_messages()]
+        self._store(window)
+        self.recorder.record(
+            conversation_id=window.conversation_id, role=role, content=content, **fields
+        )
+
+    def flush(self) -> int:
+        return self.recorder.flush()
+
+    def transcript(self, session_id: str, request=None) -> Optional[Dict]:
+        """
+        Conversation complète, résultats hydratés en un lot (données
+        actuelles ; les logements supprimés depuis sont omis).
+
+        Returns:
+            {session_id, language, user_id, messages: [...]} ou None
+        """
+        conversation = ChatbotConversation.objects.filter(session_id=session_id).first()
+        if conversation is None:
+            return None
+        if self.recorder.has_pending(lambda entry: entry.conversation_id == conversation.id):
+            self.recorder.flush()
+
+        messages = list(
+            conversation.messages
+            .order_by('created_at', 'id')
+            .only('id', 'role', 'content', 'is_voice', 'search_results', 'criteria_hash', 'created_at')
+        )
+        ids = list(dict.fromkeys(pk for message in messages for pk in result_ids(message.search_results)))
+        cards = {card['id']: card for card in hydrate_summaries(ids, request=request)}
+
+        return {
+            'session_id': conversation.session_id,
+            'language': conversation.language,
+            'user_id': conversation.user_id,
+            'messages': [
+                {
+                    'role': message.role,
+                    'content': message.content,
+                    'is_voice': message.is_voice,
+                    'created_at': message.created_at,
+                    'criteria_hash': message.criteria_hash,
+                    'results': [cards[pk] for pk in result_ids(message.search_results) if pk in cards],
+                }
+                for message in messages
+            ],
+        }
+
+    def forget(self, session_id: str):
+        _cache().delete(self._key(session_id))
+
+    def _store(self, window: ConversationWindow):
+        _cache().set(
+            self._key(window.session_id),
+            {'conversation_id': window.conversation_id, 'messages': window.messages},
+            _ttl(),
+        )
+
+    def _load_messages(self, conversation_id: int) -> List[Dict]:
+        # Messages encore en file pour cette conversation : les écrire d'abord
+        if self.recorder.has_pending(lambda entry: entry.conversation_id == conversation_id):
+            self.recorder.flush()
+        rows = (
+            ChatbotMessage.objects
+            .filter(conversation_id=conversation_id)
+            .order_by('-created_at', '-id')
+            .values('role', 'content')[:_max_messages()]
+        )
+        return [dict(row) for row in reversed(rows)]
+
+
+# ----------------------------------------------------------------------
+# Format compact de search_results
+# ----------------------------------------------------------------------
+
+def result_ids(stored) -> List[int]:
+    """Identifiants d'un search_results, ancien format (fiches) ou compact"""
+    ids = []
+    for item in stored or []:
+        pk = item.get('id') if isinstance(item, dict) else item
+        if isinstance(pk, int):
+            ids.append(pk)
+    return ids
+
+
+def compact_search_results(message_model=ChatbotMessage, batch_size: int = 500) -> Dict:
+    """
+    Réécrit les search_results à l'ancien format (fiches complètes) en
+    listes d'identifiants. Idempotent ; utilisable depuis une migration
+    (modèle historique) ou la commande compact_chatbot_results.
+
+    Returns:
+        {rows, compacted, bytes_before, bytes_after} (taille JSON des valeurs)
+    """
+    report = {'rows': 0, 'compacted': 0, 'bytes_before': 0, 'bytes_after': 0}
+    pending = []
+    rows = message_model.objects.only('id', 'search_results').order_by('id').iterator(chunk_size=batch_size)
+    for message in rows:
+        stored = message.search_results or []
+        if any(isinstance(item, dict) for item in stored):
+            message.search_results = result_ids(stored)
+            pending.append(message)
+            report['compacted'] += 1
+        report['rows'] += 1
+        report['bytes_before'] += _json_size(stored)
+        report['bytes_after'] += _json_size(message.search_results)
+        if len(pending) >= batch_size:
+            message_model.objects.bulk_update(pending, ['search_results'])
+            pending = []
+    if pending:
+        message_model.objects.bulk_update(pending, ['search_results'])
+    return report
+
+
+def _json_size(value) -> int:
+    return len(json.dumps(value or [], ensure_ascii=False).encode('utf-8'))
+
+
+# Instance partagée par le processus
+conversation_store = ConversationStore()
+atexit.register(conversation_store.flush)
@@ -0,0 +1,245 @@
+# ============================================
+# 📁 apps/recherche/criteria_cache.py
+# ============================================
+"""
+Mémorisation des critères extraits d'une requête en langage naturel.
+
+Deux niveaux, clé = (méthode, modèle, langue, requête normalisée,
+version des lexiques) :
+
+  1. LRU en mémoire (SEARCH_CRITERIA_LRU_SIZE entrées) : quelques
+     microsecondes pour les suggestions et formulations fréquentes.
+  2. Table CriteriaCacheEntry, pour les méthodes listées dans
+     SEARCH_CRITERIA_PERSIST_METHODS (LLM : plusieurs secondes par appel).
+     L'extraction par règles coûte moins qu'une requête SQL : elle ne
+     passe que par le LRU.
+
+Les deux niveaux expirent après SEARCH_CRITERIA_CACHE_TTL secondes. La
+version des lexiques (ai.lexicon_version) fait partie de la clé : toute
+modification d'un dictionnaire ou des règles rend les anciennes entrées
+illisibles. Un repli de l'extraction LLM sur les règles (modèle absent,
+réponse invalide) n'est jamais mémorisé.
+"""
+
+import copy
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from .models import CriteriaCacheEntry
+from .result_cache import CacheStats
+
+
+_SPACES_RE = re.compile(r'\s+')
+
+
+def normalize_query(text: str) -> str:
+    """Forme normalisée d'une requête : minuscules, espaces et apostrophes unifiés"""
+    text = text.replace('\u00a0', ' ').replace('\u2019', "'").replace('\u2018', "'")
+    return _SPACES_RE.sub(' ', text).strip().lower()
+
+
+class CriteriaCache:
+    """LRU en mémoire adossé à la table CriteriaCacheEntry"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # clé → (expiration monotonic, critères)
+        self._entries: 'OrderedDict[str, Tuple[float, Dict]]' = OrderedDict()
+        self.stats = CacheStats()
+
+    # ------------------------------------------------------------------
+    # Paramètres
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def enabled() -> bool:
+        return getattr(settings, 'SEARCH_CRITERIA_CACHE_ENABLED', True)
+
+    @staticmethod
+    def lru_size() -> int:
+        return getattr(settings, 'SEARCH_CRITERIA_LRU_SIZE', 2048)
+
+    @staticmethod
+    def ttl() -> int:
+        return getattr(settings, 'SEARCH_CRITERIA_CACHE_TTL', 7 * 24 * 3600)
+
+    @staticmethod
+    def persist_methods():
+        return getattr(settings, 'SEARCH_CRITERIA_PERSIST_METHODS', ('ollama', 'openai'))
+
+    # ------------------------------------------------------------------
+    # Lecture / calcul
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def make_key(query: str, method: str, language: str, version: str, model: str = '') -> str:
+        raw = '\x1f'.join([method, model, language, version, query])
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def get_or_extract(
+        self,
+        user_query: str,
+        method: str,
+        language: str,
+        extract: Callable[[str], Tuple[Dict, bool]],
+        version: str,
+        model: str = '',
+    ) -> Dict:
+        """
+        Critères de la requête, depuis le cache ou calculés par `extract`.
+
+        Args:
+            extract: requête normalisée → (critères, mémorisable)
+            version: version des lexiques
+            model: modèle LLM utilisé (vide pour les règles)
+
+        Returns:
+            Une copie des critères, modifiable par l'appelant
+        """
+        query = normalize_query(user_query)
+        if not self.enabled():
+            return extract(query)[0]
+
+        key = self.make_key(query, method, language, version, model)
+        criteria = self._lru_get(key)
+        self.stats.record('memory', criteria is not None)
+        if criteria is not None:
+            return copy.deepcopy(criteria)
+
+        persist = method in self.persist_methods()
+        if persist:
+            criteria = self._db_get(key)
+            self.stats.record('database', criteria is not None)
+            if criteria is not None:
+                self._lru_put(key, criteria)
+                return copy.deepcopy(criteria)
+
+        criteria, cacheable = extract(query)
+        if cacheable:
+            self._lru_put(key, copy.deepcopy(criteria))
+            if persist:
+                self._db_put(key, query, method, language, version, criteria)
+        return criteria
+
+    async def aget_or_extract(
+        self,
+        user_query: str,
+        method: str,
+        language: str,
+        extract: Callable[[str], Awaitable[Tuple[Dict, bool]]],
+        version: str,
+        model: str = '',
+    ) -> Dict:
+        """
+        Variante async de get_or_extract() : `extract` est une coroutine,
+        la table n'est lue et écrite que via sync_to_async.
+        """
+        query = normalize_query(user_query)
+        if not self.enabled():
+            return (await extract(query))[0]
+
+        key = self.make_key(query, method, language, version, model)
+        criteria = self._lru_get(key)
+        self.stats.record('memory', criteria is not None)
+        if criteria is not None:
+            return copy.deepcopy(criteria)
+
+        persist = method in self.persist_methods()
+        if persist:
+            criteria = await sync_to_async(self._db_get)(key)
+            self.stats.record('database', criteria is not None)
+            if criteria is not None:
+                self._lru_put(key, criteria)
+                return copy.deepcopy(criteria)
+
+        criteria, cacheable = await extract(query)
+        if cacheable:
+            self._lru_put(key, copy.deepcopy(criteria))
+            if persist:
+                await sync_to_async(self._db_put)(key, query, method, language, version, criteria)
+        return criteria
+
+    # ------------------------------------------------------------------
+    # Niveau 1 : LRU
+    # ------------------------------------------------------------------
+
+    def _lru_get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, criteria = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return criteria
+
+    def _lru_put(self, key: str, criteria: Dict):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl(), criteria)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.lru_size():
+                self._entries.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Niveau 2 : table CriteriaCacheEntry
+    # ------------------------------------------------------------------
+
+    def _db_get(self, key: str):
+        try:
+            return (
+                CriteriaCacheEntry.objects
+                .filter(key=key, expires_at__gt=timezone.now())
+                .values_list('criteria', flat=True)
+                .first()
+            )
+        except Exception as e:
+            print(f"⚠️ Cache des critères : lecture impossible ({e})")
+            return None
+
+    def _db_put(self, key, query, method, language, version, criteria):
+        try:
+            CriteriaCacheEntry.objects.update_or_create(
+                key=key,
+                defaults={
+                    'query_text': query[:500],
+                    'language': language,
+                    'method': method,
+                    'criteria': criteria,
+                    'lexicon_version': version,
+                    'expires_at': timezone.now() + timedelta(seconds=self.ttl()),
+                },
+            )
+        except Exception as e:
+            # Ne jamais bloquer la recherche pour le cache
+            print(f"⚠️ Cache des critères : écriture impossible ({e})")
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def clear_memory(self):
+        with self._lock:
+            self._entries.clear()
+
+    def purge(self, current_version: str = None) -> int:
+        """Supprime les lignes expirées (et celles d'une autre version des lexiques)"""
+        stale = CriteriaCacheEntry.objects.filter(expires_at__lte=timezone.now())
+        deleted = stale.delete()[0]
+        if current_version:
+            deleted += CriteriaCacheEntry.objects.exclude(lexicon_version=current_version).delete()[0]
+        return deleted
+
+
+# Instance partagée par le processus
+criteria_cache = CriteriaCache()
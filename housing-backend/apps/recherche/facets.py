@@ -0,0 +1,255 @@
+# ============================================
+# 📁 apps/recherche/facets.py
+# ============================================
+"""
+Facettes des listes de logements, calculées en une seule passe.
+
+Pour un jeu de filtres : nombre total, prix min / moyen / max,
+histogramme des prix (bornes SEARCH_FACET_PRICE_BINS, dernière tranche
+ouverte) et décomptes par catégorie, type, ville, quartier et nombre de
+chambres. De quoi afficher les compteurs « en direct » d'une interface
+de filtres.
+
+Deux moteurs, mêmes résultats :
+  - index colonnaire (listing_index.py) quand il est actif et que tous
+    les filtres s'y traduisent : masques NumPy, aucune requête sur les
+    logements ;
+  - sinon en SQL : un seul aggregate() (COUNT / SUM / MIN / MAX du prix
+    et un COUNT conditionnel par tranche de prix), puis un GROUP BY par
+    facette sur la seule clé étrangère, sans jointure.
+
+Les libellés des deux moteurs viennent d'une seule requête (UNION des
+tables de dimensions) et suivent le repli de modeltranslation (langue
+active, puis MODELTRANSLATION_FALLBACK_LANGUAGES) : mêmes noms que
+`obj.name`.
+
+Le résultat (libellés compris, donc par langue) est rangé dans le cache
+de résultats (result_cache.py, espace 'facets') sous la forme canonique
+des filtres : invalidé par les générations comme les recherches.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from django.conf import settings
+from django.db.models import CharField, Count, F, Max, Min, Q, Sum, Value
+from django.db.models.functions import Coalesce, NullIf
+from django.utils.translation import get_language
+from modeltranslation.utils import build_localized_fieldname, resolution_order
+from modeltranslation.utils import get_language as translation_language
+
+from apps.housing.models import Category, HousingType
+from apps.location.models import City, District
+from . import result_cache
+from .listing_index import STATUS_CODES, index_enabled, listing_index
+
+
+# Facettes par clé étrangère : nom dans la réponse → (relation, modèle des libellés)
+DIMENSIONS = {
+    'categories': ('category', Category),
+    'housing_types': ('housing_type', HousingType),
+    'cities': ('city', City),
+    'districts': ('district', District),
+}
+
+# Paramètres de HousingFilter traduits pour l'index : paramètre → clé de filter_mask
+INDEX_FILTERS = {
+    'category': 'category',
+    'housing_type': 'housing_type',
+    'region': 'region',
+    'city': 'city',
+    'district': 'district',
+    'min_price': 'min_price',
+    'max_price': 'max_price',
+    'min_area': 'min_area',
+    'max_area': 'max_area',
+    'rooms__gte': 'min_rooms',
+    'rooms__lte': 'max_rooms',
+    'bathrooms__gte': 'min_bathrooms',
+}
+
+# Fenêtre de la carte : paramètre → (colonne, opérateur)
+INDEX_BOUNDS = {
+    'sw_lat': ('latitude', 'gte'),
+    'ne_lat': ('latitude', 'lte'),
+    'sw_lng': ('longitude', 'gte'),
+    'ne_lng': ('longitude', 'lte'),
+    'latitude__gte': ('latitude', 'gte'),
+    'latitude__lte': ('latitude', 'lte'),
+    'longitude__gte': ('longitude', 'gte'),
+    'longitude__lte': ('longitude', 'lte'),
+}
+
+DEFAULT_PRICE_BINS = (0, 25000, 50000, 100000, 150000, 250000, 500000, 1000000)
+
+
+def price_bins() -> List[int]:
+    return sorted(getattr(settings, 'SEARCH_FACET_PRICE_BINS', DEFAULT_PRICE_BINS))
+
+
+def localized(field: str):
+    """
+    Valeur traduite d'un champ modeltranslation en SQL, ex. 'category__name'.
+
+    La colonne d'origine n'est pas réécrite dans values() : on lit les
+    colonnes par langue dans l'ordre de repli, une valeur vide passant
+    à la suivante, comme l'accès `obj.name`.
+    """
+    language = translation_language()
+    columns = [build_localized_fieldname(field, lang) for lang in resolution_order(language)]
+    return Coalesce(
+        *(NullIf(F(column), Value(''), output_field=CharField()) for column in columns),
+        F(build_localized_fieldname(field, language)),
+        output_field=CharField()
+    )
+
+
+def dimension_labels(tallies: Dict[str, Dict[int, int]]) -> Dict[str, Dict[int, str]]:
+    """Libellés des facettes non vides : {facette: {id: nom}}, en une requête UNION"""
+    parts = [
+        model.objects.filter(pk__in=list(tallies[name])).order_by()
+        .annotate(facet=Value(name, output_field=CharField()), label=localized('name'))
+        .values_list('facet', 'pk', 'label')
+        for name, (_, model) in DIMENSIONS.items() if tallies[name]
+    ]
+    labels = {name: {} for name in DIMENSIONS}
+    if parts:
+        for name, pk, label in parts[0].union(*parts[1:], all=True):
+            labels[name][pk] = label
+    return labels
+
+
+class FacetEngine:
+    """Facettes d'une liste filtrée de logements visibles (HousingViewSet)"""
+
+    def compute(self, queryset, filters: Dict) -> Dict:
+        """
+        Args:
+            queryset: logements visibles, filtres déjà appliqués (moteur SQL)
+            filters: paramètres de filtre de la requête (clé du cache,
+                     moteur index) : ceux de HousingFilter et `search`
+
+        Returns:
+            {total, price: {min, avg, max}, price_histogram, categories,
+             housing_types, cities, districts, rooms}
+        """
+        edges = price_bins()
+        cached = result_cache.CachedSearch(
+            'facets',
+            dict(filters, price_bins=edges, language=get_language()),
+            city_id=result_cache.canonical_city_id(filters.get('city'))
+        )
+        facets = cached.get()
+        if facets is None:
+            counts = self._index_counts(filters, edges)
+            if counts is None:
+                counts = self._sql_counts(queryset, edges)
+            facets = self._format(counts, edges)
+            cached.set(facets)
+        return facets
+
+    # ------------------------------------------------------------------
+    # Moteurs
+    # ------------------------------------------------------------------
+
+    def _index_counts(self, filters: Dict, edges: Sequence[int]) -> Optional[Dict]:
+        """Décomptes sur l'index colonnaire, ou None si les filtres ne s'y traduisent pas"""
+        if not index_enabled():
+            return None
+
+        index_filters, bounds, status = {}, [], None
+        try:
+            for key, value in filters.items():
+                if key in INDEX_FILTERS:
+                    index_filters[INDEX_FILTERS[key]] = value
+                elif key in INDEX_BOUNDS:
+                    bounds.append((*INDEX_BOUNDS[key], float(value)))
+                elif key == 'status' and value in STATUS_CODES:
+                    status = value
+                else:
+                    return None
+            columns = listing_index.select(
+                index_filters, ('price', 'rooms', *(f'{r}_id' for r, _ in DIMENSIONS.values())),
+                status=status, visible_only=True, bounds=bounds
+            )
+        except (TypeError, ValueError):
+            return None
+
+        prices = columns['price']
+        bins = np.searchsorted(edges, prices, side='right') - 1
+        histogram = np.bincount(bins[bins >= 0], minlength=len(edges))
+
+        def counted(values, missing=None):
+            keys, n = np.unique(values, return_counts=True)
+            return {int(k): int(c) for k, c in zip(keys, n) if k != missing}
+
+        counts = {
+            'total': int(len(prices)),
+            'price_sum': int(prices.sum()),
+            'price_min': int(prices.min()) if len(prices) else None,
+            'price_max': int(prices.max()) if len(prices) else None,
+            'histogram': [int(c) for c in histogram],
+            'rooms': counted(columns['rooms']),
+        }
+        for name, (relation, _) in DIMENSIONS.items():
+            counts[name] = counted(columns[f'{relation}_id'], missing=-1)
+        return counts
+
+    def _sql_counts(self, queryset, edges: Sequence[int]) -> Dict:
+        """Décomptes SQL : un aggregate() pour le prix, un GROUP BY par facette"""
+        queryset = queryset.select_related(None).prefetch_related(None).order_by()
+        ranges = list(zip(edges, list(edges[1:]) + [None]))
+        bins = {
+            f'bin_{i}': Count('id', filter=Q(price__gte=low) & (Q(price__lt=high) if high is not None else Q()))
+            for i, (low, high) in enumerate(ranges)
+        }
+        counts = queryset.aggregate(
+            total=Count('id'), price_sum=Sum('price'),
+            price_min=Min('price'), price_max=Max('price'), **bins
+        )
+        counts['price_sum'] = counts['price_sum'] or 0
+        counts['histogram'] = [counts.pop(f'bin_{i}') for i in range(len(edges))]
+
+        # Liste vide : inutile de relancer les GROUP BY
+        if not counts['total']:
+            counts['rooms'] = {}
+            counts.update({name: {} for name in DIMENSIONS})
+            return counts
+
+        counts['rooms'] = dict(queryset.values_list('rooms').annotate(n=Count('id')))
+        for name, (relation, _) in DIMENSIONS.items():
+            rows = queryset.values_list(f'{relation}_id').annotate(n=Count('id'))
+            counts[name] = {pk: n for pk, n in rows if pk is not None}
+        return counts
+
+    # ------------------------------------------------------------------
+    # Réponse
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _format(counts: Dict, edges: Sequence[int]) -> Dict:
+        total = counts['total']
+        highs = list(edges[1:]) + [None]
+        facets = {
+            'total': total,
+            'price': {
+                'min': counts['price_min'],
+                'avg': counts['price_sum'] / total if total else None,
+                'max': counts['price_max'],
+            },
+            'price_histogram': [
+                {'min': low, 'max': high, 'count': n}
+                for low, high, n in zip(edges, highs, counts['histogram'])
+            ],
+            'rooms': [{'value': rooms, 'count': n} for rooms, n in sorted(counts['rooms'].items())],
+        }
+        labels = dimension_labels(counts)
+        for name in DIMENSIONS:
+            facets[name] = sorted(
+                ({'id': pk, 'name': labels[name].get(pk), 'count': n} for pk, n in counts[name].items()),
+                key=lambda f: (-f['count'], str(f['name']))
+            )
+        return facets
+
+
+facet_engine = FacetEngine()
@@ -0,0 +1,376 @@
+# ============================================
+# 📁 apps/recherche/fulltext.py
+# ============================================
+"""
+Recherche plein texte sur les logements.
+
+Remplace les chaînes de Q(...__icontains=...) (LIKE '%x%', donc parcours
+complet de la table) par un index inversé avec classement par pertinence :
+
+  - SQLite     : table virtuelle FTS5, tokenizer unicode61 avec
+                 suppression des accents, classement bm25()
+  - PostgreSQL : table tsvector + index GIN, textes repliés (sans accents)
+                 côté Python, classement ts_rank_cd()
+
+Les deux implémentations exposent la même interface (FullTextBackend).
+Le document indexé couvre les colonnes modeltranslation (title_fr/en,
+description_fr/en, additional_features_fr/en) ainsi que les noms de la
+ville, du quartier et de la catégorie, dans les deux langues : "yaounde"
+trouve donc "Yaoundé".
+
+L'index est tenu à jour par les signaux (voir signals.py) et peut être
+reconstruit avec : python manage.py rebuild_fulltext_index
+"""
+
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection as default_connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+
+FTS_TABLE = 'recherche_housing_fts'
+PG_TABLE = 'recherche_housing_search'
+
+# Sélection des textes à indexer (une ligne par logement)
+DOCUMENT_SELECT = """
+    SELECT h.id,
+           COALESCE(h.title_fr, h.title, ''), COALESCE(h.title_en, ''),
+           COALESCE(h.description_fr, h.description, ''), COALESCE(h.description_en, ''),
+           COALESCE(h.additional_features_fr, h.additional_features, ''),
+           COALESCE(h.additional_features_en, ''),
+           COALESCE(c.name_fr, c.name, ''), COALESCE(c.name_en, ''),
+           COALESCE(d.name_fr, d.name, ''), COALESCE(d.name_en, ''),
+           COALESCE(cat.name_fr, cat.name, ''), COALESCE(cat.name_en, '')
+      FROM housing_housing h
+      LEFT JOIN location_city c ON c.id = h.city_id
+      LEFT JOIN location_district d ON d.id = h.district_id
+      LEFT JOIN housing_category cat ON cat.id = h.category_id
+"""
+
+# Colonnes utilisables pour une réindexation ciblée
+REFRESH_COLUMNS = ('id', 'city_id', 'district_id', 'category_id')
+
+
+# ---------------------------------------------------------------------------
+# Normalisation du texte
+# ---------------------------------------------------------------------------
+
+def fold(text: str) -> str:
+    """Minuscules sans accents : "Yaoundé" → "yaounde" """
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def query_terms(query: str) -> List[str]:
+    """Découpe une requête en termes indexables (repliés, dédupliqués)"""
+    terms = re.findall(r'\w+', fold(query))
+    return list(dict.fromkeys(t for t in terms if len(t) >= 2))
+
+
+def _documents(row: Tuple) -> Tuple[int, Dict[str, str]]:
+    """Regroupe une ligne de DOCUMENT_SELECT par champ indexé"""
+    (pk, title_fr, title_en, description_fr, description_en,
+     features_fr, features_en, city_fr, city_en, district_fr, district_en,
+     category_fr, category_en) = row
+    return pk, {
+        'title_fr': title_fr,
+        'title_en': title_en,
+        'description_fr': description_fr,
+        'description_en': description_en,
+        'features_fr': features_fr,
+        'features_en': features_en,
+        'place': ' '.join((city_fr, city_en, district_fr, district_en)),
+        'category': ' '.join((category_fr, category_en)),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Interface commune
+# ---------------------------------------------------------------------------
+
+class FullTextBackend:
+    """Interface d'un moteur plein texte pour les logements"""
+
+    vendor = None
+
+    def __init__(self, connection=None):
+        self.connection = connection or default_connection
+
+    def create_schema(self):
+        raise NotImplementedError
+
+    def drop_schema(self):
+        raise NotImplementedError
+
+    def refresh(self, column: str = 'id', values: Optional[Iterable[int]] = None):
+        """
+        Réindexe les logements dont `column` vaut l'une des `values`
+        (tous les logements si values est None).
+        """
+        raise NotImplementedError
+
+    def remove(self, housing_ids: Iterable[int]):
+        raise NotImplementedError
+
+    def match_sql(self, terms: List[str]) -> Tuple[str, list]:
+        """Sous-requête SQL retournant les ids des logements correspondants"""
+        raise NotImplementedError
+
+    def rank(self, query: str, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Retourne [(housing_id, score)] du plus pertinent au moins pertinent"""
+        raise NotImplementedError
+
+    # ------------------------------------------------------------------
+
+    def rebuild(self):
+        self.refresh(values=None)
+
+    def filter_queryset(self, queryset, query: str):
+        """Restreint un queryset de Housing aux logements correspondant à `query`"""
+        terms = query_terms(query)
+        if not terms:
+            return queryset
+        sql, params = self.match_sql(terms)
+        return queryset.filter(id__in=RawSQL(sql, params))
+
+    def _where(self, column: str, values: Optional[Iterable[int]]) -> Tuple[str, list]:
+        if values is None:
+            return '', []
+        if column not in REFRESH_COLUMNS:
+            raise ValueError(f"Colonne de réindexation invalide : {column}")
+        values = list(values)
+        placeholders = ', '.join(['%s'] * len(values))
+        return f' WHERE h.{column} IN ({placeholders})', values
+
+
+class SQLiteFTS5Backend(FullTextBackend):
+    """Index FTS5 (SQLite ≥ 3.9) avec classement bm25"""
+
+    vendor = 'sqlite'
+
+    # Poids bm25 par colonne, dans l'ordre de création de la table
+    COLUMNS = ('title_fr', 'title_en', 'description_fr', 'description_en',
+               'features_fr', 'features_en', 'place', 'category')
+    WEIGHTS = (10.0, 10.0, 1.0, 1.0, 2.0, 2.0, 5.0, 5.0)
+
+    def create_schema(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"{', '.join(self.COLUMNS)}, "
+                f"tokenize='unicode61 remove_diacritics 2')"
+            )
+
+    def drop_schema(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+    def refresh(self, column='id', values=None):
+        where, params = self._where(column, values)
+        if values is not None and not params:
+            return
+        with self.connection.cursor() as cursor:
+            if values is None:
+                cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            else:
+                cursor.execute(
+                    f"DELETE FROM {FTS_TABLE} WHERE rowid IN "
+                    f"(SELECT h.id FROM housing_housing h{where})",
+                    params,
+                )
+            cursor.execute(DOCUMENT_SELECT + where, params)
+            rows = [_documents(row) for row in cursor.fetchall()]
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE}(rowid, {', '.join(self.COLUMNS)}) "
+                f"VALUES (%s, {', '.join(['%s'] * len(self.COLUMNS))})",
+                [(pk, *(doc[c] for c in self.COLUMNS)) for pk, doc in rows],
+            )
+
+    def remove(self, housing_ids):
+        housing_ids = list(housing_ids)
+        if not housing_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(housing_ids))
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", housing_ids)
+
+    @staticmethod
+    def _match_expression(terms: List[str]) -> str:
+        # Chaque terme en préfixe ("stud"* trouve "studio"), reliés par OR
+        return ' OR '.join(f'"{t}"*' for t in terms)
+
+    def match_sql(self, terms):
+        return (
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+            [self._match_expression(terms)],
+        )
+
+    def rank(self, query, limit=None):
+        terms = query_terms(query)
+        if not terms:
+            return []
+        weights = ', '.join(str(w) for w in self.WEIGHTS)
+        sql = (
+            f"SELECT rowid, bm25({FTS_TABLE}, {weights}) AS score FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s ORDER BY score"
+        )
+        params = [self._match_expression(terms)]
+        if limit:
+            sql += " LIMIT %s"
+            params.append(limit)
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            # bm25() est négatif : plus petit = plus pertinent
+            return [(pk, -score) for pk, score in cursor.fetchall()]
+
+
+class PostgresBackend(FullTextBackend):
+    """
+    Index tsvector + GIN (PostgreSQL).
+
+    Le repliement des accents est fait en Python (fold) à l'indexation et
+    à la requête : l'extension unaccent n'est pas nécessaire. Le classement
+    utilise ts_rank_cd, l'équivalent PostgreSQL le plus proche de bm25.
+    """
+
+    vendor = 'postgresql'
+
+    # Poids tsvector : A = titres, B = lieu et catégorie, C = descriptions
+    WEIGHTED_FIELDS = (
+        ('A', ('title_fr', 'title_en')),
+        ('B', ('place', 'category', 'features_fr', 'features_en')),
+        ('C', ('description_fr', 'description_en')),
+    )
+
+    def create_schema(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {PG_TABLE} ("
+                f"housing_id bigint PRIMARY KEY, document tsvector NOT NULL)"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {PG_TABLE}_document_idx "
+                f"ON {PG_TABLE} USING GIN (document)"
+            )
+
+    def drop_schema(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {PG_TABLE}")
+
+    def refresh(self, column='id', values=None):
+        where, params = self._where(column, values)
+        if values is not None and not params:
+            return
+        vector = ' || '.join(
+            f"setweight(to_tsvector('simple', %s), '{weight}')"
+            for weight, _ in self.WEIGHTED_FIELDS
+        )
+        with self.connection.cursor() as cursor:
+            if values is None:
+                cursor.execute(f"DELETE FROM {PG_TABLE}")
+            cursor.execute(DOCUMENT_SELECT + where, params)
+            rows = [_documents(row) for row in cursor.fetchall()]
+            cursor.executemany(
+                f"INSERT INTO {PG_TABLE} (housing_id, document) VALUES (%s, {vector}) "
+                f"ON CONFLICT (housing_id) DO UPDATE SET document = EXCLUDED.document",
+                [
+                    (pk, *(fold(' '.join(doc[f] for f in fields)) for _, fields in self.WEIGHTED_FIELDS))
+                    for pk, doc in rows
+                ],
+            )
+
+    def remove(self, housing_ids):
+        housing_ids = list(housing_ids)
+        if not housing_ids:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {PG_TABLE} WHERE housing_id = ANY(%s)", [housing_ids])
+
+    @staticmethod
+    def _tsquery(terms: List[str]) -> str:
+        return ' | '.join(f'{t}:*' for t in terms)
+
+    def match_sql(self, terms):
+        return (
+            f"SELECT housing_id FROM {PG_TABLE} "
+            f"WHERE document @@ to_tsquery('simple', %s)",
+            [self._tsquery(terms)],
+        )
+
+    def rank(self, query, limit=None):
+        terms = query_terms(query)
+        if not terms:
+            return []
+        sql = (
+            f"SELECT housing_id, ts_rank_cd(document, q) AS score "
+            f"FROM {PG_TABLE}, to_tsquery('simple', %s) q "
+            f"WHERE document @@ q ORDER BY score DESC"
+        )
+        params = [self._tsquery(terms)]
+        if limit:
+            sql += " LIMIT %s"
+            params.append(limit)
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return list(cursor.fetchall())
+
+
+BACKENDS = {
+    'sqlite': SQLiteFTS5Backend,
+    'postgresql': PostgresBackend,
+}
+
+
+def get_backend(connection=None) -> Optional[FullTextBackend]:
+    """
+    Retourne le moteur plein texte adapté à la base de données, ou None
+    si SEARCH_FULLTEXT_BACKEND = 'none' ou si la base n'est pas supportée.
+    """
+    connection = connection or default_connection
+    choice = getattr(settings, 'SEARCH_FULLTEXT_BACKEND', 'auto')
+    if choice == 'none':
+        return None
+    vendor = connection.vendor if choice == 'auto' else choice
+    backend_class = BACKENDS.get(vendor)
+    if backend_class is None or backend_class.vendor != connection.vendor:
+        return None
+    return backend_class(connection)
+
+
+# ---------------------------------------------------------------------------
+# Points d'entrée pour les vues
+# ---------------------------------------------------------------------------
+
+def _icontains_filter(queryset, query: str):
+    """Ancien filtre LIKE, utilisé quand aucun moteur n'est disponible"""
+    q_objects = Q()
+    for term in query.lower().split():
+        q_objects |= Q(title__icontains=term)
+        q_objects |= Q(description__icontains=term)
+        q_objects |= Q(city__name__icontains=term)
+        q_objects |= Q(district__name__icontains=term)
+        q_objects |= Q(category__name__icontains=term)
+        q_objects |= Q(additional_features__icontains=term)
+    return queryset.filter(q_objects)
+
+
+def filter_queryset(queryset, query: str):
+    """Filtre plein texte d'un queryset de Housing (OR entre les termes)"""
+    if not query or not query.strip():
+        return queryset
+    backend = get_backend()
+    if backend is None:
+        return _icontains_filter(queryset, query)
+    return backend.filter_queryset(queryset, query)
+
+
+def relevance(query: str) -> Dict[int, float]:
+    """Score de pertinence par housing_id (vide si aucun moteur)"""
+    backend = get_backend()
+    if backend is None or not query:
+        return {}
+    return dict(backend.rank(query))
@@ -4,7 +4,10 @@
 
 import random
 import math
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
 from django.db.models import Q
 from apps.housing.models import Housing
 
@@ -20,12 +23,15 @@ class GeneticSearchOptimizer:
         population_size: int = 50,
         generations: int = 30,
         mutation_rate: float = 0.1,
-        crossover_rate: float = 0.7
+        crossover_rate: float = 0.7,
+        seed: Optional[int] = None
     ):
         self.population_size = population_size
         self.generations = generations
         self.mutation_rate = mutation_rate
         self.crossover_rate = crossover_rate
+        # Générateur dédié si une graine est fournie (résultats reproductibles)
+        self._rng = random.Random(seed) if seed is not None else random
     
     def optimize(
         self,
@@ -87,7 +93,7 @@ class GeneticSearchOptimizer:
         
         for _ in range(self.population_size):
             # Créer un ordre aléatoire des résultats
-            individual = random.sample(result_indices, len(result_indices))
+            individual = self._rng.sample(result_indices, len(result_indices))
             population.append(individual)
         
         return population
@@ -134,7 +140,7 @@ class GeneticSearchOptimizer:
         
         for _ in range(self.population_size):
             # Sélectionner aléatoirement tournament_size individus
-            tournament_indices = random.sample(range(len(population)), tournament_size)
+            tournament_indices = self._rng.sample(range(len(population)), tournament_size)
             tournament_fitness = [fitness_scores[i] for i in tournament_indices]
             
             # Sélectionner le meilleur
@@ -151,7 +157,7 @@ class GeneticSearchOptimizer:
             parent1 = population[i]
             parent2 = population[i + 1] if i + 1 < len(population) else population[0]
             
-            if random.random() < self.crossover_rate:
+            if self._rng.random() < self.crossover_rate:
                 child1, child2 = self._order_crossover(parent1, parent2)
                 offspring.extend([child1, child2])
             else:
@@ -168,7 +174,7 @@ class GeneticSearchOptimizer:
         size = len(parent1)
         
         # Choisir deux points de croisement
-        cx_point1, cx_point2 = sorted(random.sample(range(size), 2))
+        cx_point1, cx_point2 = sorted(self._rng.sample(range(size), 2))
         
         # Créer les enfants
         child1 = [-1] * size
@@ -203,14 +209,177 @@ class GeneticSearchOptimizer:
     ) -> List[List[int]]:
         """Mutation par échange (Swap Mutation)"""
         for individual in population:
-            if random.random() < self.mutation_rate:
+            if self._rng.random() < self.mutation_rate:
                 # Échanger deux positions aléatoires
-                pos1, pos2 = random.sample(range(len(individual)), 2)
+                pos1, pos2 = self._rng.sample(range(len(individual)), 2)
                 individual[pos1], individual[pos2] = individual[pos2], individual[pos1]
         
         return population
 
 
+class VectorizedGeneticSearchOptimizer(GeneticSearchOptimizer):
+    """
+    Même algorithme génétique, population stockée en matrice NumPy.
+
+    Chaque ligne est une permutation des indices de résultats. Fitness,
+    sélection par tournoi, croisement par ordre (OX) et mutation par
+    échange sont appliqués à toute la population en opérations sur
+    tableaux. Les tirages aléatoires sont faits avec le même générateur
+    et dans le même ordre que GeneticSearchOptimizer : à graine égale,
+    les deux moteurs renvoient exactement le même classement.
+    """
+
+    def optimize(
+        self,
+        initial_results: List[Housing],
+        user_preferences: Dict,
+        search_criteria: Dict
+    ) -> List[Housing]:
+        if len(initial_results) <= 10:
+            return initial_results
+
+        population = np.array(self._initialize_population(initial_results), dtype=np.int64)
+        diversity_weight = user_preferences.get('diversity_weight', 0.2)
+
+        for generation in range(self.generations):
+            fitness_scores = self._batch_fitness(population, diversity_weight)
+            selected = self._batch_selection(population, fitness_scores)
+            offspring = self._batch_crossover(selected)
+            population = self._batch_mutation(offspring)
+
+        fitness_scores = self._batch_fitness(population, diversity_weight)
+        best_solution = population[int(np.argmax(fitness_scores))]
+
+        return [initial_results[i] for i in best_solution.tolist()]
+
+    def _batch_fitness(self, population: np.ndarray, diversity_weight: float) -> np.ndarray:
+        """_calculate_fitness pour toutes les lignes à la fois"""
+        # Le bonus de position ne dépend que de la longueur : sommé comme en Python
+        position_score = 0.0
+        for position in range(min(20, population.shape[1])):
+            position_score += math.exp(-position / 5)
+
+        top = np.sort(population[:, :10], axis=1)
+        unique_counts = 1 + np.count_nonzero(np.diff(top, axis=1), axis=1)
+        diversity = unique_counts / top.shape[1]
+        return position_score + diversity * diversity_weight
+
+    def _batch_selection(self, population: np.ndarray, fitness_scores: np.ndarray) -> np.ndarray:
+        """Sélection par tournoi : tirages en Python, arbitrage vectorisé"""
+        tournament_size = 5
+        tournaments = np.array([
+            self._rng.sample(range(len(population)), tournament_size)
+            for _ in range(self.population_size)
+        ], dtype=np.int64)
+        # argmax renvoie le premier maximum, comme list.index(max(...))
+        winners = tournaments[
+            np.arange(len(tournaments)), np.argmax(fitness_scores[tournaments], axis=1)
+        ]
+        return population[winners]
+
+    def _batch_crossover(self, population: np.ndarray) -> np.ndarray:
+        """Croisement par ordre (OX) de toutes les paires en une passe"""
+        count, size = population.shape
+        first = np.arange(0, count, 2)
+        second = np.where(first + 1 < count, first + 1, 0)
+
+        # Tirages dans l'ordre du moteur Python : une décision par paire,
+        # puis les deux points de coupe si le croisement a lieu
+        crossed, cuts = [], []
+        for _ in first:
+            if self._rng.random() < self.crossover_rate:
+                crossed.append(True)
+                cuts.append(sorted(self._rng.sample(range(size), 2)))
+            else:
+                crossed.append(False)
+
+        parents1, parents2 = population[first], population[second]
+        offspring = np.empty((2 * len(first), size), dtype=population.dtype)
+        offspring[0::2] = parents1
+        offspring[1::2] = parents2
+
+        crossed = np.array(crossed, dtype=bool)
+        if crossed.any():
+            cuts = np.array(cuts, dtype=np.int64)
+            p1, p2 = parents1[crossed], parents2[crossed]
+            start = np.concatenate([cuts[:, 0], cuts[:, 0]])
+            end = np.concatenate([cuts[:, 1], cuts[:, 1]])
+            children = self._order_crossover_batch(
+                np.concatenate([p1, p2]), np.concatenate([p2, p1]), start, end
+            )
+            pairs = np.flatnonzero(crossed)
+            offspring[2 * pairs] = children[:len(pairs)]
+            offspring[2 * pairs + 1] = children[len(pairs):]
+
+        return offspring[:self.population_size]
+
+    @staticmethod
+    def _order_crossover_batch(
+        keep: np.ndarray,
+        fill: np.ndarray,
+        start: np.ndarray,
+        end: np.ndarray
+    ) -> np.ndarray:
+        """
+        Enfants OX : segment [start, end) copié depuis `keep`, le reste
+        rempli dans l'ordre de `fill` en partant de `end` (avec retour
+        au début), comme _order_crossover / _fill_remaining.
+        """
+        rows, size = keep.shape
+        columns = np.arange(size)
+        row_index = np.arange(rows)[:, None]
+
+        in_segment = (columns >= start[:, None]) & (columns < end[:, None])
+        children = np.where(in_segment, keep, -1)
+
+        # Valeurs déjà présentes dans chaque enfant
+        taken = np.zeros((rows, size), dtype=bool)
+        taken[row_index, keep] = in_segment
+
+        # Parent de remplissage et positions libres, lus à partir de `end`
+        rotation = (columns + end[:, None]) % size
+        rotated_fill = fill[row_index, rotation]
+        free_slots = columns < (size - (end - start))[:, None]
+
+        values = rotated_fill[~taken[row_index, rotated_fill]]
+        children[np.broadcast_to(row_index, (rows, size))[free_slots], rotation[free_slots]] = values
+        return children
+
+    def _batch_mutation(self, population: np.ndarray) -> np.ndarray:
+        """Mutation par échange : tirages en Python, échanges vectorisés"""
+        size = population.shape[1]
+        rows, left, right = [], [], []
+        for row in range(len(population)):
+            if self._rng.random() < self.mutation_rate:
+                pos1, pos2 = self._rng.sample(range(size), 2)
+                rows.append(row)
+                left.append(pos1)
+                right.append(pos2)
+
+        if rows:
+            rows = np.array(rows)
+            left, right = np.array(left), np.array(right)
+            values_left = population[rows, left]
+            population[rows, left] = population[rows, right]
+            population[rows, right] = values_left
+        return population
+
+
+GENETIC_ENGINES = {
+    'python': GeneticSearchOptimizer,
+    'numpy': VectorizedGeneticSearchOptimizer,
+}
+
+
+def get_genetic_optimizer(engine: Optional[str] = None, **kwargs) -> GeneticSearchOptimizer:
+    """
+    Instancie le moteur génétique demandé
+    (par défaut : settings.SEARCH_GENETIC_ENGINE, 'numpy' ou 'python')
+    """
+    engine = engine or getattr(settings, 'SEARCH_GENETIC_ENGINE', 'numpy')
+    return GENETIC_ENGINES.get(engine, GeneticSearchOptimizer)(**kwargs)
+
+
 def calculate_housing_score(
     housing: Housing,
     user_preferences: Dict,
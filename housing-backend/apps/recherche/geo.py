@@ -0,0 +1,126 @@
+# ============================================
+# 📁 apps/recherche/geo.py
+# ============================================
+"""
+Noyau géographique partagé : distance de Haversine et boîte englobante.
+
+Une seule implémentation pour tout le projet (recherche, NLP, chatbot,
+carte "Autour de moi", algorithme génétique) :
+
+  - haversine()       : distance entre deux points (scalaire, math)
+  - distances_from()  : distance d'un point vers un tableau de points
+                        (vectorisé NumPy, repli scalaire si NumPy absent)
+  - bounding_box()    : boîte lat/lng contenant un cercle de rayon donné,
+                        pour pré-filtrer en base avant le calcul exact
+  - within_bbox()     : masque des points contenus dans une boîte
+"""
+
+import math
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.0
+
+
+def haversine(lat1, lon1, lat2, lon2) -> float:
+    """
+    Calcule la distance entre deux points GPS en kilomètres
+    Formule de Haversine
+
+    Args:
+        lat1, lon1: Coordonnées du point 1
+        lat2, lon2: Coordonnées du point 2
+
+    Returns:
+        float: Distance en kilomètres
+    """
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    delta_phi = math.radians(lat2 - lat1)
+    delta_lambda = math.radians(lon2 - lon1)
+
+    a = (
+        math.sin(delta_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2) ** 2
+    )
+
+    return EARTH_RADIUS_KM * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def _distances_scalar(lat: float, lng: float, lats: Sequence, lngs: Sequence) -> List[float]:
+    return [
+        math.nan if (la is None or lo is None) else haversine(lat, lng, la, lo)
+        for la, lo in zip(lats, lngs)
+    ]
+
+
+def distances_from(lat: float, lng: float, lats: Sequence, lngs: Sequence):
+    """
+    Distances (km) d'un point vers un ensemble de points.
+
+    Les coordonnées manquantes (None / NaN) donnent NaN.
+
+    Returns:
+        np.ndarray de float64 si NumPy est disponible, sinon list[float]
+    """
+    if not NUMPY_AVAILABLE:
+        return _distances_scalar(lat, lng, lats, lngs)
+
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    phi1 = math.radians(lat)
+    phi2 = np.radians(lats)
+    delta_phi = phi2 - phi1
+    delta_lambda = np.radians(lngs - lng)
+
+    a = np.sin(delta_phi / 2) ** 2 + math.cos(phi1) * np.cos(phi2) * np.sin(delta_lambda / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def bounding_box(lat: float, lng: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """
+    Boîte englobante (approximation) d'un cercle de rayon radius_km.
+
+    Returns:
+        (min_lat, max_lat, min_lng, max_lng)
+    """
+    lat_delta = radius_km / KM_PER_DEGREE
+    cos_lat = math.cos(math.radians(lat))
+    lng_delta = 180.0 if cos_lat < 1e-6 else radius_km / (KM_PER_DEGREE * cos_lat)
+    return lat - lat_delta, lat + lat_delta, lng - lng_delta, lng + lng_delta
+
+
+def within_bbox(lats: Sequence, lngs: Sequence, bbox: Tuple[float, float, float, float]):
+    """Masque booléen des points contenus dans la boîte (NaN → False)"""
+    min_lat, max_lat, min_lng, max_lng = bbox
+    if not NUMPY_AVAILABLE:
+        return [
+            la is not None and lo is not None
+            and min_lat <= la <= max_lat and min_lng <= lo <= max_lng
+            for la, lo in zip(lats, lngs)
+        ]
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    return (lats >= min_lat) & (lats <= max_lat) & (lngs >= min_lng) & (lngs <= max_lng)
+
+
+def housing_distances(lat: float, lng: float, housings) -> List[Optional[float]]:
+    """
+    Distances (km) entre un point et une liste de logements, en un seul
+    calcul vectorisé. None pour les logements sans coordonnées.
+    """
+    housings = list(housings)
+    if not housings:
+        return []
+    lats = [h.latitude if h.latitude is not None else math.nan for h in housings]
+    lngs = [h.longitude if h.longitude is not None else math.nan for h in housings]
+    distances = distances_from(lat, lng, lats, lngs)
+    return [None if math.isnan(d) else float(d) for d in distances]
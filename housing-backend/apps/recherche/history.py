@@ -0,0 +1,129 @@
+# ============================================
+# 📁 apps/recherche/history.py
+# ============================================
+"""
+Enregistrement différé (write-behind) de l'historique de recherche.
+
+Les vues de recherche ne font plus d'INSERT dans la requête : chaque
+entrée SearchHistory est construite (langue active comprise) puis mise
+en file en mémoire. La file est vidée par bulk_create :
+
+  - dès qu'elle atteint SEARCH_HISTORY_FLUSH_SIZE entrées
+  - au plus tard SEARCH_HISTORY_FLUSH_INTERVAL secondes après la
+    première entrée en attente (thread de fond)
+  - à l'arrêt du processus (atexit)
+
+SEARCH_HISTORY_SYNC = True revient à une écriture immédiate (tests,
+scripts). En cas d'échec du lot, les entrées sont réessayées une par
+une pour ne perdre que les lignes invalides.
+
+La même file sert à d'autres modèles (messages du chatbot, voir
+conversation_window.py) : HistoryRecorder(modèle, préfixe des réglages).
+"""
+
+import atexit
+import threading
+from typing import Callable, List
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .models import SearchHistory
+
+
+class HistoryRecorder:
+    """File d'entrées d'un modèle (SearchHistory par défaut) vidée par lots"""
+
+    def __init__(self, model=SearchHistory, setting_prefix: str = 'SEARCH_HISTORY'):
+        self.model = model
+        self.setting_prefix = setting_prefix
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: List[SearchHistory] = []
+        self._timer = None
+
+    # ------------------------------------------------------------------
+    # Paramètres
+    # ------------------------------------------------------------------
+
+    def sync_mode(self) -> bool:
+        return getattr(settings, f'{self.setting_prefix}_SYNC', False)
+
+    def flush_size(self) -> int:
+        return getattr(settings, f'{self.setting_prefix}_FLUSH_SIZE', 50)
+
+    def flush_interval(self) -> float:
+        return getattr(settings, f'{self.setting_prefix}_FLUSH_INTERVAL', 5.0)
+
+    # ------------------------------------------------------------------
+    # Enregistrement
+    # ------------------------------------------------------------------
+
+    def record(self, **fields):
+        """Construit une entrée du modèle et la met en file"""
+        entry = self.model(**fields)
+        if self.sync_mode():
+            self._write([entry])
+            return
+
+        with self._lock:
+            self._pending.append(entry)
+            full = len(self._pending) >= self.flush_size()
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval(), self._flush_in_background)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if full:
+            threading.Thread(target=self._flush_in_background, daemon=True).start()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def has_pending(self, predicate: Callable) -> bool:
+        """Une entrée en attente vérifie-t-elle `predicate` ?"""
+        with self._lock:
+            return any(predicate(entry) for entry in self._pending)
+
+    # ------------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------------
+
+    def flush(self) -> int:
+        """Écrit toutes les entrées en attente ; retourne leur nombre"""
+        with self._lock:
+            batch, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if batch:
+            self._write(batch)
+        return len(batch)
+
+    def _flush_in_background(self):
+        # Thread dédié : sa connexion à la base est fermée après usage
+        try:
+            self.flush()
+        finally:
+            close_old_connections()
+
+    def _write(self, batch: List):
+        with self._flush_lock:
+            try:
+                self.model.objects.bulk_create(batch)
+                return
+            except Exception as e:
+                print(f"⚠️ {self.model.__name__} : lot de {len(batch)} refusé ({e}), écriture unitaire")
+
+            for entry in batch:
+                try:
+                    entry.save()
+                except Exception as e:
+                    # Log l'erreur mais ne pas bloquer la recherche
+                    print(f"Erreur sauvegarde historique: {e}")
+
+
+# Instance partagée par le processus
+history_recorder = HistoryRecorder()
+atexit.register(history_recorder.flush)
@@ -0,0 +1,69 @@
+# ============================================
+# 📁 apps/recherche/hydrator.py
+# ============================================
+"""
+Fiches compactes de logements pour les réponses hors DRF (chatbot, flux SSE).
+
+hydrate_summaries(ids) fait toujours deux requêtes, quel que soit le
+nombre de logements : les logements avec ville et quartier
+(select_related), puis leurs images. L'image retenue est l'image
+principale, sinon la première image (même règle que
+HousingListSerializer.get_main_image). L'ordre des ids est conservé ; les
+ids inconnus sont ignorés.
+"""
+
+from typing import Dict, Iterable, List
+
+from apps.housing.models import Housing, HousingImage
+
+
+def hydrate_summaries(ids: Iterable[int], request=None) -> List[Dict]:
+    """
+    Args:
+        ids: identifiants des logements, dans l'ordre d'affichage
+        request: requête HTTP (optionnel) pour des URL d'images absolues
+
+    Returns:
+        [{id, title, price, city, district, rooms, area, image}, ...]
+    """
+    ids = list(ids)
+    if not ids:
+        return []
+
+    housings = Housing.objects.filter(id__in=ids).select_related('city', 'district').in_bulk()
+    images = _main_images(housings.keys())
+
+    summaries = []
+    for pk in ids:
+        housing = housings.get(pk)
+        if housing is None:
+            continue
+        image = images.get(pk)
+        image_url = image.image.url if image is not None and image.image else None
+        if image_url and request is not None:
+            image_url = request.build_absolute_uri(image_url)
+        summaries.append({
+            'id': housing.id,
+            'title': housing.title,
+            'price': float(housing.price),
+            'city': housing.city.name,
+            'district': housing.district.name if housing.district else None,
+            'rooms': housing.rooms,
+            'area': float(housing.area) if housing.area else None,
+            'image': image_url,
+        })
+    return summaries
+
+
+def _main_images(housing_ids) -> Dict[int, HousingImage]:
+    """Image principale (sinon la première) de chaque logement, en une requête"""
+    images: Dict[int, HousingImage] = {}
+    rows = (
+        HousingImage.objects
+        .filter(housing_id__in=list(housing_ids))
+        .only('id', 'housing_id', 'image', 'is_main', 'uploaded_at')
+        .order_by('housing_id', '-is_main', 'uploaded_at')
+    )
+    for image in rows:
+        images.setdefault(image.housing_id, image)
+    return images
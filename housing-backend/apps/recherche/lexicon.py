@@ -0,0 +1,107 @@
+# ============================================
+# 📁 apps/recherche/lexicon.py
+# ============================================
+"""
+Reconnaissance de mots-clés en une passe.
+
+Un LexiconMatcher regroupe plusieurs dictionnaires (villes, quartiers,
+catégories, équipements…) dans une seule expression régulière compilée :
+une alternation de tous les mots-clés, du plus long au plus court,
+encadrée par des limites de mot. Un seul finditer() sur la requête
+renvoie donc tous les mots-clés présents, sans chevauchement et en
+privilégiant l'expression la plus longue à une position donnée
+(« salle de bain » plutôt que « bain », « non meublé » plutôt que
+« meublé »).
+
+Un même mot-clé peut appartenir à plusieurs groupes : chaque groupe
+reçoit alors son propre Hit. Des terminaisons optionnelles (suffixes)
+couvrent les accords sans dupliquer les dictionnaires : avec ('e', 's',
+'es'), « sécurisé » reconnaît aussi « sécurisée(s) ».
+"""
+
+import re
+from collections import namedtuple
+from typing import Dict, Iterable, List, Mapping, Optional
+
+
+Hit = namedtuple('Hit', 'group keyword value start end rank')
+Hit.__doc__ = """
+Mot-clé reconnu.
+
+    group   : nom du dictionnaire d'origine
+    keyword : mot-clé du dictionnaire (sans terminaison)
+    value   : valeur associée dans le dictionnaire
+    start, end : position dans le texte
+    rank    : position du mot-clé dans son dictionnaire (priorité)
+"""
+
+
+class LexiconMatcher:
+    """Automate de reconnaissance compilé une fois pour plusieurs dictionnaires"""
+
+    def __init__(self, groups: Mapping[str, Mapping[str, object]], suffixes: Iterable[str] = ()):
+        """
+        Args:
+            groups: nom du groupe → {mot-clé: valeur}. L'ordre des mots-clés
+                    dans chaque dictionnaire sert de priorité (rank).
+            suffixes: terminaisons acceptées après un mot-clé
+        """
+        self.groups = {name: dict(entries) for name, entries in groups.items()}
+        # mot-clé → [(groupe, valeur, rang)]
+        self._entries: Dict[str, List] = {}
+        for name, entries in self.groups.items():
+            for rank, (keyword, value) in enumerate(entries.items()):
+                self._entries.setdefault(keyword, []).append((name, value, rank))
+
+        keywords = sorted(self._entries, key=lambda k: (-len(k), k))
+        if keywords:
+            alternation = '|'.join(re.escape(k) for k in keywords)
+            endings = ''
+            if suffixes:
+                endings = '(?:' + '|'.join(re.escape(x) for x in sorted(suffixes, key=len, reverse=True)) + ')?'
+            self._pattern = re.compile(rf'(?<!\w)({alternation}){endings}(?!\w)')
+        else:
+            self._pattern = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def find(self, text: str, groups: Optional[Iterable[str]] = None) -> List[Hit]:
+        """
+        Tous les mots-clés présents dans `text` (déjà en minuscules), dans
+        l'ordre du texte.
+
+        Args:
+            groups: limite le résultat à ces groupes
+        """
+        if self._pattern is None:
+            return []
+        wanted = set(groups) if groups is not None else None
+        hits = []
+        for match in self._pattern.finditer(text):
+            keyword = match.group(1)
+            for name, value, rank in self._entries[keyword]:
+                if wanted is None or name in wanted:
+                    hits.append(Hit(name, keyword, value, match.start(), match.end(), rank))
+        return hits
+
+
+def by_group(hits: Iterable[Hit]) -> Dict[str, List[Hit]]:
+    """Regroupe des Hit par nom de groupe"""
+    grouped: Dict[str, List[Hit]] = {}
+    for hit in hits:
+        grouped.setdefault(hit.group, []).append(hit)
+    return grouped
+
+
+def first_by_rank(hits: Optional[List[Hit]]) -> Optional[Hit]:
+    """Hit le plus prioritaire (premier dans l'ordre du dictionnaire)"""
+    return min(hits, key=lambda h: h.rank) if hits else None
+
+
+def values_by_length(hits: Optional[List[Hit]]) -> List:
+    """Valeurs sans doublon, des mots-clés les plus longs aux plus courts"""
+    if not hits:
+        return []
+    ordered = sorted(hits, key=lambda h: (-len(h.keyword), h.rank))
+    return list(dict.fromkeys(h.value for h in ordered))
@@ -0,0 +1,309 @@
+# ============================================
+# 📁 apps/recherche/listing_index.py
+# ============================================
+"""
+Index colonnaire en mémoire des logements.
+
+Chaque processus garde une copie compacte (tableaux NumPy) des colonnes
+utilisées par les filtres structurés de la recherche : prix, surface,
+chambres, douches, GPS, identifiants de catégorie / type / localisation,
+statut et visibilité. Les filtres s'évaluent alors comme des masques
+booléens vectorisés et ne renvoient que des identifiants ; la base n'est
+interrogée ensuite que pour hydrater la page à afficher.
+
+L'index est chargé paresseusement en une seule requête, tenu à jour par
+les signaux post_save / post_delete de Housing (voir signals.py) et
+rechargé entièrement après SEARCH_LISTING_INDEX_TTL secondes pour
+rattraper les écritures faites par d'autres processus ou par
+queryset.update().
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from apps.housing.models import Housing
+
+
+# Colonnes lues en base, dans l'ordre du values_list()
+SOURCE_FIELDS = (
+    'id', 'price', 'area', 'rooms', 'bathrooms',
+    'latitude', 'longitude',
+    'category_id', 'housing_type_id', 'region_id', 'city_id', 'district_id',
+    'status', 'is_visible',
+    'views_count', 'likes_count', 'created_at',
+)
+
+# Champs dont la modification impose une mise à jour de l'index
+INDEXED_FIELDS = frozenset(SOURCE_FIELDS) | frozenset(
+    f[:-3] for f in SOURCE_FIELDS if f.endswith('_id')
+)
+
+# Type NumPy de chaque colonne (les FK nulles valent -1, les GPS nuls NaN)
+COLUMN_DTYPES = {
+    'id': np.int64,
+    'price': np.int64,
+    'area': np.int32,
+    'rooms': np.int32,
+    'bathrooms': np.int32,
+    'latitude': np.float64,
+    'longitude': np.float64,
+    'category_id': np.int64,
+    'housing_type_id': np.int64,
+    'region_id': np.int64,
+    'city_id': np.int64,
+    'district_id': np.int64,
+    'status': np.int8,
+    'is_visible': np.bool_,
+    'views_count': np.int64,
+    'likes_count': np.int64,
+    'created_at': np.float64,
+    'alive': np.bool_,
+}
+
+STATUS_CODES = {code: i for i, (code, _) in enumerate(Housing.STATUS_CHOICES)}
+
+# Filtres d'égalité sur clé étrangère : clé du dict de filtres → colonne
+EQUALITY_FILTERS = {
+    'category': 'category_id',
+    'housing_type': 'housing_type_id',
+    'region': 'region_id',
+    'city': 'city_id',
+    'district': 'district_id',
+}
+
+# Filtres de bornes : clé du dict de filtres → (colonne, opérateur)
+RANGE_FILTERS = {
+    'min_price': ('price', 'gte'),
+    'max_price': ('price', 'lte'),
+    'min_rooms': ('rooms', 'gte'),
+    'max_rooms': ('rooms', 'lte'),
+    'min_bathrooms': ('bathrooms', 'gte'),
+    'min_area': ('area', 'gte'),
+    'max_area': ('area', 'lte'),
+}
+
+
+def _encode_row(values: Dict) -> Dict:
+    """Convertit une ligne Housing en valeurs prêtes pour les colonnes NumPy"""
+    row = {}
+    for field in SOURCE_FIELDS:
+        value = values.get(field)
+        if field in ('latitude', 'longitude'):
+            row[field] = np.nan if value is None else float(value)
+        elif field.endswith('_id') and field != 'id':
+            row[field] = -1 if value is None else int(value)
+        elif field == 'status':
+            row[field] = STATUS_CODES.get(value, -1)
+        elif field == 'is_visible':
+            row[field] = bool(value)
+        elif field == 'created_at':
+            row[field] = value.timestamp() if value else 0.0
+        else:
+            row[field] = int(value or 0)
+    row['alive'] = True
+    return row
+
+
+class ListingIndex:
+    """
+    Index colonnaire des logements (un tableau NumPy par colonne).
+
+    Les suppressions sont des pierres tombales (alive=False) ; les
+    insertions réutilisent une capacité qui double au besoin, ce qui
+    garde les mises à jour incrémentales en O(1) amorti.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._columns: Dict[str, np.ndarray] = {}
+        self._positions: Dict[int, int] = {}
+        self._size = 0
+        self._loaded_at: Optional[float] = None
+
+    # ------------------------------------------------------------------
+    # Chargement
+    # ------------------------------------------------------------------
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def _get_ttl(self) -> float:
+        if self.ttl is not None:
+            return self.ttl
+        return getattr(settings, 'SEARCH_LISTING_INDEX_TTL', 300)
+
+    def _allocate(self, capacity: int):
+        self._columns = {
+            name: np.empty(capacity, dtype=dtype)
+            for name, dtype in COLUMN_DTYPES.items()
+        }
+        self._columns['alive'][:] = False
+
+    def load(self, rows: Optional[Iterable] = None):
+        """
+        (Re)construit l'index complet.
+
+        Args:
+            rows: itérable de tuples dans l'ordre de SOURCE_FIELDS
+                  (par défaut : une seule requête values_list sur Housing)
+        """
+        if rows is None:
+            rows = Housing.objects.order_by().values_list(*SOURCE_FIELDS)
+        rows = list(rows)
+        count = len(rows)
+        raw = dict(zip(SOURCE_FIELDS, zip(*rows))) if rows else {f: () for f in SOURCE_FIELDS}
+
+        columns = {}
+        for field in SOURCE_FIELDS:
+            values = raw[field]
+            if field in ('latitude', 'longitude'):
+                values = [np.nan if v is None else v for v in values]
+            elif field.endswith('_id') and field != 'id':
+                values = [-1 if v is None else v for v in values]
+            elif field == 'status':
+                values = [STATUS_CODES.get(v, -1) for v in values]
+            elif field == 'created_at':
+                values = [v.timestamp() if v else 0.0 for v in values]
+            columns[field] = np.array(values, dtype=COLUMN_DTYPES[field])
+        columns['alive'] = np.ones(count, dtype=np.bool_)
+
+        with self._lock:
+            self._allocate(max(count, 16))
+            for name, values in columns.items():
+                self._columns[name][:count] = values
+            self._positions = {int(pk): i for i, pk in enumerate(columns['id'])}
+            self._size = count
+            self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self):
+        """Charge l'index au premier usage ou quand le TTL est dépassé"""
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self._get_ttl():
+            self.load()
+
+    def invalidate(self):
+        """Force un rechargement complet au prochain accès"""
+        with self._lock:
+            self._loaded_at = None
+
+    # ------------------------------------------------------------------
+    # Mises à jour incrémentales
+    # ------------------------------------------------------------------
+
+    def _append(self, row: Dict):
+        capacity = len(self._columns['id'])
+        if self._size >= capacity:
+            for name, column in self._columns.items():
+                grown = np.empty(capacity * 2, dtype=column.dtype)
+                grown[:capacity] = column
+                if name == 'alive':
+                    grown[capacity:] = False
+                self._columns[name] = grown
+        position = self._size
+        self._write(position, row)
+        self._positions[row['id']] = position
+        self._size += 1
+
+    def _write(self, position: int, row: Dict):
+        for name, value in row.items():
+            self._columns[name][position] = value
+
+    def upsert(self, housing: Housing):
+        """Insère ou met à jour un logement (appelé par post_save)"""
+        with self._lock:
+            if not self.is_loaded:
+                return
+            row = _encode_row({f: getattr(housing, f) for f in SOURCE_FIELDS})
+            position = self._positions.get(row['id'])
+            if position is None:
+                self._append(row)
+            else:
+                self._write(position, row)
+
+    def remove(self, housing_id: int):
+        """Retire un logement de l'index (appelé par post_delete)"""
+        with self._lock:
+            position = self._positions.pop(housing_id, None)
+            if position is not None:
+                self._columns['alive'][position] = False
+
+    def __len__(self):
+        return len(self._positions)
+
+    # ------------------------------------------------------------------
+    # Filtrage
+    # ------------------------------------------------------------------
+
+    def column(self, name: str) -> np.ndarray:
+        """Vue sur une colonne (limitée aux lignes occupées)"""
+        return self._columns[name][:self._size]
+
+    def base_mask(self, status: Optional[str] = 'disponible', visible_only: bool = True) -> np.ndarray:
+        """Masque des logements vivants, disponibles et visibles"""
+        mask = self.column('alive').copy()
+        if status is not None:
+            mask &= self.column('status') == STATUS_CODES[status]
+        if visible_only:
+            mask &= self.column('is_visible')
+        return mask
+
+    def filter_mask(self, filters: Dict, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Applique les filtres structurés de SearchEngine._apply_filters.
+
+        Même sémantique que la version ORM : une valeur vide ou nulle est
+        ignorée. Une valeur non numérique lève ValueError, comme le ferait
+        la requête SQL.
+        """
+        if mask is None:
+            mask = self.base_mask()
+
+        for key, column in EQUALITY_FILTERS.items():
+            if filters.get(key):
+                mask &= self.column(column) == int(filters[key])
+
+        for key, (column, op) in RANGE_FILTERS.items():
+            if filters.get(key):
+                bound = float(filters[key])
+                values = self.column(column)
+                mask &= (values >= bound) if op == 'gte' else (values <= bound)
+
+        return mask
+
+    def filter_ids(self, filters: Dict, status: Optional[str] = 'disponible',
+                   visible_only: bool = True) -> np.ndarray:
+        """Retourne les identifiants des logements satisfaisant les filtres"""
+        with self._lock:
+            self.ensure_loaded()
+            mask = self.filter_mask(filters, self.base_mask(status, visible_only))
+            return self.column('id')[mask]
+
+    def select(self, filters: Dict, columns: Iterable[str], status: Optional[str] = 'disponible',
+               visible_only: bool = True, bounds: Iterable[Tuple[str, str, float]] = ()) -> Dict[str, np.ndarray]:
+        """
+        Colonnes des logements satisfaisant les filtres (copies lues sous verrou)
+
+        Args:
+            bounds: bornes supplémentaires (colonne, 'gte' | 'lte', valeur),
+                    ex. la fenêtre de la carte sur latitude / longitude
+        """
+        with self._lock:
+            self.ensure_loaded()
+            mask = self.filter_mask(filters, self.base_mask(status, visible_only))
+            for column, op, bound in bounds:
+                values = self.column(column)
+                mask &= (values >= bound) if op == 'gte' else (values <= bound)
+            return {name: self.column(name)[mask] for name in columns}
+
+
+# Instance partagée par le processus
+listing_index = ListingIndex()
+
+
+def index_enabled() -> bool:
+    return getattr(settings, 'SEARCH_LISTING_INDEX_ENABLED', True)
@@ -0,0 +1,443 @@
+# ============================================
+# 📁 apps/recherche/llm_client.py
+# ============================================
+"""
+Client partagé pour les appels LLM (Ollama, OpenAI).
+
+Chaque backend dispose de :
+
+  - une session HTTP à connexions persistantes (pool de
+    LLM_POOL_SIZE connexions, pas de nouvelle poignée TCP par appel)
+  - un sémaphore de LLM_MAX_CONCURRENCY appels simultanés : au-delà,
+    l'appelant attend au plus LLM_QUEUE_TIMEOUT secondes puis reçoit
+    LLMBusy au lieu de bloquer un worker
+  - un budget de latence par type d'appel (LLM_BUDGETS), utilisé comme
+    timeout de lecture
+  - un disjoncteur : après LLM_BREAKER_FAILURES échecs consécutifs
+    (erreur, timeout ou appel ayant consommé plus de 80 % du budget), les
+    appels échouent immédiatement (CircuitOpen) pendant
+    LLM_BREAKER_RESET secondes, puis un seul appel d'essai est autorisé
+
+Les variantes async (apost_json, aget_json, aguard) passent par un
+httpx.AsyncClient par boucle d'événements et partagent le sémaphore, le
+budget et le disjoncteur du client synchrone : les vues ASGI ne
+bloquent aucun thread pendant l'appel.
+
+stream_json() lit les réponses en flux (une ligne JSON par morceau) sous
+les mêmes garde-fous ; sa latence est celle du premier morceau.
+
+Toutes les erreurs héritent de LLMUnavailable : les appelants se
+replient sur l'extraction par règles. Les latences sont agrégées dans
+llm_metrics (GET /api/recherche/llm/stats/).
+"""
+
+import asyncio
+import json
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Iterator, Optional
+
+from django.conf import settings
+
+
+class LLMUnavailable(Exception):
+    """Le LLM ne peut pas répondre dans le budget imparti"""
+
+
+class LLMBusy(LLMUnavailable):
+    """Tous les emplacements d'appel sont occupés"""
+
+
+class CircuitOpen(LLMUnavailable):
+    """Disjoncteur ouvert : le backend est considéré comme hors service"""
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def budget_for(operation: str) -> float:
+    """Budget de latence (secondes) d'un type d'appel : 'extract', 'chat', 'health'"""
+    budgets = {'extract': 8.0, 'chat': 20.0, 'health': 2.0}
+    budgets.update(_setting('LLM_BUDGETS', {}))
+    return budgets.get(operation, budgets['chat'])
+
+
+# ----------------------------------------------------------------------
+# Disjoncteur
+# ----------------------------------------------------------------------
+
+class CircuitBreaker:
+    """Disjoncteur fermé → ouvert → semi-ouvert (un appel d'essai)"""
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Un appel peut-il partir ?"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._probe_in_flight:
+                return False
+            # Délai écoulé : un seul appel d'essai à la fois
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def cancel(self):
+        """L'appel autorisé n'a pas été émis : libère l'appel d'essai éventuel"""
+        with self._lock:
+            if self._probe_in_flight:
+                self._probe_in_flight = False
+                self._state = self.OPEN
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+# ----------------------------------------------------------------------
+# Métriques
+# ----------------------------------------------------------------------
+
+class LatencyMetrics:
+    """Compteurs et latences récentes par (backend, opération)"""
+
+    WINDOW = 500
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series: Dict[str, Dict] = {}
+
+    def _get(self, key):
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = {
+                'calls': 0, 'errors': 0, 'slow': 0, 'rejected': 0,
+                'latencies': deque(maxlen=self.WINDOW),
+            }
+        return series
+
+    def record(self, key: str, latency: float, ok: bool, slow: bool = False):
+        with self._lock:
+            series = self._get(key)
+            series['calls'] += 1
+            series['latencies'].append(latency)
+            if not ok:
+                series['errors'] += 1
+            if slow:
+                series['slow'] += 1
+
+    def reject(self, key: str):
+        """Appel refusé sans être émis (disjoncteur ouvert ou file pleine)"""
+        with self._lock:
+            self._get(key)['rejected'] += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            result = {}
+            for key, series in self._series.items():
+                ordered = sorted(series['latencies'])
+                result[key] = {
+                    'calls': series['calls'],
+                    'errors': series['errors'],
+                    'slow': series['slow'],
+                    'rejected': series['rejected'],
+                    'p50_ms': round(self._percentile(ordered, 0.50) * 1000, 1),
+                    'p95_ms': round(self._percentile(ordered, 0.95) * 1000, 1),
+                    'max_ms': round(ordered[-1] * 1000, 1) if ordered else 0.0,
+                }
+            return result
+
+    @staticmethod
+    def _percentile(ordered, q) -> float:
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+llm_metrics = LatencyMetrics()
+
+
+# ----------------------------------------------------------------------
+# Client
+# ----------------------------------------------------------------------
+
+class LLMClient:
+    """Backend LLM : session persistante, sémaphore, budget, disjoncteur"""
+
+    # Part du budget au-delà de laquelle un appel réussi compte comme lent
+    SLOW_FRACTION = 0.8
+
+    def __init__(self, name: str, base_url: Optional[str] = None):
+        self.name = name
+        self.base_url = (base_url or '').rstrip('/')
+        self.max_concurrency = _setting('LLM_MAX_CONCURRENCY', 4)
+        self.queue_timeout = _setting('LLM_QUEUE_TIMEOUT', 0.5)
+        self.breaker = CircuitBreaker(
+            _setting('LLM_BREAKER_FAILURES', 3),
+            _setting('LLM_BREAKER_RESET', 30.0),
+        )
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._session = None
+        self._session_lock = threading.Lock()
+        # boucle d'événements → httpx.AsyncClient (un client n'est utilisable
+        # que dans la boucle qui l'a créé)
+        self._async_clients = weakref.WeakKeyDictionary()
+
+    @property
+    def session(self):
+        """Session requests partagée (créée au premier appel HTTP)"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    pool_size = _setting('LLM_POOL_SIZE', 8)
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+        return self._session
+
+    @property
+    def async_client(self):
+        """httpx.AsyncClient de la boucle d'événements courante"""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            import httpx
+
+            pool_size = _setting('LLM_POOL_SIZE', 8)
+            client = self._async_clients[loop] = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            )
+        return client
+
+    def _acquire(self, key: str):
+        """Disjoncteur puis emplacement de concurrence (lève CircuitOpen / LLMBusy)"""
+        self._check_breaker(key)
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self._reject_busy(key)
+
+    async def _aacquire(self, key: str):
+        """Comme _acquire, sans bloquer la boucle d'événements pendant l'attente"""
+        self._check_breaker(key)
+        deadline = time.monotonic() + self.queue_timeout
+        while not self._slots.acquire(blocking=False):
+            if time.monotonic() >= deadline:
+                self._reject_busy(key)
+            await asyncio.sleep(0.005)
+
+    def _check_breaker(self, key: str):
+        if not self.breaker.allow():
+            llm_metrics.reject(key)
+            raise CircuitOpen(f'{self.name} : disjoncteur ouvert')
+
+    def _reject_busy(self, key: str):
+        # Appel non émis : ne renseigne pas le disjoncteur
+        self.breaker.cancel()
+        llm_metrics.reject(key)
+        raise LLMBusy(f'{self.name} : {self.max_concurrency} appels déjà en cours')
+
+    def _finish(self, key: str, latency: float, ok: bool, budget: float):
+        """Libère l'emplacement, enregistre la latence et renseigne le disjoncteur"""
+        self._slots.release()
+        slow = ok and latency > budget * self.SLOW_FRACTION
+        llm_metrics.record(key, latency, ok=ok, slow=slow)
+        if ok and not slow:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    @contextmanager
+    def guard(self, operation: str, budget: Optional[float] = None):
+        """
+        Encadre un appel : disjoncteur, emplacement de concurrence,
+        mesure de latence. Toute exception levée dans le bloc compte
+        comme un échec et ressort en LLMUnavailable.
+        """
+        key = f'{self.name}.{operation}'
+        budget = budget if budget is not None else budget_for(operation)
+        self._acquire(key)
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self._finish(key, time.perf_counter() - start, False, budget)
+            if isinstance(e, LLMUnavailable):
+                raise
+            raise LLMUnavailable(f'{self.name}.{operation} : {e}') from e
+        self._finish(key, time.perf_counter() - start, True, budget)
+
+    @asynccontextmanager
+    async def aguard(self, operation: str, budget: Optional[float] = None):
+        """Variante async de guard()"""
+        key = f'{self.name}.{operation}'
+        budget = budget if budget is not None else budget_for(operation)
+        await self._aacquire(key)
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self._finish(key, time.perf_counter() - start, False, budget)
+            if isinstance(e, LLMUnavailable):
+                raise
+            raise LLMUnavailable(f'{self.name}.{operation} : {e}') from e
+        self._finish(key, time.perf_counter() - start, True, budget)
+
+    def stream_json(self, path: str, payload: Dict, operation: str,
+                    budget: Optional[float] = None) -> Iterator[Dict]:
+        """
+        POST en flux : un objet JSON par ligne (format de flux d'Ollama).
+
+        Le budget borne l'attente de chaque morceau (premier jeton compris) ;
+        la latence mesurée est celle du premier morceau. L'emplacement de
+        concurrence reste occupé jusqu'à la fin (ou l'abandon) du flux.
+        """
+        key = f'{self.name}.{operation}'
+        budget = budget if budget is not None else budget_for(operation)
+        self._acquire(key)
+        start = time.perf_counter()
+        first_chunk = None
+        ok = False
+        try:
+            response = self.session.post(
+                f'{self.base_url}{path}', json=payload, stream=True,
+                timeout=(min(1.0, budget), budget),
+            )
+            with response:
+                if response.status_code != 200:
+                    raise LLMUnavailable(f'{self.name} : HTTP {response.status_code}')
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    if first_chunk is None:
+                        first_chunk = time.perf_counter() - start
+                    yield json.loads(line)
+            ok = True
+        except GeneratorExit:
+            # Lecteur parti (client déconnecté) : le backend n'est pas en cause
+            ok = first_chunk is not None
+            raise
+        except LLMUnavailable:
+            raise
+        except Exception as e:
+            raise LLMUnavailable(f'{self.name}.{operation} : {e}') from e
+        finally:
+            latency = first_chunk if first_chunk is not None else time.perf_counter() - start
+            self._finish(key, latency, ok, budget)
+
+    def request_json(self, method: str, path: str, operation: str, payload: Optional[Dict] = None,
+                     budget: Optional[float] = None) -> Dict:
+        """
+        Appel HTTP JSON dans le budget de l'opération.
+
+        Raises:
+            LLMUnavailable: disjoncteur ouvert, file pleine, timeout,
+                            statut HTTP ≠ 200 ou réponse non JSON
+        """
+        budget = budget if budget is not None else budget_for(operation)
+        with self.guard(operation, budget):
+            response = self.session.request(
+                method, f'{self.base_url}{path}', json=payload,
+                timeout=(min(1.0, budget), budget),
+            )
+            if response.status_code != 200:
+                raise LLMUnavailable(f'{self.name} : HTTP {response.status_code}')
+            return response.json()
+
+    def post_json(self, path: str, payload: Dict, operation: str, budget: Optional[float] = None) -> Dict:
+        return self.request_json('POST', path, operation, payload, budget)
+
+    def get_json(self, path: str, operation: str, budget: Optional[float] = None) -> Dict:
+        return self.request_json('GET', path, operation, None, budget)
+
+    async def arequest_json(self, method: str, path: str, operation: str, payload: Optional[Dict] = None,
+                            budget: Optional[float] = None) -> Dict:
+        """Variante async de request_json() (mêmes erreurs)"""
+        import httpx
+
+        budget = budget if budget is not None else budget_for(operation)
+        async with self.aguard(operation, budget):
+            response = await self.async_client.request(
+                method, path, json=payload,
+                timeout=httpx.Timeout(budget, connect=min(1.0, budget)),
+            )
+            if response.status_code != 200:
+                raise LLMUnavailable(f'{self.name} : HTTP {response.status_code}')
+            return response.json()
+
+    async def apost_json(self, path: str, payload: Dict, operation: str, budget: Optional[float] = None) -> Dict:
+        return await self.arequest_json('POST', path, operation, payload, budget)
+
+    async def aget_json(self, path: str, operation: str, budget: Optional[float] = None) -> Dict:
+        return await self.arequest_json('GET', path, operation, None, budget)
+
+    def stats(self) -> Dict:
+        return {'breaker': self.breaker.state, 'max_concurrency': self.max_concurrency}
+
+
+_clients: Dict[str, LLMClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_llm_client(name: str) -> LLMClient:
+    """Client partagé du backend 'ollama' ou 'openai'"""
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                base_url = _setting('OLLAMA_API_URL', 'http://localhost:11434') if name == 'ollama' else None
+                client = _clients[name] = LLMClient(name, base_url)
+    return client
+
+
+def reset_llm_clients():
+    """Oublie les clients (changement de réglages, tests)"""
+    with _clients_lock:
+        _clients.clear()
+
+
+def llm_stats() -> Dict:
+    return {
+        'backends': {name: client.stats() for name, client in list(_clients.items())},
+        'calls': llm_metrics.snapshot(),
+    }
@@ -0,0 +1,108 @@
+# ============================================
+# 📁 apps/recherche/llm_health.py
+# ============================================
+"""
+État de santé du LLM local, partagé par le processus.
+
+is_available() répond en O(1) depuis l'état en mémoire ; quand l'état a
+plus de LLM_HEALTH_TTL secondes, une sonde (GET /api/tags via le client
+partagé) est lancée en arrière-plan, une seule à la fois, et l'appel
+courant reçoit la dernière valeur connue. Tant qu'aucune sonde n'a
+abouti, le modèle est considéré indisponible : aucune requête n'attend
+le serveur.
+
+Les appels réels renseignent aussi l'état (report_success /
+report_error) : une panne constatée en cours de conversation est
+prise en compte sans attendre la sonde suivante. Un refus pour
+saturation (LLMBusy) n'est pas une panne.
+"""
+
+import threading
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .llm_client import LLMBusy, LLMUnavailable, get_llm_client
+
+
+class LLMHealth:
+    """Disponibilité d'un backend LLM, rafraîchie en arrière-plan"""
+
+    def __init__(self, backend: str = 'ollama'):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._available: Optional[bool] = None
+        self._checked_at = 0.0
+        self._probing = False
+
+    @staticmethod
+    def ttl() -> float:
+        return getattr(settings, 'LLM_HEALTH_TTL', 30.0)
+
+    def is_available(self) -> bool:
+        """Dernier état connu ; relance une sonde si l'état est périmé"""
+        if time.monotonic() - self._checked_at > self.ttl():
+            self.refresh_async()
+        return bool(self._available)
+
+    def state(self) -> dict:
+        age = time.monotonic() - self._checked_at if self._checked_at else None
+        return {
+            'available': self._available,
+            'age_seconds': round(age, 1) if age is not None else None,
+            'probing': self._probing,
+        }
+
+    # ------------------------------------------------------------------
+    # Sonde
+    # ------------------------------------------------------------------
+
+    def refresh_async(self):
+        with self._lock:
+            if self._probing:
+                return
+            self._probing = True
+        threading.Thread(target=self._probe_in_background, daemon=True).start()
+
+    def refresh(self) -> bool:
+        """Sonde synchrone (commandes, tests)"""
+        try:
+            get_llm_client(self.backend).get_json('/api/tags', operation='health')
+            self.report_success()
+        except LLMUnavailable:
+            self.report_failure()
+        return bool(self._available)
+
+    def _probe_in_background(self):
+        try:
+            self.refresh()
+        finally:
+            with self._lock:
+                self._probing = False
+            close_old_connections()
+
+    # ------------------------------------------------------------------
+    # Retours des appels réels
+    # ------------------------------------------------------------------
+
+    def report_success(self):
+        self._set(True)
+
+    def report_failure(self):
+        self._set(False)
+
+    def report_error(self, error: BaseException):
+        """Erreur d'un appel réel : seule une indisponibilité (hors saturation) est une panne"""
+        if isinstance(error, LLMUnavailable) and not isinstance(error, LLMBusy):
+            self.report_failure()
+
+    def _set(self, available: bool):
+        with self._lock:
+            self._available = available
+            self._checked_at = time.monotonic()
+
+
+# Instance partagée par le processus
+ollama_health = LLMHealth('ollama')
@@ -0,0 +1,170 @@
+# ============================================
+# 📁 apps/recherche/llm_stub.py
+# ============================================
+"""
+Serveur Ollama factice pour les essais locaux du client LLM.
+
+Imite /api/tags, /api/generate et /api/chat avec une latence et un taux
+d'erreur réglables (/api/chat répond aussi en flux quand stream=true,
+un morceau par mot). Compte les connexions TCP ouvertes (pour vérifier
+la réutilisation des connexions) et le pic d'appels simultanés.
+Utilisable dans un processus (StubOllamaServer(...).start()) ou seul :
+python manage.py llm_stub_server.
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+STUB_CRITERIA = {
+    'city': 'Douala',
+    'category_name': 'Appartement',
+    'max_price': 150000,
+    'min_rooms': 2,
+}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def setup(self):
+        super().setup()
+        self.server.stub.count_connection()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == '/api/tags':
+            self._reply({'models': [{'name': self.server.stub.model}]})
+        else:
+            self._reply({'error': 'not found'}, status=404)
+
+    def do_POST(self):
+        self.server.stub.enter()
+        try:
+            self._post()
+        finally:
+            self.server.stub.leave()
+
+    def _post(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'{}')
+        if self.path == '/api/generate':
+            self._reply({'model': body.get('model'), 'response': json.dumps(STUB_CRITERIA), 'done': True})
+        elif self.path == '/api/chat':
+            last = (body.get('messages') or [{}])[-1].get('content', '')
+            if body.get('stream'):
+                self._reply_stream(body.get('model'), f'Écho : {last}')
+                return
+            self._reply({'model': body.get('model'), 'message': {'role': 'assistant', 'content': f'Écho : {last}'}})
+        else:
+            self._reply({'error': 'not found'}, status=404)
+
+    def _reply(self, payload, status=200):
+        stub = self.server.stub
+        if stub.delay:
+            time.sleep(stub.delay)
+        if status == 200 and stub.fail_rate and stub.rng.random() < stub.fail_rate:
+            payload, status = {'error': 'model overloaded'}, 503
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # Client parti avant la réponse (timeout du budget)
+            pass
+
+    def _reply_stream(self, model, text):
+        """Flux NDJSON en Transfer-Encoding: chunked (garde la connexion ouverte)"""
+        stub = self.server.stub
+        if stub.delay:
+            time.sleep(stub.delay)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        words = text.split(' ')
+        chunks = [
+            {'model': model, 'message': {'role': 'assistant', 'content': word if i == 0 else f' {word}'}, 'done': False}
+            for i, word in enumerate(words)
+        ]
+        chunks.append({'model': model, 'message': {'role': 'assistant', 'content': ''}, 'done': True})
+        try:
+            for chunk in chunks:
+                data = json.dumps(chunk).encode('utf-8') + b'\n'
+                self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+                self.wfile.flush()
+                if stub.token_delay:
+                    time.sleep(stub.token_delay)
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # File d'attente d'acceptation large : rafales de connexions simultanées
+    request_queue_size = 256
+
+
+class StubOllamaServer:
+    """Serveur factice dans un thread ; port 0 = port libre choisi par le système"""
+
+    def __init__(self, host='127.0.0.1', port=0, delay=0.0, fail_rate=0.0, model='mistral', seed=None,
+                 token_delay=0.0):
+        self.delay = delay
+        self.token_delay = token_delay
+        self.fail_rate = fail_rate
+        self.model = model
+        self.rng = random.Random(seed)
+        self.connections = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = _StubHTTPServer((host, port), _StubHandler)
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def count_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def enter(self):
+        """Début d'une requête POST (suivi des appels simultanés)"""
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def start(self) -> 'StubOllamaServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
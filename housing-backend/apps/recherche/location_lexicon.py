@@ -0,0 +1,204 @@
+# ============================================
+# 📁 apps/recherche/location_lexicon.py
+# ============================================
+"""
+Lexiques des villes et quartiers construits depuis location.City /
+location.District.
+
+Pour chaque ligne, toutes les formes courantes du nom (name_fr, name_en,
+sans accents, tiret ↔ espace) deviennent des mots-clés du lexique NLP :
+« Biyem-Assi », « biyem assi » et « biyem-assi » reconnaissent le même
+quartier, avec son identifiant. Les vues filtrent alors par clé
+étrangère au lieu d'un icontains sur le nom.
+
+Les lignes sont chargées en deux requêtes puis tenues à jour ligne par
+ligne par les signaux (voir signals.py) ; les dictionnaires dérivés sont
+recalculés en mémoire au prochain accès, sans requête.
+SEARCH_LOCATION_LEXICON_TTL borne la dérive entre processus.
+"""
+
+import hashlib
+import threading
+import time
+import unicodedata
+from collections import namedtuple
+from typing import Dict, Optional, Set, Tuple
+
+from django.conf import settings
+
+
+CityEntry = namedtuple('CityEntry', 'name id')
+DistrictEntry = namedtuple('DistrictEntry', 'name city id city_id')
+
+
+def strip_accents(text: str) -> str:
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def location_key(name: str) -> str:
+    """Forme de comparaison d'un nom de lieu : minuscules, sans accents, sans tirets"""
+    return ' '.join(strip_accents(name).lower().replace('-', ' ').split())
+
+
+def name_variants(name: str) -> Set[str]:
+    """Formes d'un nom reconnues dans une requête (minuscules)"""
+    base = ' '.join(name.lower().split())
+    if not base:
+        return set()
+    variants = set()
+    for form in (base, strip_accents(base)):
+        variants.add(form)
+        variants.add(form.replace('-', ' '))
+        variants.add(form.replace(' ', '-'))
+    return variants
+
+
+class LocationLexicon:
+    """Villes et quartiers de la base, indexés par forme de nom"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # city_id → {'fr': nom, 'en': nom}
+        self._cities: Dict[int, Dict[str, str]] = {}
+        # district_id → ({'fr': nom, 'en': nom}, city_id)
+        self._districts: Dict[int, Tuple[Dict[str, str], int]] = {}
+        self._loaded_at = None
+        # Dictionnaires dérivés, par langue (None = à recalculer)
+        self._derived: Optional[Dict] = None
+        self._fingerprint: Optional[str] = None
+
+    @staticmethod
+    def ttl() -> int:
+        return getattr(settings, 'SEARCH_LOCATION_LEXICON_TTL', 300)
+
+    # ------------------------------------------------------------------
+    # Chargement
+    # ------------------------------------------------------------------
+
+    def load(self):
+        """Recharge toutes les villes et quartiers (deux requêtes)"""
+        from apps.location.models import City, District
+
+        try:
+            cities = {
+                pk: self._names(name, name_fr, name_en)
+                for pk, name, name_fr, name_en in City.objects.order_by('pk').values_list(
+                    'pk', 'name', 'name_fr', 'name_en'
+                )
+            }
+            districts = {
+                pk: (self._names(name, name_fr, name_en), city_id)
+                for pk, name, name_fr, name_en, city_id in District.objects.order_by('pk').values_list(
+                    'pk', 'name', 'name_fr', 'name_en', 'city_id'
+                )
+            }
+        except Exception as e:
+            # Tables absentes (migrations en cours) : lexique vide, réessai au TTL
+            print(f"⚠️ Lexique des lieux indisponible : {e}")
+            cities, districts = {}, {}
+
+        with self._lock:
+            self._cities = cities
+            self._districts = districts
+            self._loaded_at = time.monotonic()
+            self._derived = None
+
+    def ensure_loaded(self):
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > self.ttl():
+            self.load()
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+            self._derived = None
+
+    @staticmethod
+    def _names(name, name_fr, name_en) -> Dict[str, str]:
+        fr = name_fr or name or name_en or ''
+        return {'fr': fr, 'en': name_en or fr}
+
+    # ------------------------------------------------------------------
+    # Mises à jour incrémentales (signaux)
+    # ------------------------------------------------------------------
+
+    def upsert_city(self, city):
+        if self._loaded_at is None:
+            return
+        names = self._names(city.name, getattr(city, 'name_fr', None), getattr(city, 'name_en', None))
+        with self._lock:
+            self._cities[city.pk] = names
+            self._derived = None
+
+    def upsert_district(self, district):
+        if self._loaded_at is None:
+            return
+        names = self._names(district.name, getattr(district, 'name_fr', None), getattr(district, 'name_en', None))
+        with self._lock:
+            self._districts[district.pk] = (names, district.city_id)
+            self._derived = None
+
+    def remove_city(self, city_id):
+        with self._lock:
+            if self._cities.pop(city_id, None) is not None:
+                self._districts = {
+                    pk: row for pk, row in self._districts.items() if row[1] != city_id
+                }
+                self._derived = None
+
+    def remove_district(self, district_id):
+        with self._lock:
+            if self._districts.pop(district_id, None) is not None:
+                self._derived = None
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    def dictionaries(self, language: str = 'fr') -> Tuple[Dict[str, CityEntry], Dict[str, DistrictEntry], str]:
+        """
+        (villes, quartiers, empreinte) pour une langue :
+        forme du nom → CityEntry / DistrictEntry.
+
+        L'empreinte change dès qu'une ville ou un quartier change.
+        """
+        self.ensure_loaded()
+        language = 'en' if language == 'en' else 'fr'
+        with self._lock:
+            if self._derived is None:
+                self._derived, self._fingerprint = self._derive()
+            cities, districts = self._derived[language]
+            return cities, districts, self._fingerprint
+
+    def fingerprint(self) -> str:
+        return self.dictionaries()[2]
+
+    def _derive(self):
+        derived = {}
+        for language in ('fr', 'en'):
+            cities: Dict[str, CityEntry] = {}
+            for pk, names in self._cities.items():
+                entry = CityEntry(names[language], pk)
+                for name in set(names.values()):
+                    for variant in name_variants(name):
+                        cities.setdefault(variant, entry)
+
+            districts: Dict[str, DistrictEntry] = {}
+            for pk, (names, city_id) in self._districts.items():
+                city_names = self._cities.get(city_id)
+                entry = DistrictEntry(
+                    names[language], city_names[language] if city_names else None, pk, city_id
+                )
+                for name in set(names.values()):
+                    for variant in name_variants(name):
+                        districts.setdefault(variant, entry)
+            derived[language] = (cities, districts)
+
+        payload = repr((sorted(self._cities.items()), sorted(self._districts.items())))
+        fingerprint = hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+        return derived, fingerprint
+
+
+# Instance partagée par le processus
+location_lexicon = LocationLexicon()
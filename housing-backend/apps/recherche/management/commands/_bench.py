@@ -0,0 +1,169 @@
+# ============================================
+# 📁 apps/recherche/management/commands/_bench.py
+# ============================================
+"""
+Outils partagés par les commandes bench_* :
+catalogue synthétique jetable, chronométrage et comptage de requêtes.
+
+Le catalogue est créé dans une transaction annulée à la sortie : la base
+de développement n'est jamais modifiée par un benchmark.
+"""
+
+import random
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+
+from apps.housing.models import Category, HousingType, Housing
+from apps.location.models import Region, City, District
+
+
+CATALOGUE_LAYOUT = {
+    'Centre': {
+        'Yaoundé': ['Bastos', 'Essos', 'Mvan', 'Ngousso', 'Odza', 'Mokolo', 'Biyem-Assi'],
+    },
+    'Littoral': {
+        'Douala': ['Akwa', 'Bonapriso', 'Bonanjo', 'Makepe', 'Kotto', 'Deïdo'],
+    },
+    'Ouest': {
+        'Bafoussam': ['Banengo', 'Tamdja', 'Djeleng'],
+    },
+}
+
+CITY_CENTERS = {
+    'Yaoundé': (3.8480, 11.5021),
+    'Douala': (4.0511, 9.7679),
+    'Bafoussam': (5.4764, 10.4180),
+}
+
+CATEGORY_NAMES = ['Studio', 'Chambre', 'Appartement', 'Maison']
+TYPE_NAMES = ['Simple', 'Moderne', 'Meublé']
+FEATURES = ['balcon', 'parking', 'gardien', 'wifi', 'climatisation', 'piscine', 'jardin']
+
+
+class Catalogue:
+    """Références vers les objets créés pour le benchmark"""
+
+    def __init__(self):
+        self.owner = None
+        self.categories = []
+        self.types = []
+        self.regions = []
+        self.cities = []
+        self.districts = []
+
+
+def _build_references(catalogue: Catalogue):
+    User = get_user_model()
+    catalogue.owner = User.objects.create(username=f'bench-{time.time_ns()}')
+    for name in CATEGORY_NAMES:
+        catalogue.categories.append(
+            Category.objects.get_or_create(name=name)[0]
+        )
+    for name in TYPE_NAMES:
+        catalogue.types.append(
+            HousingType.objects.get_or_create(name=name)[0]
+        )
+    for region_name, cities in CATALOGUE_LAYOUT.items():
+        region = Region.objects.get_or_create(name=region_name)[0]
+        catalogue.regions.append(region)
+        for city_name, districts in cities.items():
+            city = City.objects.get_or_create(region=region, name=city_name)[0]
+            catalogue.cities.append(city)
+            for district_name in districts:
+                catalogue.districts.append(
+                    District.objects.get_or_create(city=city, name=district_name)[0]
+                )
+
+
+def _make_housing(catalogue: Catalogue, rng: random.Random, i: int) -> Housing:
+    district = rng.choice(catalogue.districts)
+    city = district.city
+    base_lat, base_lng = CITY_CENTERS.get(city.name, (3.8480, 11.5021))
+    category = rng.choice(catalogue.categories)
+    features = ', '.join(rng.sample(FEATURES, rng.randint(0, 4)))
+    title = f"{category.name} {district.name} #{i}"
+    description = f"Logement {category.name.lower()} situé à {district.name}, {city.name}."
+    return Housing(
+        owner=catalogue.owner,
+        category=category,
+        housing_type=rng.choice(catalogue.types),
+        title=title, title_fr=title,
+        description=description, description_fr=description,
+        additional_features=features, additional_features_fr=features,
+        price=rng.randrange(15000, 600000, 5000),
+        area=rng.randint(9, 250),
+        rooms=rng.randint(1, 6),
+        bathrooms=rng.randint(1, 3),
+        region=city.region, city=city, district=district,
+        latitude=base_lat + rng.uniform(-0.05, 0.05),
+        longitude=base_lng + rng.uniform(-0.05, 0.05),
+        status=rng.choices(['disponible', 'reserve', 'occupe'], [8, 1, 1])[0],
+        is_visible=rng.random() > 0.05,
+        views_count=rng.randint(0, 500),
+        likes_count=rng.randint(0, 50),
+    )
+
+
+@contextmanager
+def synthetic_catalogue(size: int, seed: int = 42, batch_size: int = 5000):
+    """
+    Crée `size` logements synthétiques et annule tout à la sortie.
+
+    Usage:
+        with synthetic_catalogue(10000) as catalogue:
+            ...
+    """
+    rng = random.Random(seed)
+    with transaction.atomic():
+        catalogue = Catalogue()
+        _build_references(catalogue)
+        batch = []
+        for i in range(size):
+            batch.append(_make_housing(catalogue, rng, i))
+            if len(batch) >= batch_size:
+                Housing.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Housing.objects.bulk_create(batch)
+        try:
+            yield catalogue
+        finally:
+            transaction.set_rollback(True)
+
+
+def measure(fn, repeat: int = 5) -> float:
+    """Exécute `fn` `repeat` fois et retourne la médiane en millisecondes"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+class QueryCounter:
+    """Wrapper d'exécution qui compte les requêtes SQL"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def count_queries():
+    """
+    Usage:
+        with count_queries() as queries:
+            ...
+        queries.count
+    """
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        yield counter
@@ -0,0 +1,109 @@
+# apps/recherche/management/commands/bench_async_chatbot.py
+# ============================================================
+# Commande : python manage.py bench_async_chatbot
+# But      : Combien de conversations simultanées un processus
+#            tient-il pendant que le LLM répond ? Compare le flux
+#            synchrone (LocalChatbot.chat, un thread par requête
+#            comme un worker WSGI à N threads) au flux async
+#            (LocalChatbot.achat dans une seule boucle d'événements),
+#            contre le serveur Ollama factice.
+# ============================================================
+
+import asyncio
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from apps.recherche.chatbot import LocalChatbot
+from apps.recherche.conversation_window import conversation_store
+from apps.recherche.llm_client import reset_llm_clients
+from apps.recherche.llm_health import ollama_health
+from apps.recherche.llm_stub import StubOllamaServer
+from apps.recherche.models import ChatbotConversation
+
+
+MESSAGE = "Parle-moi du quartier Bastos"
+
+
+class Command(BaseCommand):
+    help = 'Benchmark des conversations simultanées : flux synchrone (threads) vs async'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--conversations', type=int, nargs='+', default=[8, 32, 128])
+        parser.add_argument('--threads', type=int, default=8,
+                            help='Threads du worker synchrone (gunicorn --threads)')
+        parser.add_argument('--delay', type=float, default=1.0, help='Latence du LLM (secondes)')
+
+    def handle(self, *args, **options):
+        threads, delay = options['threads'], options['delay']
+        self.prefix = f'bench-{uuid.uuid4().hex[:8]}'
+
+        self.stdout.write(
+            f'\n💬 Conversations simultanées, LLM à {delay:.1f} s, '
+            f'worker synchrone à {threads} threads\n'
+            f'   {"N":>5} | {"sync : durée":>13} {"pic":>5} | {"async : durée":>14} {"pic":>5} | médiane async'
+        )
+        try:
+            for n in options['conversations']:
+                # Le LLM factice accepte tout : on mesure ce que tient le
+                # processus web, pas la borne de protection du modèle
+                with StubOllamaServer(delay=delay) as stub, override_settings(
+                    OLLAMA_API_URL=stub.url, LLM_MAX_CONCURRENCY=n, LLM_POOL_SIZE=n,
+                ):
+                    reset_llm_clients()
+                    ollama_health.refresh()
+
+                    sync_wall, _ = self._run_sync(n, threads)
+                    sync_peak, stub.peak_in_flight = stub.peak_in_flight, 0
+
+                    async_wall, latencies = asyncio.run(self._run_async(n))
+                    async_peak = stub.peak_in_flight
+
+                self.stdout.write(
+                    f'   {n:>5} | {sync_wall:>11.2f} s {sync_peak:>5} | '
+                    f'{async_wall:>12.2f} s {async_peak:>5} | {statistics.median(latencies):.2f} s'
+                )
+        finally:
+            conversation_store.flush()
+            ChatbotConversation.objects.filter(session_id__startswith=self.prefix).delete()
+            reset_llm_clients()
+
+        self.stdout.write(
+            '\n   pic = appels LLM en cours au même moment (vu par le serveur factice)'
+        )
+        self.stdout.write(self.style.SUCCESS('\n✅ Benchmark terminé'))
+
+    def _session(self, i):
+        return f'{self.prefix}-{i}'
+
+    def _run_sync(self, n, threads):
+        chatbot = LocalChatbot()
+
+        def one(i):
+            start = time.perf_counter()
+            chatbot.chat(MESSAGE, session_id=self._session(f's{i}'))
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            latencies = list(pool.map(one, range(n)))
+        return time.perf_counter() - start, latencies
+
+    async def _run_async(self, n):
+        chatbot = LocalChatbot()
+
+        async def one(i):
+            start = time.perf_counter()
+            await chatbot.achat(MESSAGE, session_id=self._session(f'a{i}'))
+            return time.perf_counter() - start
+
+        # Premier accès à la base hors mesure (connexion du thread ORM)
+        await sync_to_async(ChatbotConversation.objects.exists)()
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(one(i) for i in range(n)))
+        return time.perf_counter() - start, latencies
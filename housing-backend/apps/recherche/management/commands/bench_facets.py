@@ -0,0 +1,126 @@
+# apps/recherche/management/commands/bench_facets.py
+# ============================================================
+# Commande : python manage.py bench_facets
+# But      : Compare les statistiques d'origine de search_advanced
+#            (count() + trois aggregate() + décompte par catégorie)
+#            au moteur de facettes (facets.py) : SQL (un aggregate()
+#            + un GROUP BY par facette), l'index colonnaire, puis une
+#            relecture du cache. Le moteur calcule en plus l'histogramme
+#            des prix et les décomptes par type, ville, quartier et
+#            chambres. Les trois résultats doivent être identiques.
+# ============================================================
+
+from collections import Counter
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Avg, Count, Max, Min
+from django.test import override_settings
+
+from apps.housing.models import Housing
+from apps.recherche.facets import facet_engine
+from apps.recherche.listing_index import listing_index
+from ._bench import count_queries, measure, synthetic_catalogue
+
+
+def legacy_stats(queryset):
+    """search_advanced d'origine"""
+    return {
+        'total': queryset.count(),
+        'avg_price': queryset.aggregate(Avg('price'))['price__avg'] or 0,
+        'min_price': queryset.aggregate(Min('price'))['price__min'] or 0,
+        'max_price': queryset.aggregate(Max('price'))['price__max'] or 0,
+        'categories': list(queryset.values('category__name').annotate(count=Count('id'))),
+    }
+
+
+def comparable(facets):
+    """Réduit les facettes du moteur au périmètre de legacy_stats"""
+    price = facets['price']
+    return {
+        'total': facets['total'],
+        'avg_price': round(price['avg'] or 0, 6),
+        'min_price': price['min'] or 0,
+        'max_price': price['max'] or 0,
+        'categories': {c['name']: c['count'] for c in facets['categories']},
+    }
+
+
+def comparable_legacy(stats):
+    # Le tri par défaut de Housing entre dans le GROUP BY d'origine :
+    # une catégorie y revient sur plusieurs lignes, on les cumule.
+    categories = Counter()
+    for row in stats['categories']:
+        categories[row['category__name']] += row['count']
+    return dict(stats, avg_price=round(float(stats['avg_price']), 6), categories=dict(categories))
+
+
+class Command(BaseCommand):
+    help = 'Benchmark des facettes en une passe face aux agrégats séparés'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[5000, 20000])
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+
+        for size in options['sizes']:
+            self.stdout.write(f'\n📦 Catalogue de {size} logements...')
+            with synthetic_catalogue(size) as catalogue:
+                listing_index.invalidate()
+                listing_index.ensure_loaded()
+                city = catalogue.cities[0]
+                cases = {
+                    'sans filtre': {},
+                    'ville + prix': {'city': city.id, 'max_price': 300000},
+                    'fenêtre carte': {'sw_lat': 3.80, 'ne_lat': 3.90, 'sw_lng': 11.45, 'ne_lng': 11.55},
+                }
+                for label, filters in cases.items():
+                    queryset = self._queryset(filters)
+                    with override_settings(SEARCH_RESULT_CACHE_ENABLED=False):
+                        with override_settings(SEARCH_LISTING_INDEX_ENABLED=False):
+                            sql_facets = facet_engine.compute(queryset, filters)
+                            sql = self._run(lambda: facet_engine.compute(queryset, filters), repeat)
+                        index_facets = facet_engine.compute(queryset, filters)
+                        index = self._run(lambda: facet_engine.compute(queryset, filters), repeat)
+                    self._check(label, sql_facets, index_facets, legacy_stats(queryset))
+                    cache.clear()
+                    facet_engine.compute(queryset, filters)
+                    cached = self._run(lambda: facet_engine.compute(queryset, filters), repeat)
+                    legacy = self._run(lambda: legacy_stats(queryset), repeat)
+
+                    self.stdout.write(f'   {label} ({queryset.count()} logements)')
+                    for name, (ms, queries) in (('origine', legacy), ('SQL', sql),
+                                                ('index', index), ('cache', cached)):
+                        self.stdout.write(f'     {name:<12} {ms:8.2f} ms {queries:2} req')
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Benchmark terminé'))
+
+    @staticmethod
+    def _check(label, sql_facets, index_facets, legacy):
+        """Moteurs SQL et index identiques entre eux et fidèles à l'origine"""
+        if sql_facets != index_facets:
+            raise CommandError(f'❌ {label} : facettes SQL et index divergentes')
+        if comparable(sql_facets) != comparable_legacy(legacy):
+            raise CommandError(f'❌ {label} : facettes différentes des statistiques d\'origine')
+
+    @staticmethod
+    def _queryset(filters):
+        queryset = Housing.objects.filter(is_visible=True)
+        if filters.get('city'):
+            queryset = queryset.filter(city_id=filters['city'])
+        if filters.get('max_price'):
+            queryset = queryset.filter(price__lte=filters['max_price'])
+        if filters.get('sw_lat'):
+            queryset = queryset.filter(
+                latitude__gte=filters['sw_lat'], latitude__lte=filters['ne_lat'],
+                longitude__gte=filters['sw_lng'], longitude__lte=filters['ne_lng'],
+            )
+        return queryset
+
+    @staticmethod
+    def _run(fn, repeat):
+        with count_queries() as queries:
+            fn()
+        return measure(fn, repeat), queries.count
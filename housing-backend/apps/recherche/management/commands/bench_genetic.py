@@ -0,0 +1,46 @@
+# apps/recherche/management/commands/bench_genetic.py
+# ============================================================
+# Commande : python manage.py bench_genetic
+# But      : Compare le moteur génétique historique (listes Python)
+#            et le moteur vectorisé NumPy, et vérifie qu'à graine
+#            égale ils produisent le même classement.
+# ============================================================
+
+from django.core.management.base import BaseCommand
+
+from apps.recherche.genetic_algorithm import (
+    GeneticSearchOptimizer, VectorizedGeneticSearchOptimizer
+)
+from ._bench import measure
+
+
+class Command(BaseCommand):
+    help = 'Benchmark des moteurs de GeneticSearchOptimizer (python → numpy)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[50, 200, 1000])
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        preferences = {'diversity_weight': 0.2}
+        seed = options['seed']
+
+        for size in options['sizes']:
+            # Le GA ne lit que l'ordre : des entiers suffisent comme résultats
+            results = list(range(size))
+
+            def run(engine):
+                return engine(seed=seed).optimize(results, preferences, {})
+
+            identical = run(GeneticSearchOptimizer) == run(VectorizedGeneticSearchOptimizer)
+            python_ms = measure(lambda: run(GeneticSearchOptimizer), options['repeat'])
+            numpy_ms = measure(lambda: run(VectorizedGeneticSearchOptimizer), options['repeat'])
+
+            self.stdout.write(
+                f'   {size:>6} résultats | python {python_ms:9.1f} ms → numpy {numpy_ms:8.1f} ms '
+                f'(x{python_ms / max(numpy_ms, 1e-6):.1f}) | '
+                f'{"✓ identiques" if identical else "✗ DIFFÉRENTS"}'
+            )
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Benchmark terminé'))
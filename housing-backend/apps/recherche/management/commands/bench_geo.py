@@ -0,0 +1,47 @@
+# apps/recherche/management/commands/bench_geo.py
+# ============================================================
+# Commande : python manage.py bench_geo
+# But      : Compare le calcul de distances point par point
+#            (haversine scalaire) et le noyau vectorisé de geo.py.
+# ============================================================
+
+import random
+
+from django.core.management.base import BaseCommand
+
+from apps.recherche import geo
+from ._bench import measure
+
+
+class Command(BaseCommand):
+    help = 'Benchmark du noyau de distances (scalaire → vectorisé)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        if not geo.NUMPY_AVAILABLE:
+            self.stdout.write(self.style.WARNING('⚠️ NumPy absent : seul le repli scalaire est disponible'))
+
+        rng = random.Random(42)
+        origin = (3.8480, 11.5021)
+
+        for size in options['sizes']:
+            lats = [origin[0] + rng.uniform(-1, 1) for _ in range(size)]
+            lngs = [origin[1] + rng.uniform(-1, 1) for _ in range(size)]
+
+            scalar = geo._distances_scalar(*origin, lats, lngs)
+            vectorized = geo.distances_from(*origin, lats, lngs)
+            max_error = max(abs(a - b) for a, b in zip(scalar, vectorized))
+
+            scalar_ms = measure(lambda: geo._distances_scalar(*origin, lats, lngs), options['repeat'])
+            vector_ms = measure(lambda: geo.distances_from(*origin, lats, lngs), options['repeat'])
+
+            self.stdout.write(
+                f'   {size:>7} points | scalaire {scalar_ms:8.2f} ms → '
+                f'vectorisé {vector_ms:7.2f} ms (x{scalar_ms / max(vector_ms, 1e-6):.1f}) | '
+                f'écart max {max_error:.2e} km'
+            )
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Benchmark terminé'))
@@ -0,0 +1,142 @@
+# apps/recherche/management/commands/bench_lexicon.py
+# ============================================================
+# Commande : python manage.py bench_lexicon
+# But      : Compare la reconnaissance de mots-clés d'origine
+#            (un re.search / un « in » par mot-clé et par dictionnaire)
+#            au lexique compilé en une passe (lexicon.py), sur un corpus
+#            de requêtes FR / EN réalistes, et liste les divergences.
+# ============================================================
+
+import re
+
+from django.core.management.base import BaseCommand
+
+from apps.recherche import ai
+from apps.recherche.ai import extract_search_criteria_simple, search_lexicon
+from ._bench import measure
+
+
+CORPUS = {
+    'fr': [
+        "Je cherche un studio meublé à Yaoundé pour 50 000 FCFA",
+        "appartement 3 chambres à Bastos moins de 150000",
+        "chambre pas chère près de l'université de Yaoundé",
+        "villa avec piscine et jardin à Bonapriso, haut de gamme",
+        "studio non meublé à Douala Akwa entre 30 000 et 60 000",
+        "maison sécurisée avec parking et gardien, 120 m2",
+        "logement urgent près du marché Mokolo budget 40k",
+        "appart climatisé avec wifi proche supermarché à Makepe",
+        "chambre simple à Ngousso pour 25 mille, eau courante",
+        "cherche appartement moderne avec balcon et ascenseur à Bonanjo",
+        "studio proche hôpital et pharmacie à Essos à partir de 30000",
+        "maison 4 pièces avec salle de bain et cuisine équipée à Kribi",
+    ],
+    'en': [
+        "looking for a furnished studio in Douala under 80000",
+        "2 bedroom apartment near the university in Yaounde",
+        "cheap room close to the market in Bamenda",
+        "luxury house with swimming pool and garden in Buea",
+        "unfurnished flat with parking and security, 90 m2",
+        "apartment next to the hospital with air conditioning",
+        "room near school and bus station, affordable",
+        "modern apartment with balcony and elevator in Limbe",
+    ],
+}
+
+
+def legacy_keywords(query, language):
+    """Reconnaissance d'origine (ai.py avant le lexique compilé)"""
+    query = query.lower().strip()
+    found = {}
+    cities = ai.CITIES_CAMEROON.get(language, ai.CITIES_CAMEROON['fr'])
+    categories = ai.CATEGORIES_EN if language == 'en' else ai.CATEGORIES_FR
+    features_d = ai.FEATURES_EN if language == 'en' else ai.FEATURES_FR
+    nearby_d = ai.NEARBY_EN if language == 'en' else ai.NEARBY_FR
+
+    for key, canonical in cities.items():
+        if re.search(rf'\b{re.escape(key)}\b', query):
+            found['city'] = canonical
+            break
+    for key, (district, city) in ai.DISTRICTS_MAP.items():
+        if key in query:
+            found['district_name'] = district
+            found.setdefault('city', city)
+            break
+    for key, canonical in categories.items():
+        if re.search(rf'\b{re.escape(key)}\b', query):
+            found['category_name'] = canonical
+            break
+
+    furnished = ai.FURNISHED_KEYWORDS[language]
+    if any(w in query for w in furnished['furnished']):
+        found['furnished'] = True
+    elif any(w in query for w in furnished['unfurnished']):
+        found['furnished'] = False
+
+    features = [f for k, f in sorted(features_d.items(), key=lambda x: -len(x[0])) if k in query]
+    if features:
+        found['features'] = list(dict.fromkeys(features))
+    nearby = [p for k, p in sorted(nearby_d.items(), key=lambda x: -len(x[0])) if k in query]
+    if nearby:
+        found['nearby_places'] = list(dict.fromkeys(nearby))
+    if nearby or any(w in query for w in ai.PROXIMITY_WORDS):
+        found['intent'] = 'nearby'
+    for sort in ai.SORT_PRIORITY:
+        if any(w in query for w in ai.SORT_KEYWORDS[sort]):
+            found['sort'] = sort
+            break
+    return found
+
+
+KEYWORD_FIELDS = ('city', 'district_name', 'category_name', 'furnished',
+                  'features', 'nearby_places', 'intent', 'sort')
+
+
+class Command(BaseCommand):
+    help = 'Benchmark de la reconnaissance de mots-clés (par mot-clé → lexique compilé)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--loops', type=int, default=200,
+                            help='Passes sur le corpus par mesure')
+
+    def handle(self, *args, **options):
+        repeat, loops = options['repeat'], options['loops']
+
+        for language, queries in CORPUS.items():
+            lowered = [q.lower() for q in queries]
+            matcher = search_lexicon(language)
+            calls = loops * len(queries)
+
+            legacy_ms = measure(
+                lambda: [legacy_keywords(q, language) for _ in range(loops) for q in queries], repeat
+            )
+            lexicon_ms = measure(
+                lambda: [matcher.find(q) for _ in range(loops) for q in lowered], repeat
+            )
+            full_ms = measure(
+                lambda: [extract_search_criteria_simple(q, language) for _ in range(loops) for q in queries],
+                repeat,
+            )
+            self.stdout.write(
+                f'\n🔤 {language.upper()} | {len(matcher)} mots-clés, {len(queries)} requêtes\n'
+                f'   mots-clés : d\'origine {legacy_ms * 1000 / calls:7.1f} µs → '
+                f'lexique {lexicon_ms * 1000 / calls:6.1f} µs par requête '
+                f'(x{legacy_ms / max(lexicon_ms, 1e-6):.1f})\n'
+                f'   extraction complète : {full_ms * 1000 / calls:6.1f} µs par requête'
+            )
+
+            for query in queries:
+                before = legacy_keywords(query, language)
+                after = extract_search_criteria_simple(query, language)
+                diff = {
+                    field: (before.get(field), after.get(field))
+                    for field in KEYWORD_FIELDS
+                    if before.get(field) != after.get(field)
+                }
+                if diff:
+                    self.stdout.write(f'   ≠ « {query} »')
+                    for field, (old, new) in diff.items():
+                        self.stdout.write(f'       {field}: {old!r} → {new!r}')
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Benchmark terminé'))
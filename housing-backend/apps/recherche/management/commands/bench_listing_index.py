@@ -0,0 +1,78 @@
+# apps/recherche/management/commands/bench_listing_index.py
+# ============================================================
+# Commande : python manage.py bench_listing_index
+# But      : Compare le filtrage ORM de SearchEngine._apply_filters
+#            et l'index colonnaire NumPy sur un catalogue synthétique.
+# ============================================================
+
+from django.core.management.base import BaseCommand
+
+from apps.housing.models import Housing
+from apps.recherche.listing_index import ListingIndex
+from apps.recherche.search_engine import SearchEngine
+from ._bench import synthetic_catalogue, measure
+
+
+class Command(BaseCommand):
+    help = "Benchmark de l'index colonnaire face au chemin ORM"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[10000, 100000, 500000],
+            help='Tailles de catalogue à tester (défaut: 10k 100k 500k)',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Nombre de répétitions par mesure (médiane retenue)',
+        )
+
+    def handle(self, *args, **options):
+        engine = SearchEngine()
+
+        for size in options['sizes']:
+            self.stdout.write(f'\n📦 Catalogue de {size} logements...')
+            with synthetic_catalogue(size) as catalogue:
+                yaounde = catalogue.cities[0]
+                scenarios = {
+                    'ville + budget': {
+                        'city': yaounde.id, 'max_price': 150000,
+                    },
+                    'catégorie + chambres + surface': {
+                        'category': catalogue.categories[2].id,
+                        'min_rooms': 2, 'min_area': 40,
+                    },
+                    'quartier + fourchette de prix': {
+                        'district': catalogue.districts[0].id,
+                        'min_price': 50000, 'max_price': 200000,
+                    },
+                }
+
+                index = ListingIndex(ttl=float('inf'))
+                load_ms = measure(index.load, repeat=1)
+                self.stdout.write(f'   Chargement de l\'index : {load_ms:.1f} ms')
+
+                base = Housing.objects.filter(status='disponible', is_visible=True)
+                for label, filters in scenarios.items():
+                    full_qs = base.select_related(
+                        'owner', 'category', 'housing_type', 'region', 'city', 'district'
+                    )
+                    orm_full = measure(
+                        lambda: list(engine._apply_orm_filters(full_qs, filters)),
+                        options['repeat'],
+                    )
+                    orm_ids = measure(
+                        lambda: list(engine._apply_orm_filters(base, filters).values_list('id', flat=True)),
+                        options['repeat'],
+                    )
+                    numpy_ids = measure(lambda: index.filter_ids(filters), options['repeat'])
+                    matches = len(index.filter_ids(filters))
+
+                    self.stdout.write(
+                        f'   {label:<32} {matches:>7} résultats | '
+                        f'ORM objets {orm_full:9.1f} ms | '
+                        f'ORM ids {orm_ids:8.1f} ms | '
+                        f'index {numpy_ids:6.2f} ms | '
+                        f'×{orm_full / max(numpy_ids, 1e-3):.0f}'
+                    )
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Benchmark terminé'))
@@ -0,0 +1,102 @@
+# apps/recherche/management/commands/bench_llm_client.py
+# ============================================================
+# Commande : python manage.py bench_llm_client
+# But      : Mesure le client LLM partagé contre le serveur Ollama
+#            factice : réutilisation des connexions, borne de
+#            concurrence, et repli immédiat sur les règles quand le
+#            modèle est trop lent (disjoncteur).
+# ============================================================
+
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from apps.recherche import ai
+from apps.recherche.llm_client import llm_metrics, get_llm_client, reset_llm_clients
+from apps.recherche.llm_health import ollama_health
+from apps.recherche.llm_stub import StubOllamaServer
+
+
+QUERY = "Appartement 2 chambres à Douala moins de 150 000 FCFA"
+
+
+class Command(BaseCommand):
+    help = 'Benchmark du client LLM (pool, sémaphore, disjoncteur) sur un Ollama factice'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=40)
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--delay', type=float, default=0.05)
+
+    def handle(self, *args, **options):
+        calls, threads, delay = options['calls'], options['threads'], options['delay']
+
+        # 1. Connexions : requests.post par appel vs session partagée
+        with StubOllamaServer(delay=delay) as stub:
+            payload = {'model': 'mistral', 'prompt': QUERY, 'stream': False}
+            for _ in range(calls):
+                requests.post(f'{stub.url}/api/generate', json=payload, timeout=10)
+            legacy = stub.connections
+
+            with self._settings(stub.url):
+                stub.connections = 0
+                for _ in range(calls):
+                    ai._ollama_criteria(QUERY)
+                pooled = stub.connections
+        self.stdout.write(
+            f'\n🔌 {calls} appels séquentiels : {legacy} connexions (requests.post) → '
+            f'{pooled} (session partagée)'
+        )
+
+        # 2. Concurrence bornée : modèle lent, rafale de requêtes
+        with StubOllamaServer(delay=0.5) as stub, self._settings(stub.url, LLM_MAX_CONCURRENCY=4):
+            ollama_health.refresh()
+            llm_metrics.reset()
+            latencies, results = self._burst(threads, threads)
+            snapshot = llm_metrics.snapshot().get('ollama.extract', {})
+        self.stdout.write(
+            f'\n🚦 Rafale de {threads} extractions, modèle à 0,5 s, 4 emplacements :\n'
+            f'   {snapshot.get("calls", 0)} appels LLM, {snapshot.get("rejected", 0)} replis (aucun emplacement libre) '
+            f'| latence médiane {statistics.median(latencies):.0f} ms, max {max(latencies):.0f} ms'
+        )
+
+        # 3. Disjoncteur : modèle plus lent que le budget
+        budgets = {'extract': 0.3, 'chat': 0.3, 'health': 2.0}
+        with StubOllamaServer(delay=1.0) as stub, self._settings(stub.url, LLM_BUDGETS=budgets):
+            ollama_health.refresh()
+            llm_metrics.reset()
+            latencies, results = self._burst(calls, 1)
+            client = get_llm_client('ollama')
+            snapshot = llm_metrics.snapshot().get('ollama.extract', {})
+        self.stdout.write(
+            f'\n⚡ {calls} extractions, modèle à 1 s, budget 0,3 s :\n'
+            f'   {snapshot.get("errors", 0)} timeouts puis {snapshot.get("rejected", 0)} refus immédiats '
+            f'(disjoncteur {client.breaker.state}), tous servis par les règles\n'
+            f'   latence : 3 premiers {statistics.mean(latencies[:3]):.0f} ms, '
+            f'suivants {statistics.median(latencies[3:]):.2f} ms (médiane)'
+        )
+
+        reset_llm_clients()
+        self.stdout.write(self.style.SUCCESS('\n✅ Benchmark terminé'))
+
+    def _settings(self, url, **extra):
+        """Réglages d'essai : pas de cache des critères, client neuf"""
+        reset_llm_clients()
+        llm_metrics.reset()
+        return override_settings(
+            OLLAMA_API_URL=url, SEARCH_CRITERIA_CACHE_ENABLED=False, **extra
+        )
+
+    def _burst(self, calls, threads):
+        def one(_):
+            start = time.perf_counter()
+            criteria = ai.extract_search_criteria(QUERY, method='ollama')
+            return (time.perf_counter() - start) * 1000, criteria
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            outcomes = list(pool.map(one, range(calls)))
+        return [o[0] for o in outcomes], [o[1] for o in outcomes]
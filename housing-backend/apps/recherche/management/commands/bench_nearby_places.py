@@ -0,0 +1,85 @@
+# apps/recherche/management/commands/bench_nearby_places.py
+# ============================================================
+# Commande : python manage.py bench_nearby_places
+# But      : Compare le filtre "près d'une école" historique
+#            (une requête NearbyPlace par logement) et la table
+#            de proximité précalculée (une seule requête).
+# ============================================================
+
+import random
+
+from django.core.management.base import BaseCommand
+
+from apps.housing.models import Housing
+from apps.recherche.models import NearbyPlace
+from apps.recherche.proximity import invalidate_proximity_table
+from apps.recherche.search_engine import SearchEngine
+from ._bench import synthetic_catalogue, measure, count_queries
+
+
+def legacy_filter(queryset, place_types):
+    """Ancienne implémentation de SearchEngine._filter_by_nearby_places"""
+    housing_ids = []
+    for housing in queryset:
+        nearby = NearbyPlace.objects.filter(city=housing.city, place_type__in=place_types)
+        if housing.district:
+            nearby = nearby.filter(district=housing.district)
+        if nearby.exists():
+            housing_ids.append(housing.id)
+    return queryset.filter(id__in=housing_ids)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark du filtre par lieux à proximité (N+1 requêtes → 1)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[500, 2000, 10000])
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        engine = SearchEngine()
+        place_types = ['school', 'hospital']
+        rng = random.Random(7)
+
+        for size in options['sizes']:
+            self.stdout.write(f'\n📦 Catalogue de {size} logements...')
+            with synthetic_catalogue(size) as catalogue:
+                NearbyPlace.objects.bulk_create([
+                    NearbyPlace(
+                        name=f'Lieu {i}', name_fr=f'Lieu {i}',
+                        place_type=rng.choice([c for c, _ in NearbyPlace.PLACE_TYPE_CHOICES]),
+                        region=district.city.region, city=district.city,
+                        district=district if rng.random() > 0.2 else None,
+                    )
+                    for i, district in enumerate(catalogue.districts * 2)
+                ])
+                invalidate_proximity_table()
+
+                base = Housing.objects.filter(
+                    status='disponible', is_visible=True
+                ).select_related('city', 'district')
+
+                with count_queries() as legacy_queries:
+                    legacy_ids = set(legacy_filter(base, place_types).values_list('id', flat=True))
+                invalidate_proximity_table()
+                with count_queries() as cold_queries:
+                    new_ids = set(engine._filter_by_nearby_places(base, place_types).values_list('id', flat=True))
+                with count_queries() as warm_queries:
+                    list(engine._filter_by_nearby_places(base, place_types).values_list('id', flat=True))
+
+                legacy_ms = measure(lambda: list(legacy_filter(base, place_types)), options['repeat'])
+                new_ms = measure(
+                    lambda: list(engine._filter_by_nearby_places(base, place_types)),
+                    options['repeat'],
+                )
+
+                status = '✓ identiques' if legacy_ids == new_ids else '✗ DIFFÉRENTS'
+                self.stdout.write(
+                    f'   {len(new_ids):>6} résultats ({status}) | '
+                    f'requêtes : {legacy_queries.count} → {cold_queries.count} '
+                    f'(table froide), {warm_queries.count} (table en cache) | '
+                    f'{legacy_ms:9.1f} ms → {new_ms:7.1f} ms'
+                )
+                invalidate_proximity_table()
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Benchmark terminé'))
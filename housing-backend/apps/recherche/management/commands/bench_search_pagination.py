@@ -0,0 +1,138 @@
+# apps/recherche/management/commands/bench_search_pagination.py
+# ============================================================
+# Commande : python manage.py bench_search_pagination
+# But      : Compare la pagination d'origine (tous les logements
+#            chargés, triés en Python, puis Paginator / [:20]) au
+#            classement en flux avec tas borné et curseur
+#            (pagination.py) : temps, pic mémoire Python (tracemalloc)
+#            et requêtes SQL, pour /search/ et /nlp/.
+# ============================================================
+
+import tracemalloc
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.test import override_settings
+
+from apps.housing.models import Housing
+from apps.recherche import result_cache
+from apps.recherche.geo import housing_distances
+from apps.recherche.scoring import compute_smart_score
+from apps.recherche.search_engine import SearchEngine
+from apps.recherche.utils import get_distance_category
+from apps.recherche.views import NLPSearchAPIView
+from ._bench import count_queries, measure, synthetic_catalogue
+
+
+def legacy_form_page(engine, filters, page, page_size):
+    """HousingSearchAPIView d'origine : liste complète triée, puis Paginator"""
+    queryset = engine._apply_filters(engine._base_queryset(), filters)
+    results = engine._default_sorting(list(queryset), filters)
+    return list(Paginator(results, page_size).get_page(page).object_list)
+
+
+def legacy_nlp_top(view, queryset, criteria):
+    """NLPSearchAPIView._ranked_results d'origine : tout noter, tout trier, garder 20"""
+    candidates = list(queryset.prefetch_related('images'))
+    distances = housing_distances(criteria['lat'], criteria['lng'], candidates)
+    for h, distance in zip(candidates, distances):
+        if distance is not None:
+            h.distance = round(distance, 2)
+            h.distance_category = get_distance_category(distance)
+        h.score = compute_smart_score(h, criteria, distance)
+    candidates.sort(key=lambda x: -x.score)
+    return candidates[:20]
+
+
+def streamed_nlp_top(view, queryset, criteria):
+    """Chemin actuel : top 20 en flux, puis les 20 logements complets"""
+    ranked = view._ranked_results(queryset, criteria, k=20)
+    return result_cache.hydrate(queryset.prefetch_related('images'), [h.id for h in ranked.items])
+
+
+def peak_kib(fn) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark de la pagination en flux (tas borné + curseur) face au tri complet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[5000, 20000, 50000])
+        parser.add_argument('--page-size', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    @override_settings(SEARCH_RESULT_CACHE_ENABLED=False, SEARCH_LISTING_INDEX_ENABLED=False)
+    def handle(self, *args, **options):
+        page_size, repeat = options['page_size'], options['repeat']
+        engine = SearchEngine()
+        view = NLPSearchAPIView()
+        cache.clear()
+
+        for size in options['sizes']:
+            self.stdout.write(f'\n📦 Catalogue de {size} logements...')
+            with synthetic_catalogue(size) as catalogue:
+                filters = {'ordering': 'price', 'max_price': 500000}
+                total = engine.search_page(filters=filters, page_size=page_size).total
+                self.stdout.write(f'   /search/ : {total} résultats, tri par prix, pages de {page_size}')
+
+                for page in (1, 5):
+                    # Égalités de prix : ordre de création avant, id maintenant
+                    legacy_prices = [h.price for h in legacy_form_page(engine, filters, page, page_size)]
+                    streamed = engine.search_page(filters=filters, page_size=page_size, page=page)
+                    same = legacy_prices == [h.price for h in streamed.results]
+                    self._row(
+                        f'page {page}',
+                        lambda: legacy_form_page(engine, filters, page, page_size),
+                        lambda: engine.search_page(filters=filters, page_size=page_size, page=page),
+                        repeat, f'mêmes prix : {same}',
+                    )
+
+                # Page suivante par curseur (le tas ne garde qu'une page)
+                cursor = engine.search_page(filters=filters, page_size=page_size, page=4).next_cursor
+                self._row(
+                    'page 5 (curseur)',
+                    lambda: legacy_form_page(engine, filters, 5, page_size),
+                    lambda: engine.search_page(filters=filters, page_size=page_size, cursor=cursor),
+                    repeat,
+                )
+
+                city = catalogue.cities[0]
+                criteria = {'city': city.name, 'city_id': city.id, 'max_price': 400000,
+                            'lat': 3.85, 'lng': 11.50, 'language': 'fr'}
+                queryset = view._apply_filters(
+                    Housing.objects.filter(is_visible=True, status='disponible').select_related(
+                        'owner', 'category', 'housing_type', 'region', 'city', 'district'
+                    ),
+                    criteria,
+                )
+                legacy_scores = [h.score for h in legacy_nlp_top(view, queryset, criteria)]
+                streamed_scores = [h.score for h in view._ranked_results(queryset, criteria, k=20).items]
+                self.stdout.write(f'   /nlp/ : {queryset.count()} candidats notés, top 20')
+                self._row(
+                    'top 20',
+                    lambda: legacy_nlp_top(view, queryset, criteria),
+                    lambda: streamed_nlp_top(view, queryset, criteria),
+                    repeat, f'mêmes scores : {legacy_scores == streamed_scores}',
+                )
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Benchmark terminé'))
+
+    def _row(self, label, legacy, streamed, repeat, note=''):
+        with count_queries() as legacy_queries:
+            legacy()
+        with count_queries() as streamed_queries:
+            streamed()
+        legacy_ms, streamed_ms = measure(legacy, repeat), measure(streamed, repeat)
+        legacy_kib, streamed_kib = peak_kib(legacy), peak_kib(streamed)
+        self.stdout.write(
+            f'     {label:<17} origine {legacy_ms:8.1f} ms {legacy_kib:9.0f} Kio {legacy_queries.count:2} req | '
+            f'flux {streamed_ms:8.1f} ms {streamed_kib:7.0f} Kio {streamed_queries.count:2} req'
+            + (f' | {note}' if note else '')
+        )
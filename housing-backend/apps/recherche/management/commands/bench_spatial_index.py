@@ -0,0 +1,71 @@
+# apps/recherche/management/commands/bench_spatial_index.py
+# ============================================================
+# Commande : python manage.py bench_spatial_index
+# But      : Compare le filtre "Autour de moi" historique (boîte
+#            lat/lng en SQL + haversine sur chaque ligne) et l'index
+#            spatial en mémoire (rayon et k plus proches voisins).
+# ============================================================
+
+from django.core.management.base import BaseCommand
+
+from apps.housing.models import Housing
+from apps.recherche.geo import bounding_box, housing_distances
+from apps.recherche.spatial_index import SpatialIndex
+from ._bench import synthetic_catalogue, measure, CITY_CENTERS
+
+
+def legacy_radius(lat, lng, radius):
+    """Ancienne implémentation de HousingViewSet.nearby (sans sérialisation)"""
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius)
+    candidates = list(Housing.objects.filter(
+        is_visible=True,
+        latitude__range=(min_lat, max_lat),
+        longitude__range=(min_lng, max_lng),
+    ).exclude(latitude__isnull=True).exclude(longitude__isnull=True))
+    results = [
+        (d, h.id) for d, h in zip(housing_distances(lat, lng, candidates), candidates)
+        if d is not None and d <= radius
+    ]
+    results.sort()
+    return results
+
+
+class Command(BaseCommand):
+    help = "Benchmark de l'index spatial pour /api/housings/nearby/"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+        parser.add_argument('--radius', type=float, default=2.0)
+        parser.add_argument('--k', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        radius, k = options['radius'], options['k']
+        # Centre-ville de Douala (Akwa) : zone la plus dense du catalogue
+        lat, lng = CITY_CENTERS['Douala']
+
+        for size in options['sizes']:
+            self.stdout.write(f'\n📦 Catalogue de {size} logements...')
+            with synthetic_catalogue(size):
+                index = SpatialIndex()
+                load_ms = measure(index.load, 1)
+
+                legacy = legacy_radius(lat, lng, radius)
+                indexed = index.within_radius(lat, lng, radius)
+                same_ids = [pk for _, pk in legacy] == [pk for _, pk in indexed]
+
+                legacy_ms = measure(lambda: legacy_radius(lat, lng, radius), options['repeat'])
+                radius_ms = measure(lambda: index.within_radius(lat, lng, radius), options['repeat'])
+                knn_ms = measure(lambda: index.nearest(lat, lng, k), options['repeat'])
+
+                expected_knn = [pk for _, pk in index.within_radius(lat, lng, 1000)[:k]]
+                knn_ok = [pk for _, pk in index.nearest(lat, lng, k)] == expected_knn
+
+                self.stdout.write(
+                    f'   chargement {load_ms:7.1f} ms | rayon {radius} km : {len(indexed)} résultats '
+                    f'({"✓ identiques" if same_ids else "✗ DIFFÉRENTS"}) '
+                    f'{legacy_ms:8.1f} ms → {radius_ms:6.2f} ms | '
+                    f'k={k} : {knn_ms:6.2f} ms ({"✓" if knn_ok else "✗"})'
+                )
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Benchmark terminé'))
@@ -0,0 +1,203 @@
+# apps/recherche/management/commands/bench_voice_pipeline.py
+# ============================================================
+# Commande : python manage.py bench_voice_pipeline
+# But      : Compare la préparation audio d'origine (upload écrit sur
+#            disque, conversion WAV à côté, relecture complète) à la
+#            chaîne en mémoire d'audio_pipeline.py (décodage →
+#            16 kHz mono → segments parlés), sur des messages vocaux
+#            synthétiques : temps, octets écrits en fichiers temporaires
+#            et secondes d'audio envoyées au moteur de reconnaissance,
+#            ramenés à une minute d'audio.
+# ============================================================
+
+import io
+import os
+import shutil
+import tempfile
+import wave
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from apps.recherche import audio_pipeline
+from apps.recherche.audio_pipeline import prepare_audio
+from ._bench import measure
+
+
+def synthetic_message(seconds: float, rate: int, channels: int, seed: int = 7):
+    """
+    Message vocal synthétique : silences de début et de fin, « phrases »
+    harmoniques modulées en syllabes, pauses variables, bruit de fond.
+
+    Returns:
+        (octets WAV PCM 16 bits, [(début, fin)] des phrases en secondes)
+    """
+    rng = np.random.default_rng(seed)
+    total = int(seconds * rate)
+    signal = rng.normal(0, 10 ** (-62 / 20), total)
+
+    phrases = []
+    t = rng.uniform(1.0, 2.0)
+    end_of_speech = seconds - rng.uniform(1.5, 2.5)
+    while t < end_of_speech:
+        length = min(rng.uniform(0.8, 3.5), end_of_speech - t)
+        if length < 0.3:
+            break
+        start, stop = int(t * rate), int((t + length) * rate)
+        time_axis = np.arange(stop - start) / rate
+        pitch = rng.uniform(110, 220)
+        voice = sum(np.sin(2 * np.pi * pitch * k * time_axis) / k for k in range(1, 6))
+        syllables = 0.5 * (1 - np.cos(2 * np.pi * rng.uniform(3.5, 5.5) * time_axis))
+        signal[start:stop] += 0.25 * voice * syllables
+        phrases.append((t, t + length))
+        t += length + rng.uniform(0.3, 2.5)
+
+    pcm = (np.clip(signal, -1, 1) * 32767).astype('<i2')
+    if channels > 1:
+        pcm = np.repeat(pcm, channels)
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue(), phrases
+
+
+def _encode(wav_bytes: bytes, audio_format: str) -> bytes:
+    from pydub import AudioSegment
+    out = io.BytesIO()
+    AudioSegment.from_wav(io.BytesIO(wav_bytes)).export(out, format=audio_format)
+    return out.getvalue()
+
+
+def _disk_usage(directory: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(directory) for name in names
+    )
+
+
+class LegacyRun:
+    """
+    Chaîne d'origine de VoiceRecognition.transcribe : l'upload est écrit en
+    fichier, converti en WAV à côté (pydub) s'il n'en est pas un, puis relu
+    en entier (sr.AudioFile + record) à sa fréquence d'origine.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.disk_bytes = 0
+        self.sent_seconds = 0.0
+
+    def __call__(self, data: bytes, audio_format: str):
+        path = os.path.join(self.directory, f'upload.{audio_format}')
+        with open(path, 'wb') as f:
+            f.write(data)
+        if audio_format != 'wav':
+            from pydub import AudioSegment
+            wav_path = path.rsplit('.', 1)[0] + '.wav'
+            AudioSegment.from_file(path, format=audio_format).export(wav_path, format='wav')
+            path = wav_path
+        with wave.open(path, 'rb') as wav:
+            frames = wav.readframes(wav.getnframes())
+            self.sent_seconds = wav.getnframes() / wav.getframerate()
+        self.disk_bytes = _disk_usage(self.directory)
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+        return frames
+
+
+class Command(BaseCommand):
+    help = 'Benchmark de la préparation audio (disque + clip entier vs mémoire + segments parlés)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=60.0, help="durée d'un message")
+        parser.add_argument('--rate', type=int, default=44100)
+        parser.add_argument('--channels', type=int, default=2)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        seconds, repeat = options['seconds'], options['repeat']
+        wav_bytes, phrases = synthetic_message(seconds, options['rate'], options['channels'])
+        speech_seconds = sum(end - start for start, end in phrases)
+        per_minute = 60.0 / seconds
+
+        self.stdout.write(
+            f"Message : {seconds:.0f} s, {options['rate']} Hz, {options['channels']} canal(aux), "
+            f"{len(phrases)} phrases, {speech_seconds:.1f} s de parole"
+        )
+
+        inputs = {'wav': wav_bytes}
+        if audio_pipeline._pydub_available() and shutil.which('ffmpeg'):
+            for audio_format in ('mp3', 'ogg'):
+                inputs[audio_format] = _encode(wav_bytes, audio_format)
+        else:
+            self.stdout.write('(pydub / ffmpeg absents : formats compressés ignorés)')
+
+        rows = []
+        scratch = tempfile.mkdtemp(prefix='bench-voice-')
+        original_tempdir = tempfile.tempdir
+        try:
+            for audio_format, data in inputs.items():
+                legacy = LegacyRun(os.path.join(scratch, 'legacy'))
+                os.makedirs(legacy.directory)
+                legacy_ms = measure(lambda: legacy(data, audio_format), repeat)
+
+                # Tout fichier temporaire de la nouvelle chaîne atterrirait ici
+                watched = os.path.join(scratch, 'pipeline')
+                os.makedirs(watched)
+                tempfile.tempdir = watched
+                result = {}
+
+                def run_pipeline():
+                    prepared = prepare_audio(io.BytesIO(data))
+                    result['prepared'] = prepared
+                    result['wav'] = prepared.wav()
+
+                pipeline_ms = measure(run_pipeline, repeat)
+                tempfile.tempdir = original_tempdir
+                pipeline_disk = _disk_usage(watched) + len(os.listdir(watched))
+
+                prepared = result['prepared']
+                rows.append((audio_format, legacy_ms, pipeline_ms, legacy.disk_bytes,
+                             pipeline_disk, legacy.sent_seconds, prepared.voiced_seconds,
+                             len(result['wav'].getvalue())))
+                recall = self._speech_kept(prepared, phrases)
+        finally:
+            tempfile.tempdir = original_tempdir
+            shutil.rmtree(scratch, ignore_errors=True)
+
+        self.stdout.write('\nPar minute d\'audio :')
+        self.stdout.write(
+            f"{'format':<7}{'origine ms':>12}{'mémoire ms':>12}{'disque origine':>16}"
+            f"{'disque mémoire':>16}{'audio envoyé':>20}{'WAV envoyé':>14}"
+        )
+        for (audio_format, legacy_ms, pipeline_ms, legacy_disk, pipeline_disk,
+             legacy_sent, pipeline_sent, wav_size) in rows:
+            self.stdout.write(
+                f"{audio_format:<7}{legacy_ms * per_minute:>12.1f}{pipeline_ms * per_minute:>12.1f}"
+                f"{legacy_disk * per_minute / 1e6:>13.2f} Mo{pipeline_disk * per_minute / 1e6:>13.2f} Mo"
+                f"{legacy_sent * per_minute:>9.1f} s → {pipeline_sent * per_minute:>5.1f} s"
+                f"{wav_size * per_minute / 1e6:>11.2f} Mo"
+            )
+        self.stdout.write(
+            f"\nParole conservée par la détection : {recall:.1%} "
+            f"({len(prepared.segments)} segments)"
+        )
+        self.stdout.write(
+            "Le moteur de reconnaissance n'est pas appelé : son coût suit la "
+            "colonne « audio envoyé »."
+        )
+
+    @staticmethod
+    def _speech_kept(prepared, phrases) -> float:
+        """Part des phrases synthétiques couverte par les segments retenus"""
+        rate = prepared.sample_rate
+        covered = np.zeros(int(max(end for _, end in phrases) * rate) + 1, dtype=bool)
+        truth = np.zeros_like(covered)
+        for start, end in prepared.segments:
+            covered[start:end] = True
+        for start, end in phrases:
+            truth[int(start * rate):int(end * rate)] = True
+        return float((covered & truth).sum() / truth.sum())
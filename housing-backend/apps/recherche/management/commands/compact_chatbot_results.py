@@ -0,0 +1,41 @@
+# apps/recherche/management/commands/compact_chatbot_results.py
+# ============================================================
+# Commande : python manage.py compact_chatbot_results
+# But      : Réécrit les ChatbotMessage.search_results encore au
+#            format complet (fiches JSON) en identifiants classés et
+#            affiche la place gagnée. La migration 0005 fait la même
+#            opération ; la commande sert aux lignes écrites par des
+#            processus pas encore mis à jour pendant un déploiement.
+# ============================================================
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.recherche.conversation_window import compact_search_results
+from apps.recherche.models import ChatbotMessage
+
+
+class Command(BaseCommand):
+    help = 'Compacte ChatbotMessage.search_results (identifiants seulement) et mesure la place gagnée'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Mesure sans écrire')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            report = compact_search_results(ChatbotMessage, batch_size=options['batch_size'])
+            if options['dry_run']:
+                transaction.set_rollback(True)
+
+        before, after = report['bytes_before'], report['bytes_after']
+        saved = before - after
+        ratio = f' ({saved / before:.0%})' if before else ''
+        self.stdout.write(
+            f"\n🗜️  {report['rows']} messages, {report['compacted']} à l'ancien format\n"
+            f"   search_results : {before / 1024:.1f} Ko → {after / 1024:.1f} Ko, "
+            f"{saved / 1024:.1f} Ko gagnés{ratio}"
+        )
+        if options['dry_run']:
+            self.stdout.write('   (simulation : aucune ligne modifiée)')
+        self.stdout.write(self.style.SUCCESS('\n✅ Terminé'))
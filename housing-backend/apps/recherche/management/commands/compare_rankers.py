@@ -0,0 +1,92 @@
+# apps/recherche/management/commands/compare_rankers.py
+# ============================================================
+# Commande : python manage.py compare_rankers
+# But      : Compare hors ligne les classements génétiques et le
+#            classement déterministe top-k + MMR : latence, recouvrement
+#            du top-k avec la sortie du GA, stabilité entre deux appels.
+# ============================================================
+
+from django.core.management.base import BaseCommand
+
+from apps.housing.genetic_algorithm import apply_genetic_algorithm, apply_topk_mmr
+from apps.housing.models import Housing
+from apps.recherche.genetic_algorithm import calculate_housing_score, get_genetic_optimizer
+from apps.recherche.ranking import topk_mmr
+from apps.recherche.search_engine import SearchEngine
+from ._bench import synthetic_catalogue, measure
+
+
+def ids(results, k):
+    """k premiers identifiants distincts (le GA de recommended produit des doublons)"""
+    distinct = []
+    for h in results:
+        if h.id not in distinct:
+            distinct.append(h.id)
+            if len(distinct) == k:
+                break
+    return distinct
+
+
+def overlap(a, b, k):
+    """Part des k premiers de `a` présents dans les k premiers de `b`"""
+    top_a, top_b = set(ids(a, k)), set(ids(b, k))
+    return len(top_a & top_b) / max(len(top_a), 1)
+
+
+class Command(BaseCommand):
+    help = 'Compare GA et top-k + MMR (latence, recouvrement, stabilité)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[200, 1000])
+        parser.add_argument('--k', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        k = options['k']
+        engine = SearchEngine()
+        preferences = engine._default_preferences()
+
+        for size in options['sizes']:
+            self.stdout.write(f'\n📦 Catalogue de {size} logements...')
+            with synthetic_catalogue(size) as catalogue:
+                housings = Housing.objects.filter(is_visible=True, status='disponible').select_related(
+                    'category', 'district', 'city'
+                )
+                candidates = list(housings)
+                filters = {'min_price': 50000, 'max_price': 200000, 'min_area': 30}
+
+                # SearchEngine : GeneticSearchOptimizer vs top-k + MMR
+                optimizer = get_genetic_optimizer()
+                score = lambda h: calculate_housing_score(h, preferences, filters)
+                ga = optimizer.optimize(list(candidates), preferences, filters)
+                mmr = topk_mmr(list(candidates), score, k=k)
+                self._report(
+                    'SearchEngine',
+                    measure(lambda: optimizer.optimize(list(candidates), preferences, filters), options['repeat']),
+                    measure(lambda: topk_mmr(list(candidates), score, k=k), options['repeat']),
+                    overlap(mmr, ga, k),
+                    ids(ga, k) == ids(optimizer.optimize(list(candidates), preferences, filters), k),
+                    ids(mmr, k) == ids(topk_mmr(list(candidates), score, k=k), k),
+                )
+
+                # recommended : GeneticAlgorithm vs top-k + MMR
+                user = catalogue.owner
+                ga = apply_genetic_algorithm(user, housings)
+                mmr = apply_topk_mmr(user, housings, k=k)
+                self._report(
+                    'recommended',
+                    measure(lambda: apply_genetic_algorithm(user, housings), options['repeat']),
+                    measure(lambda: apply_topk_mmr(user, housings, k=k), options['repeat']),
+                    overlap(mmr, ga, k),
+                    ids(ga, k) == ids(apply_genetic_algorithm(user, housings), k),
+                    ids(mmr, k) == ids(apply_topk_mmr(user, housings, k=k), k),
+                )
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Comparaison terminée'))
+
+    def _report(self, label, ga_ms, mmr_ms, top_overlap, ga_stable, mmr_stable):
+        self.stdout.write(
+            f'   {label:<13} | GA {ga_ms:9.1f} ms → top-k+MMR {mmr_ms:8.1f} ms | '
+            f'recouvrement top-k {top_overlap:5.0%} | '
+            f'stable : GA {"oui" if ga_stable else "non"}, MMR {"oui" if mmr_stable else "non"}'
+        )
@@ -0,0 +1,36 @@
+# apps/recherche/management/commands/llm_stub_server.py
+# ============================================================
+# Commande : python manage.py llm_stub_server
+# But      : Lance un serveur Ollama factice (latence et taux
+#            d'erreur réglables) pour essayer le client LLM sans
+#            modèle : OLLAMA_API_URL = 'http://127.0.0.1:11500'
+# ============================================================
+
+from django.core.management.base import BaseCommand
+
+from apps.recherche.llm_stub import StubOllamaServer
+
+
+class Command(BaseCommand):
+    help = 'Serveur Ollama factice pour les essais du client LLM'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=11500)
+        parser.add_argument('--delay', type=float, default=0.2, help='Latence par réponse (secondes)')
+        parser.add_argument('--fail-rate', type=float, default=0.0, help='Part de réponses HTTP 503')
+
+    def handle(self, *args, **options):
+        stub = StubOllamaServer(
+            options['host'], options['port'], delay=options['delay'], fail_rate=options['fail_rate']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'🤖 Ollama factice sur {stub.url} '
+            f'(latence {options["delay"]}s, erreurs {options["fail_rate"]:.0%}) — Ctrl+C pour arrêter'
+        ))
+        try:
+            stub.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stdout.write(f'\n   {stub.connections} connexions reçues')
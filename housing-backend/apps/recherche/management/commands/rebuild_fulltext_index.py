@@ -0,0 +1,31 @@
+# apps/recherche/management/commands/rebuild_fulltext_index.py
+# ============================================================
+# Commande : python manage.py rebuild_fulltext_index
+# But      : (Re)construit l'index plein texte des logements
+#            (FTS5 sous SQLite, tsvector sous PostgreSQL).
+# ============================================================
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.recherche.fulltext import get_backend
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index plein texte des logements"
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        if backend is None:
+            raise CommandError(
+                "Aucun moteur plein texte pour cette base "
+                "(SEARCH_FULLTEXT_BACKEND = 'none' ou base non supportée)"
+            )
+
+        with transaction.atomic():
+            backend.create_schema()
+            backend.rebuild()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Index plein texte reconstruit ({backend.vendor})'
+        ))
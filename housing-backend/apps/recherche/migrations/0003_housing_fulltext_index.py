@@ -0,0 +1,31 @@
+# Index plein texte des logements (FTS5 sous SQLite, tsvector sous PostgreSQL)
+
+from django.db import migrations
+
+
+def create_fulltext_index(apps, schema_editor):
+    from apps.recherche.fulltext import get_backend
+    backend = get_backend(schema_editor.connection)
+    if backend is not None:
+        backend.create_schema()
+        backend.rebuild()
+
+
+def drop_fulltext_index(apps, schema_editor):
+    from apps.recherche.fulltext import get_backend
+    backend = get_backend(schema_editor.connection)
+    if backend is not None:
+        backend.drop_schema()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recherche', '0002_chatbotmessage_content_en_chatbotmessage_content_fr_and_more'),
+        ('housing', '0005_category_description_en_category_description_fr_and_more'),
+        ('location', '0002_alter_city_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
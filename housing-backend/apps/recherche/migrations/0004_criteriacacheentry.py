@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recherche', '0003_housing_fulltext_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CriteriaCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('query_text', models.CharField(max_length=500)),
+                ('language', models.CharField(choices=[('fr', 'Français'), ('en', 'English')], default='fr', max_length=2)),
+                ('method', models.CharField(max_length=20)),
+                ('criteria', models.JSONField(default=dict)),
+                ('lexicon_version', models.CharField(max_length=16)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Critères en cache',
+                'verbose_name_plural': 'Critères en cache',
+                'indexes': [models.Index(fields=['expires_at'], name='recherche_c_expires_cd510e_idx')],
+            },
+        ),
+    ]
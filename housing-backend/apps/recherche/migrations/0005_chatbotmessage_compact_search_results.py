@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:38
+
+from django.db import migrations, models
+
+
+def compact_search_results(apps, schema_editor):
+    """Fiches complètes → identifiants classés ; affiche la place gagnée"""
+    from apps.recherche.conversation_window import compact_search_results as compact
+
+    report = compact(apps.get_model('recherche', 'ChatbotMessage'))
+    if report['compacted']:
+        print(
+            f"\n   ChatbotMessage.search_results : {report['compacted']}/{report['rows']} lignes compactées, "
+            f"{report['bytes_before'] / 1024:.1f} Ko → {report['bytes_after'] / 1024:.1f} Ko"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recherche', '0004_criteriacacheentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatbotmessage',
+            name='criteria_hash',
+            field=models.CharField(blank=True, default='', max_length=40),
+        ),
+        migrations.RunPython(compact_search_results, migrations.RunPython.noop),
+    ]
@@ -180,8 +180,10 @@ class ChatbotMessage(models.Model):
     is_voice = models.BooleanField(default=False)
     audio_file = models.FileField(upload_to='chatbot/audio/', null=True, blank=True)
     
-    # Résultats de recherche associés (si applicable)
+    # Résultats de recherche associés (si applicable) : identifiants des
+    # logements dans l'ordre du classement, hydratés à la lecture
     search_results = models.JSONField(default=list, blank=True)
+    criteria_hash = models.CharField(max_length=40, blank=True, default='')
     
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -224,4 +226,29 @@ class SearchPreference(models.Model):
         verbose_name_plural = "Préférences de recherche"
     
     def __str__(self):
-        return f"Préférences de {self.user.username}"
\ No newline at end of file
+        return f"Préférences de {self.user.username}"
+
+class CriteriaCacheEntry(models.Model):
+    """Critères extraits d'une requête en langage naturel (cache persistant)"""
+    # Empreinte de (méthode, modèle, langue, requête normalisée)
+    key = models.CharField(max_length=64, unique=True)
+    query_text = models.CharField(max_length=500)
+    language = models.CharField(max_length=2, choices=[('fr', 'Français'), ('en', 'English')], default='fr')
+    method = models.CharField(max_length=20)
+    
+    criteria = models.JSONField(default=dict)
+    # Version des lexiques au moment de l'extraction
+    lexicon_version = models.CharField(max_length=16)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+    
+    class Meta:
+        verbose_name = "Critères en cache"
+        verbose_name_plural = "Critères en cache"
+        indexes = [
+            models.Index(fields=['expires_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.method} [{self.language}] {self.query_text[:50]}"
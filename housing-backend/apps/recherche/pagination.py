@@ -0,0 +1,173 @@
+# ============================================
+# 📁 apps/recherche/pagination.py
+# ============================================
+"""
+Classement en flux et pagination par curseur.
+
+Au lieu de charger tous les logements correspondants, de les trier puis
+de découper une page, le queryset est parcouru par lots
+(`iterator(chunk_size=SEARCH_STREAM_CHUNK_SIZE)`) et seuls les k
+meilleurs sont gardés dans un tas (heapq.nsmallest) : la mémoire dépend
+de la taille des lots et de la page, plus du nombre de résultats.
+
+Chaque élément a une position totalement ordonnée, tuple terminé par
+l'id (ex. (-score, id) ou (prix, id)) : plus petite = mieux classée.
+Le curseur de la page suivante encode la position du dernier élément
+servi ; la page suivante ne garde que les positions strictement
+supérieures. Le curseur est signé (django.core.signing) et lié à
+l'empreinte des critères : un curseur modifié ou rejoué sur une autre
+recherche est refusé (InvalidCursor).
+
+Les classements instables (génétique, scores NLP) paginent plutôt un
+instantané (snapshots.py) : le curseur porte alors l'instantané et le
+rang de reprise.
+
+Usage:
+    cursor = decode_cursor(token, digest) if token else None
+    ranked = top_k(stream(queryset), position, k=20, after=cursor and cursor.after)
+    next_cursor = encode_cursor(ranked.next_after, digest, page + 1)
+"""
+
+import heapq
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.core import signing
+
+
+CURSOR_SALT = 'recherche.pagination.cursor'
+
+
+class InvalidCursor(ValueError):
+    """Curseur illisible, falsifié ou émis pour une autre recherche"""
+
+
+def chunk_size() -> int:
+    return getattr(settings, 'SEARCH_STREAM_CHUNK_SIZE', 2000)
+
+
+# ----------------------------------------------------------------------
+# Parcours par lots
+# ----------------------------------------------------------------------
+
+def stream(queryset, size: Optional[int] = None) -> Iterator:
+    """Lignes d'un queryset lues par lots (jamais tout le résultat en mémoire)"""
+    return queryset.iterator(chunk_size=size or chunk_size())
+
+
+def batches(queryset, size: Optional[int] = None) -> Iterator[List]:
+    """Lots successifs d'un queryset (pour les calculs vectorisés par lot)"""
+    size = size or chunk_size()
+    rows = stream(queryset, size)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+# ----------------------------------------------------------------------
+# Top-k borné
+# ----------------------------------------------------------------------
+
+class RankedPage:
+    """
+    Une page classée.
+
+    Attributes:
+        items: éléments de la page, du mieux classé au moins bien classé
+               (vide pour une page relue du cache : positions seules)
+        positions: position de chaque élément
+        total: nombre total d'éléments parcourus (toutes pages)
+        remaining: éléments après le curseur, page courante comprise
+        next_after: position à passer au curseur suivant, None si dernière page
+    """
+
+    def __init__(self, items: List, positions: List[Tuple], total: int, remaining: int):
+        self.items = items
+        self.positions = positions
+        self.total = total
+        self.remaining = remaining
+
+    @property
+    def has_more(self) -> bool:
+        return self.remaining > len(self.positions)
+
+    @property
+    def next_after(self) -> Optional[Tuple]:
+        return self.positions[-1] if self.has_more and self.positions else None
+
+
+def top_k(rows: Iterable, position: Callable[[object], Tuple], k: int,
+          after: Optional[Tuple] = None, offset: int = 0) -> RankedPage:
+    """
+    Les k éléments les mieux classés après `after`, en une passe.
+
+    Args:
+        rows: éléments, lus une seule fois (itérateur de queryset, lots…)
+        position: élément → tuple ordonné unique (terminé par l'id)
+        k: taille de la page
+        after: position du dernier élément de la page précédente
+        offset: éléments à sauter en plus (pagination par numéro de page) ;
+                le tas garde alors offset + k éléments
+
+    Returns:
+        RankedPage
+    """
+    counts = {'total': 0, 'remaining': 0}
+
+    def candidates():
+        for row in rows:
+            counts['total'] += 1
+            key = position(row)
+            if after is None or key > after:
+                counts['remaining'] += 1
+                yield key, row
+
+    best = heapq.nsmallest(offset + k, candidates(), key=lambda pair: pair[0])[offset:]
+    return RankedPage(
+        items=[row for _, row in best],
+        positions=[key for key, _ in best],
+        total=counts['total'],
+        remaining=max(0, counts['remaining'] - offset),
+    )
+
+
+# ----------------------------------------------------------------------
+# Curseurs
+# ----------------------------------------------------------------------
+
+class Cursor(NamedTuple):
+    """Contenu d'un curseur décodé"""
+    after: Tuple              # position du dernier élément servi (rang pour un instantané)
+    page: int                 # numéro de la page à servir
+    snapshot: Optional[str]   # instantané paginé (snapshots.py), sinon None
+
+
+def encode_cursor(after: Optional[Tuple], digest: str, page: int,
+                  snapshot: Optional[str] = None) -> Optional[str]:
+    """Curseur opaque de la page suivante (None si plus de page)"""
+    if after is None:
+        return None
+    data = {'a': list(after), 'q': digest, 'n': page}
+    if snapshot:
+        data['s'] = snapshot
+    return signing.dumps(data, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(token: str, digest: str) -> Cursor:
+    """
+    Raises:
+        InvalidCursor
+    """
+    try:
+        data = signing.loads(token, salt=CURSOR_SALT)
+    except signing.BadSignature as e:
+        raise InvalidCursor('Curseur invalide') from e
+    if not isinstance(data, dict) or data.get('q') != digest:
+        raise InvalidCursor('Curseur émis pour une autre recherche')
+    try:
+        return Cursor(tuple(data['a']), int(data['n']), data.get('s'))
+    except (KeyError, TypeError, ValueError) as e:
+        raise InvalidCursor('Curseur invalide') from e
@@ -0,0 +1,114 @@
+# ============================================
+# 📁 apps/recherche/proximity.py
+# ============================================
+"""
+Table de proximité précalculée : (ville, quartier) → types de lieux.
+
+Chaque type de NearbyPlace occupe un bit ; la table associe à chaque
+quartier, à chaque ville, et aux lieux « ville entière » (sans quartier)
+le masque des types présents. Le filtre « près d'une école » devient
+alors une seule clause district_id__in / city_id__in au lieu d'une ou
+deux requêtes NearbyPlace par logement candidat.
+
+La table est construite en une requête, stockée dans le cache Django et
+invalidée par les signaux de NearbyPlace (voir signals.py). Le cache par
+défaut (locmem) est propre à chaque processus : l'invalidation ne touche
+que le processus qui a écrit, les autres reconstruisent leur table après
+SEARCH_PROXIMITY_TABLE_TTL secondes.
+"""
+
+from typing import Dict, Iterable, List, Optional, Set
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import NearbyPlace
+
+
+CACHE_KEY = 'recherche:proximity_table'
+
+PLACE_TYPE_BITS = {
+    code: 1 << i for i, (code, _) in enumerate(NearbyPlace.PLACE_TYPE_CHOICES)
+}
+
+
+def place_types_mask(place_types: Iterable[str]) -> int:
+    """Masque binaire d'une liste de types de lieux (types inconnus ignorés)"""
+    mask = 0
+    for place_type in place_types:
+        mask |= PLACE_TYPE_BITS.get(place_type, 0)
+    return mask
+
+
+class ProximityTable:
+    """Masques de types de lieux par quartier et par ville"""
+
+    def __init__(self, by_district: Dict[int, int], by_city: Dict[int, int],
+                 city_wide: Dict[int, int]):
+        # Lieux rattachés à un quartier précis
+        self.by_district = by_district
+        # Tous les lieux d'une ville (avec ou sans quartier)
+        self.by_city = by_city
+        # Lieux de la ville sans quartier
+        self.city_wide = city_wide
+
+    @classmethod
+    def build(cls) -> 'ProximityTable':
+        """Construit la table en une seule requête"""
+        by_district, by_city, city_wide = {}, {}, {}
+        rows = NearbyPlace.objects.order_by().values_list(
+            'city_id', 'district_id', 'place_type'
+        ).distinct()
+        for city_id, district_id, place_type in rows:
+            bit = PLACE_TYPE_BITS.get(place_type, 0)
+            by_city[city_id] = by_city.get(city_id, 0) | bit
+            if district_id is None:
+                city_wide[city_id] = city_wide.get(city_id, 0) | bit
+            else:
+                by_district[district_id] = by_district.get(district_id, 0) | bit
+        return cls(by_district, by_city, city_wide)
+
+    @staticmethod
+    def _matching(table: Dict[int, int], mask: int) -> Set[int]:
+        return {key for key, bits in table.items() if bits & mask}
+
+    def has_any(self, place_types: Iterable[str]) -> bool:
+        """Vrai si au moins un lieu des types demandés est connu"""
+        return bool(self._matching(self.by_city, place_types_mask(place_types)))
+
+    def district_ids(self, place_types: Iterable[str]) -> Set[int]:
+        return self._matching(self.by_district, place_types_mask(place_types))
+
+    def city_ids(self, place_types: Iterable[str], city_wide_only: bool = False) -> Set[int]:
+        table = self.city_wide if city_wide_only else self.by_city
+        return self._matching(table, place_types_mask(place_types))
+
+    def housing_q(self, place_types: List[str], include_city_wide: bool = False) -> Q:
+        """
+        Condition sur Housing équivalente à « un lieu de ces types existe » :
+
+          - logement avec quartier : lieu dans ce quartier
+            (ou, si include_city_wide, lieu de la ville sans quartier)
+          - logement sans quartier : lieu n'importe où dans la ville
+        """
+        condition = (
+            Q(district_id__in=self.district_ids(place_types)) |
+            Q(district__isnull=True, city_id__in=self.city_ids(place_types))
+        )
+        if include_city_wide:
+            condition |= Q(city_id__in=self.city_ids(place_types, city_wide_only=True))
+        return condition
+
+
+def get_proximity_table() -> ProximityTable:
+    """Table courante (depuis le cache, reconstruite si absente)"""
+    table: Optional[ProximityTable] = cache.get(CACHE_KEY)
+    if table is None:
+        table = ProximityTable.build()
+        cache.set(CACHE_KEY, table, getattr(settings, 'SEARCH_PROXIMITY_TABLE_TTL', 300))
+    return table
+
+
+def invalidate_proximity_table():
+    cache.delete(CACHE_KEY)
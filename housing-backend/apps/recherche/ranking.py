@@ -0,0 +1,116 @@
+# ============================================
+# 📁 apps/recherche/ranking.py
+# ============================================
+"""
+Classement déterministe « top-k + MMR », alternative aux algorithmes
+génétiques.
+
+  1. chaque candidat est noté une seule fois (fonction de score fournie)
+  2. les meilleurs candidats sont extraits avec un tas : O(N log k)
+  3. les k premières places sont diversifiées par Maximal Marginal
+     Relevance : à chaque rang, on retient le candidat qui maximise
+         λ · score − (1 − λ) · similarité max avec les déjà retenus
+     la similarité portant sur la catégorie, le quartier et la tranche
+     de prix (O(k²), indépendant de N)
+
+Même entrée → même sortie : le classement peut être mis en cache et
+paginé. Les égalités de score sont départagées par l'id.
+"""
+
+import heapq
+from bisect import bisect_right
+from typing import Callable, List, Optional
+
+from django.conf import settings
+
+
+RANKING_MODES = ('default', 'genetic', 'topk_mmr')
+
+# Bornes des tranches de prix (FCFA / mois)
+PRICE_BANDS = (25000, 50000, 100000, 200000, 400000)
+
+DEFAULT_K = 20
+DEFAULT_LAMBDA = 0.7
+# Taille du vivier MMR : k × POOL_FACTOR meilleurs candidats
+POOL_FACTOR = 3
+
+
+def price_band(price) -> int:
+    return bisect_right(PRICE_BANDS, price or 0)
+
+
+def similarity(a, b) -> float:
+    """Part des attributs communs (catégorie, quartier, tranche de prix)"""
+    same = 0
+    if a.category_id == b.category_id:
+        same += 1
+    if a.district_id is not None and a.district_id == b.district_id:
+        same += 1
+    if price_band(a.price) == price_band(b.price):
+        same += 1
+    return same / 3
+
+
+def topk_mmr(
+    candidates: List,
+    score: Callable,
+    k: Optional[int] = None,
+    lambda_: Optional[float] = None,
+    keep_rest: bool = False
+) -> List:
+    """
+    Classe les candidats par score puis diversifie les k premiers.
+
+    Args:
+        candidates: logements (ou tout objet avec id, category_id,
+                    district_id, price)
+        score: fonction candidat → float (appelée une fois par candidat)
+        k: nombre de places diversifiées (SEARCH_RANKING_TOPK par défaut)
+        lambda_: compromis pertinence / diversité (1 = pertinence seule)
+        keep_rest: ajouter les autres candidats après le top-k, dans leur
+                   ordre d'origine (utile quand l'appelant pagine tout)
+
+    Returns:
+        Liste classée ; chaque élément du top-k reçoit l'attribut
+        `ranking_score`.
+    """
+    if k is None:
+        k = getattr(settings, 'SEARCH_RANKING_TOPK', DEFAULT_K)
+    if lambda_ is None:
+        lambda_ = getattr(settings, 'SEARCH_RANKING_MMR_LAMBDA', DEFAULT_LAMBDA)
+    if not candidates or k <= 0:
+        return list(candidates) if keep_rest else []
+
+    # 1-2. Une notation par candidat, vivier extrait par tas
+    pool = heapq.nlargest(
+        k * POOL_FACTOR,
+        ((score(c), -c.id, c) for c in candidates),
+        key=lambda entry: (entry[0], entry[1]),
+    )
+    # Pertinence ramenée à [0, 1] sur le vivier, comparable à la similarité
+    top_score, low_score = pool[0][0], pool[-1][0]
+    spread = (top_score - low_score) or 1.0
+
+    # 3. Diversification MMR dans le vivier
+    remaining = [((s - low_score) / spread, c) for s, _, c in pool]
+    max_similarity = [0.0] * len(remaining)
+    selected = []
+    while remaining and len(selected) < k:
+        best = max(
+            range(len(remaining)),
+            key=lambda i: (
+                lambda_ * remaining[i][0] - (1 - lambda_) * max_similarity[i],
+                -remaining[i][1].id,
+            ),
+        )
+        relevance, chosen = remaining.pop(best)
+        max_similarity.pop(best)
+        chosen.ranking_score = relevance
+        selected.append(chosen)
+        for i, (_, candidate) in enumerate(remaining):
+            max_similarity[i] = max(max_similarity[i], similarity(chosen, candidate))
+
+    if keep_rest:
+        chosen_ids = {c.id for c in selected}
+        selected.extend(c for c in candidates if c.id not in chosen_ids)
+    return selected
@@ -0,0 +1,243 @@
+# ============================================
+# 📁 apps/recherche/result_cache.py
+# ============================================
+"""
+Cache des résultats de recherche (listes d'identifiants classés).
+
+La clé est une forme canonique des paramètres : clés triées, valeurs
+vides retirées, nombres normalisés ("50000" == 50000 == 50000.0), textes
+en minuscules, listes triées, coordonnées arrondies. Deux recherches
+équivalentes partagent donc la même entrée, quelle que soit la vue
+(formulaire, NLP, chatbot) qui l'a émise.
+
+Invalidation par compteurs de génération : chaque clé embarque la
+génération globale, ou celle de la ville quand la recherche porte sur une
+ville précise. Les signaux de Housing (voir signals.py) incrémentent la
+génération globale et celle des villes concernées ; les anciennes
+entrées ne sont plus jamais lues et expirent d'elles-mêmes
+(SEARCH_RESULT_CACHE_TTL).
+
+Fonctionne avec tout backend de cache Django (locmem, fichiers, Redis…),
+choisi par SEARCH_RESULT_CACHE_ALIAS. Avec locmem, cache et générations
+sont propres à chaque processus.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+KEY_PREFIX = 'recherche:results'
+GLOBAL_GENERATION_KEY = 'recherche:gen:global'
+CITY_GENERATION_KEY = 'recherche:gen:city:{city_id}'
+
+# Décimales conservées sur les coordonnées GPS (4 ≈ 11 m)
+COORDINATE_KEYS = frozenset({'lat', 'lng', 'user_lat', 'user_lng'})
+COORDINATE_DECIMALS = 4
+
+_NUMBER_RE = re.compile(r'^-?\d+(\.\d+)?$')
+_SPACES_RE = re.compile(r'\s+')
+
+
+def _enabled() -> bool:
+    return getattr(settings, 'SEARCH_RESULT_CACHE_ENABLED', True)
+
+
+def _cache():
+    return caches[getattr(settings, 'SEARCH_RESULT_CACHE_ALIAS', 'default')]
+
+
+def _ttl() -> int:
+    return getattr(settings, 'SEARCH_RESULT_CACHE_TTL', 300)
+
+
+# ----------------------------------------------------------------------
+# Forme canonique
+# ----------------------------------------------------------------------
+
+def _is_empty(value) -> bool:
+    return value is None or value == '' or value == [] or value == {} or value == ()
+
+
+def canonicalize(value, key: Optional[str] = None):
+    """Normalise récursivement une valeur de filtre"""
+    if isinstance(value, dict):
+        return {
+            str(k): canonicalize(v, str(k))
+            for k, v in sorted(value.items(), key=lambda item: str(item[0]))
+            if not _is_empty(v)
+        }
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [canonicalize(v) for v in value if not _is_empty(v)]
+        return sorted(items, key=lambda v: json.dumps(v, sort_keys=True, default=str))
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        text = _SPACES_RE.sub(' ', value.strip()).casefold()
+        if _NUMBER_RE.match(text):
+            return canonicalize(float(text), key)
+        return text
+    if isinstance(value, (int, float)):
+        if key in COORDINATE_KEYS:
+            return round(float(value), COORDINATE_DECIMALS)
+        if float(value).is_integer():
+            return int(value)
+        return float(value)
+    return str(value)
+
+
+def canonical_form(params: Dict) -> str:
+    """Chaîne JSON canonique des paramètres"""
+    return json.dumps(canonicalize(params), sort_keys=True, separators=(',', ':'))
+
+
+def canonical_city_id(value) -> Optional[int]:
+    """Identifiant de ville si la valeur en est un (les noms de ville → None)"""
+    value = canonicalize(value)
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+# ----------------------------------------------------------------------
+# Générations
+# ----------------------------------------------------------------------
+
+def _generation_keys(city_id: Optional[int]) -> List[str]:
+    if city_id is None:
+        return [GLOBAL_GENERATION_KEY]
+    return [CITY_GENERATION_KEY.format(city_id=city_id)]
+
+
+def _current_generations(keys: List[str]) -> List[int]:
+    cache = _cache()
+    found = cache.get_many(keys)
+    generations = []
+    for key in keys:
+        generation = found.get(key)
+        if generation is None:
+            # Valeur initiale horodatée : jamais égale à une génération évincée
+            cache.add(key, time.time_ns(), None)
+            generation = cache.get(key)
+        generations.append(generation)
+    return generations
+
+
+def bump_generation(city_ids: Iterable[Optional[int]] = ()):
+    """Invalide les recherches globales et celles des villes données"""
+    cache = _cache()
+    keys = [GLOBAL_GENERATION_KEY] + [
+        CITY_GENERATION_KEY.format(city_id=city_id)
+        for city_id in set(city_ids) if city_id is not None
+    ]
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+# ----------------------------------------------------------------------
+# Compteurs
+# ----------------------------------------------------------------------
+
+class CacheStats:
+    """Compteurs de succès / échecs du processus, par espace de noms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def record(self, namespace: str, hit: bool):
+        with self._lock:
+            counts = self._counts.setdefault(namespace, {'hits': 0, 'misses': 0})
+            counts['hits' if hit else 'misses'] += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            by_namespace = {name: dict(counts) for name, counts in self._counts.items()}
+        hits = sum(c['hits'] for c in by_namespace.values())
+        misses = sum(c['misses'] for c in by_namespace.values())
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else 0.0,
+            'by_namespace': by_namespace,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+stats = CacheStats()
+
+
+# ----------------------------------------------------------------------
+# Lecture / écriture
+# ----------------------------------------------------------------------
+
+def criteria_digest(params: Dict) -> str:
+    """Empreinte (sha1) de la forme canonique des paramètres"""
+    return hashlib.sha1(canonical_form(params).encode('utf-8')).hexdigest()
+
+
+def _result_key(namespace: str, params: Dict, city_id: Optional[int]) -> str:
+    generations = _current_generations(_generation_keys(city_id))
+    digest = criteria_digest(params)
+    scope = 'global' if city_id is None else f'city{city_id}'
+    return f"{KEY_PREFIX}:{namespace}:{scope}:{'.'.join(map(str, generations))}:{digest}"
+
+
+class CachedSearch:
+    """
+    Entrée de cache d'une recherche.
+
+    La clé (donc la génération) est figée à la création : un résultat
+    calculé pendant qu'un logement est modifié est rangé sous l'ancienne
+    génération et ne sera jamais relu.
+
+    Usage:
+        entry = CachedSearch('nlp', params)
+        payload = entry.get()
+        if payload is None:
+            ...
+            entry.set({'ids': ids})
+    """
+
+    def __init__(self, namespace: str, params: Dict, city_id: Optional[int] = None):
+        """
+        Args:
+            namespace: appelant ('engine', 'nlp', 'chatbot'…)
+            params: paramètres de la recherche (filtres, langue, tri…)
+            city_id: ville de la recherche, pour l'invalidation par ville
+        """
+        self.namespace = namespace
+        self.enabled = _enabled()
+        self.key = _result_key(namespace, params, city_id) if self.enabled else None
+
+    def get(self) -> Optional[Dict]:
+        """Résultat en cache, ou None"""
+        if not self.enabled:
+            return None
+        payload = _cache().get(self.key)
+        stats.record(self.namespace, payload is not None)
+        return payload
+
+    def set(self, payload: Dict):
+        """Enregistre un résultat : {'ids': [...], ...} (données picklables)"""
+        if self.enabled:
+            _cache().set(self.key, payload, _ttl())
+
+
+def hydrate(queryset, ids: List[int]) -> List:
+    """Instances du queryset pour ces ids, dans l'ordre de la liste"""
+    if not ids:
+        return []
+    by_id = queryset.filter(id__in=ids).in_bulk()
+    return [by_id[pk] for pk in ids if pk in by_id]
@@ -7,6 +7,14 @@ Adapté au modèle Housing avec area, rooms, bathrooms, status
 """
 
 
+# Colonnes lues par compute_smart_score : un parcours en flux peut se limiter
+# à queryset.select_related('city', 'housing_type').only(*SCORING_FIELDS)
+SCORING_FIELDS = (
+    'id', 'price', 'area', 'rooms', 'status', 'views_count', 'likes_count',
+    'created_at', 'category', 'city', 'city__name', 'housing_type', 'housing_type__name',
+)
+
+
 def compute_score(housing, criteria):
     """
     Calcule un score de pertinence basé sur les critères de recherche
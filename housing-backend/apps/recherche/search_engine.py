@@ -2,14 +2,66 @@
 # 📁 apps/recherche/search_engine.py
 # ============================================
 
+from django.conf import settings
+from django.db import connections
 from django.db.models import Q, Count, Avg, F
+from django.db.models.expressions import RawSQL
 from django.contrib.gis.measure import D
 from typing import List, Dict, Optional
+import json
 import math
 
 from apps.housing.models import Housing
-from .models import NearbyPlace, SearchHistory
-from .genetic_algorithm import GeneticSearchOptimizer, calculate_housing_score
+from .history import history_recorder
+from .genetic_algorithm import get_genetic_optimizer, calculate_housing_score
+from .ranking import topk_mmr
+from . import fulltext, result_cache
+from .proximity import get_proximity_table
+from .listing_index import listing_index, index_enabled, EQUALITY_FILTERS, RANGE_FILTERS
+from .pagination import RankedPage, decode_cursor, encode_cursor, stream, top_k
+from .snapshots import shared_snapshot, snapshot_page, snapshot_store
+
+
+# Tri par défaut en flux : ordering → (colonnes lues, valeur de tri croissante)
+STREAM_ORDERINGS = {
+    'price': (('price',), lambda price: float(price)),
+    '-price': (('price',), lambda price: -float(price)),
+    'area': (('area',), lambda area: float(area or 0)),
+    '-area': (('area',), lambda area: -float(area or 0)),
+    'created_at': (('created_at',), lambda created_at: created_at.timestamp()),
+    '-created_at': (('created_at',), lambda created_at: -created_at.timestamp()),
+    'popularity': (('likes_count', 'views_count'), lambda likes, views: -(likes + views)),
+}
+
+# Ids de l'index passés en un seul paramètre (tableau JSON), par moteur SQL
+JSON_ID_SUBQUERIES = {
+    'sqlite': 'SELECT value FROM json_each(%s)',
+    'postgresql': 'SELECT jsonb_array_elements_text(%s::jsonb)::bigint',
+}
+
+
+class SearchPage:
+    """
+    Une page de SearchEngine.search_page
+
+    `search_id` désigne l'instantané paginé (classements globaux), dont
+    seules `available` entrées sur `total` sont consultables.
+    """
+
+    def __init__(self, results: List[Housing], total: int, page: int, page_size: int,
+                 next_cursor: Optional[str], search_id: Optional[str] = None,
+                 available: Optional[int] = None):
+        self.results = results
+        self.total = total
+        self.page = page
+        self.page_size = page_size
+        self.next_cursor = next_cursor
+        self.search_id = search_id
+        self.available = total if available is None else available
+
+    @property
+    def total_pages(self) -> int:
+        return max(1, math.ceil(self.available / self.page_size)) if self.page_size else 1
 
 
 class SearchEngine:
@@ -18,13 +70,15 @@ class SearchEngine:
     def __init__(self, user=None, language='fr'):
         self.user = user
         self.language = language
-        self.genetic_optimizer = GeneticSearchOptimizer()
+        self.genetic_optimizer = get_genetic_optimizer()
     
     def search(
         self,
         query: Optional[str] = None,
         filters: Optional[Dict] = None,
-        use_genetic_algorithm: bool = False
+        use_genetic_algorithm: bool = False,
+        ranking_mode: Optional[str] = None,
+        record_history: bool = True
     ) -> List[Housing]:
         """
         Recherche principale
@@ -33,20 +87,30 @@ class SearchEngine:
             query: Texte de recherche
             filters: Dictionnaire de filtres
             use_genetic_algorithm: Utiliser l'algorithme génétique
+            ranking_mode: 'default', 'genetic' ou 'topk_mmr'
+                          (prioritaire sur use_genetic_algorithm)
+            record_history: enregistrer la recherche dans l'historique
         
         Returns:
             Liste de logements
         """
         filters = filters or {}
+        queryset = self._base_queryset()
         
-        # Base queryset
-        queryset = Housing.objects.filter(
-            status='disponible',
-            is_visible=True
-        ).select_related(
-            'owner', 'category', 'housing_type', 
-            'region', 'city', 'district'
-        ).prefetch_related('images')
+        if ranking_mode is None:
+            ranking_mode = 'genetic' if use_genetic_algorithm else 'default'
+        
+        # Résultat déjà classé pour une recherche équivalente ?
+        cached = result_cache.CachedSearch(
+            'engine',
+            self._cache_params(query, filters, ranking_mode),
+            city_id=result_cache.canonical_city_id(filters.get('city'))
+        )
+        payload = cached.get()
+        if payload is not None:
+            if self.user and record_history:
+                self._save_search_history(query, filters, len(payload['ids']))
+            return result_cache.hydrate(queryset, payload['ids'])
         
         # Filtre de recherche textuelle
         if query:
@@ -59,40 +123,252 @@ class SearchEngine:
         results = list(queryset)
         
         # Sauvegarder dans l'historique
-        if self.user:
+        if self.user and record_history:
             self._save_search_history(query, filters, len(results))
         
+        results = self._rank(results, query, filters, ranking_mode)
+        cached.set({'ids': [h.id for h in results]})
+        
+        return results
+    
+    def search_page(
+        self,
+        query: Optional[str] = None,
+        filters: Optional[Dict] = None,
+        page_size: int = 10,
+        cursor: Optional[str] = None,
+        page: int = 1,
+        ranking_mode: str = 'default',
+        search_id: Optional[str] = None
+    ) -> SearchPage:
+        """
+        Une page de résultats, sans charger tous les logements correspondants
+        
+        Le tri par défaut (pertinence plein texte ou `ordering`) est calculé
+        en flux sur quelques colonnes (voir pagination.py) : seuls les
+        `page_size` logements de la page sont chargés. Les classements
+        globaux ('genetic', 'topk_mmr') sont calculés une fois puis rangés
+        dans un instantané (snapshots.py) : les pages suivantes le
+        découpent, sans nouveau tirage aléatoire.
+        
+        Args:
+            cursor: next_cursor de la page précédente (prioritaire sur `page`)
+            page: numéro de page sans curseur (le tas garde page × page_size ids)
+            search_id: instantané à paginer ('genetic', 'topk_mmr')
+        
+        Raises:
+            InvalidCursor: curseur falsifié ou émis pour une autre recherche
+            SnapshotExpired: instantané expiré, la recherche est à relancer
+        """
+        filters = filters or {}
+        params = self._cache_params(query, filters, ranking_mode)
+        digest = result_cache.criteria_digest(params)
+        city_id = result_cache.canonical_city_id(filters.get('city'))
+        
+        state = decode_cursor(cursor, digest) if cursor else None
+        page = state.page if state else max(1, page)
+        first_request = state is None and not search_id and page == 1
+        
+        if ranking_mode == 'default':
+            after = state.after if state else None
+            offset = 0 if after is not None else (page - 1) * page_size
+            ranked = self._streamed_page(query, filters, params, city_id, page_size, after, offset)
+            ids = [pos[-1] for pos in ranked.positions]
+            total, available, snapshot_id = ranked.total, None, None
+            next_cursor = encode_cursor(ranked.next_after, digest, page + 1)
+        else:
+            snapshot_id = state.snapshot if state else search_id
+            if snapshot_id:
+                snapshot = snapshot_store.get(snapshot_id, digest)
+            else:
+                snapshot = shared_snapshot(
+                    'engine_snapshot', params, digest, city_id,
+                    lambda: self._ranked_entries(query, filters, ranking_mode)
+                )
+            offset = state.after[0] if state else (page - 1) * page_size
+            entries, next_cursor = snapshot_page(snapshot, offset, page_size, page)
+            ids = [entry[0] for entry in entries]
+            total, available, snapshot_id = snapshot.total, snapshot.size, snapshot.id
+        
+        # Une recherche = une entrée d'historique, pas une par page
+        if self.user and first_request:
+            self._save_search_history(query, filters, total)
+        
+        return SearchPage(
+            results=result_cache.hydrate(self._base_queryset(), ids),
+            total=total,
+            page=page,
+            page_size=page_size,
+            next_cursor=next_cursor,
+            search_id=snapshot_id,
+            available=available,
+        )
+    
+    def _streamed_page(self, query, filters, params, city_id, page_size, after, offset) -> RankedPage:
+        """Page du tri par défaut : parcours par lots des colonnes de tri, tas borné"""
+        cached = result_cache.CachedSearch(
+            'engine_page',
+            dict(params, after=list(after) if after else None, offset=offset, size=page_size),
+            city_id=city_id
+        )
+        payload = cached.get()
+        if payload is not None:
+            return RankedPage([], [tuple(p) for p in payload['positions']],
+                              payload['total'], payload['remaining'])
+        
+        queryset = Housing.objects.filter(status='disponible', is_visible=True)
+        if query:
+            queryset = self._apply_text_search(queryset, query)
+        queryset = self._apply_filters(queryset, filters)
+        
+        # Tri fait ici : pas d'ORDER BY (Meta.ordering) côté SQL
+        fields, position = self._stream_position(query, filters)
+        rows = queryset.order_by().values_list('id', *fields)
+        ranked = top_k(stream(rows), position,
+                       page_size, after=after, offset=offset)
+        cached.set({
+            'positions': [list(p) for p in ranked.positions],
+            'total': ranked.total,
+            'remaining': ranked.remaining,
+        })
+        return ranked
+    
+    def _ranked_entries(self, query, filters, ranking_mode):
+        """Classement global complet (ids en cache) → (entrées d'instantané, total)"""
+        payload = result_cache.CachedSearch(
+            'engine',
+            self._cache_params(query, filters, ranking_mode),
+            city_id=result_cache.canonical_city_id(filters.get('city'))
+        ).get()
+        if payload is not None:
+            ids = payload['ids']
+        else:
+            ids = [h.id for h in self.search(query, filters, ranking_mode=ranking_mode,
+                                              record_history=False)]
+        return [(pk,) for pk in ids], len(ids)
+    
+    def _stream_position(self, query: Optional[str], filters: Dict):
+        """
+        Colonnes à lire et position de tri pour une ligne (id, *colonnes),
+        même ordre que _default_sorting (égalités départagées par l'id)
+        """
+        if query and not filters.get('ordering'):
+            scores = fulltext.relevance(query)
+            if scores:
+                return (), lambda row: (-scores.get(row[0], 0.0), row[0])
+        
+        fields, key = STREAM_ORDERINGS.get(
+            filters.get('ordering', '-created_at'), STREAM_ORDERINGS['-created_at']
+        )
+        return fields, lambda row: (key(*row[1:]), row[0])
+    
+    @staticmethod
+    def _base_queryset():
+        return Housing.objects.filter(
+            status='disponible',
+            is_visible=True
+        ).select_related(
+            'owner', 'category', 'housing_type', 
+            'region', 'city', 'district'
+        ).prefetch_related('images')
+    
+    def _cache_params(self, query: Optional[str], filters: Dict, ranking_mode: str) -> Dict:
+        """Paramètres qui déterminent le classement (clé du cache de résultats)"""
+        params = {
+            'query': query,
+            'filters': filters,
+            'language': self.language,
+            'ranking_mode': ranking_mode,
+        }
+        # Les classements personnalisés dépendent des préférences de l'utilisateur
+        if ranking_mode != 'default' and self.user:
+            params['user'] = self.user.pk
+        return params
+    
+    def _rank(self, results: List[Housing], query: Optional[str], filters: Dict,
+              ranking_mode: str) -> List[Housing]:
+        """Classe les résultats selon le mode demandé"""
+        # Classement déterministe top-k + diversification MMR
+        if ranking_mode == 'topk_mmr' and len(results) > 10:
+            user_preferences = self._get_user_preferences()
+            criteria = self._numeric_criteria(filters)
+            return topk_mmr(
+                results,
+                lambda h: calculate_housing_score(h, user_preferences, criteria),
+                keep_rest=True
+            )
         # Optimisation avec algorithme génétique
-        if use_genetic_algorithm and len(results) > 10:
+        if ranking_mode == 'genetic' and len(results) > 10:
             user_preferences = self._get_user_preferences()
-            results = self.genetic_optimizer.optimize(
+            return self.genetic_optimizer.optimize(
                 results,
                 user_preferences,
                 filters
             )
-        else:
-            # Tri par défaut
-            results = self._default_sorting(results, filters)
-        
-        return results
+        # Tri par défaut
+        return self._default_sorting(results, filters, query)
     
     def _apply_text_search(self, queryset, query: str):
-        """Applique la recherche textuelle"""
-        search_terms = query.lower().split()
-        
-        q_objects = Q()
-        for term in search_terms:
-            q_objects |= Q(title__icontains=term)
-            q_objects |= Q(description__icontains=term)
-            q_objects |= Q(city__name__icontains=term)
-            q_objects |= Q(district__name__icontains=term)
-            q_objects |= Q(category__name__icontains=term)
-            q_objects |= Q(additional_features__icontains=term)
-        
-        return queryset.filter(q_objects)
+        """Applique la recherche textuelle (index plein texte)"""
+        return fulltext.filter_queryset(queryset, query)
     
     def _apply_filters(self, queryset, filters: Dict):
         """Applique tous les filtres"""
+        ids = self._filter_ids_from_index(filters)
+        if ids is not None:
+            queryset = self._restrict_to_ids(queryset, ids) if ids else queryset.none()
+        else:
+            queryset = self._apply_orm_filters(queryset, filters)
+        
+        # Filtre de lieux à proximité
+        if filters.get('nearby_places'):
+            queryset = self._filter_by_nearby_places(queryset, filters['nearby_places'])
+        
+        return queryset
+    
+    def _filter_ids_from_index(self, filters: Dict) -> Optional[List[int]]:
+        """
+        Évalue les filtres structurés sur l'index colonnaire en mémoire.
+        
+        Returns:
+            Liste d'identifiants, ou None pour retomber sur les filtres ORM
+            (index désactivé, aucun filtre structuré ou valeur invalide)
+        """
+        if not index_enabled():
+            return None
+        if not any(filters.get(k) for k in (*EQUALITY_FILTERS, *RANGE_FILTERS)):
+            return None
+        
+        try:
+            ids = listing_index.filter_ids(filters)
+        except (TypeError, ValueError):
+            return None
+        return ids.tolist()
+    
+    def _restrict_to_ids(self, queryset, ids: List[int]):
+        """
+        Restreint le queryset aux ids calculés par l'index.
+        
+        Jusqu'à SEARCH_LISTING_INDEX_MAX_IDS ids : clause id__in classique.
+        Au-delà, un seul paramètre (tableau JSON déplié en sous-requête)
+        plutôt qu'un paramètre par id, qui dépasserait la limite du moteur
+        SQL ; sans équivalent JSON, id__in par tranches.
+        """
+        chunk = getattr(settings, 'SEARCH_LISTING_INDEX_MAX_IDS', 5000)
+        if len(ids) <= chunk:
+            return queryset.filter(id__in=ids)
+        
+        sql = JSON_ID_SUBQUERIES.get(connections[queryset.db].vendor)
+        if sql:
+            return queryset.filter(id__in=RawSQL(sql, [json.dumps(ids)]))
+        
+        condition = Q()
+        for start in range(0, len(ids), chunk):
+            condition |= Q(id__in=ids[start:start + chunk])
+        return queryset.filter(condition)
+    
+    def _apply_orm_filters(self, queryset, filters: Dict):
+        """Applique les filtres structurés directement en SQL"""
         
         # Filtres de catégorie et type
         if filters.get('category'):
@@ -134,33 +410,22 @@ class SearchEngine:
         if filters.get('max_area'):
             queryset = queryset.filter(area__lte=filters['max_area'])
         
-        # Filtre de lieux à proximité
-        if filters.get('nearby_places'):
-            queryset = self._filter_by_nearby_places(queryset, filters['nearby_places'])
-        
         return queryset
     
     def _filter_by_nearby_places(self, queryset, place_types: List[str]):
-        """Filtre par lieux à proximité"""
-        # Pour chaque logement, vérifier s'il y a des lieux du type demandé dans le même quartier/ville
-        housing_ids = []
-        
-        for housing in queryset:
-            nearby = NearbyPlace.objects.filter(
-                city=housing.city,
-                place_type__in=place_types
-            )
-            
-            if housing.district:
-                nearby = nearby.filter(district=housing.district)
-            
-            if nearby.exists():
-                housing_ids.append(housing.id)
-        
-        return queryset.filter(id__in=housing_ids)
+        """Filtre par lieux à proximité (même quartier, ou même ville sans quartier)"""
+        table = get_proximity_table()
+        return queryset.filter(table.housing_q(place_types))
     
-    def _default_sorting(self, results: List[Housing], filters: Dict) -> List[Housing]:
-        """Tri par défaut des résultats"""
+    def _default_sorting(self, results: List[Housing], filters: Dict,
+                         query: Optional[str] = None) -> List[Housing]:
+        """Tri par défaut des résultats (pertinence si recherche textuelle)"""
+        if query and not filters.get('ordering'):
+            scores = fulltext.relevance(query)
+            if scores:
+                results.sort(key=lambda h: -scores.get(h.id, 0.0))
+                return results
+        
         ordering = filters.get('ordering', '-created_at')
         
         # Map des champs de tri
@@ -179,6 +444,17 @@ class SearchEngine:
         
         return results
     
+    @staticmethod
+    def _numeric_criteria(filters: Dict) -> Dict:
+        """Bornes numériques des filtres (les valeurs GET arrivent en texte)"""
+        criteria = dict(filters)
+        for key in ('min_price', 'max_price', 'min_area'):
+            try:
+                criteria[key] = float(filters[key]) if filters.get(key) else None
+            except (TypeError, ValueError):
+                criteria[key] = None
+        return criteria
+    
     def _get_user_preferences(self) -> Dict:
         """Récupère les préférences utilisateur"""
         if not self.user:
@@ -209,9 +485,9 @@ class SearchEngine:
         }
     
     def _save_search_history(self, query: Optional[str], filters: Dict, results_count: int):
-        """Sauvegarde dans l'historique"""
+        """Sauvegarde dans l'historique (écriture différée, voir history.py)"""
         try:
-            SearchHistory.objects.create(
+            history_recorder.record(
                 user=self.user,
                 query_text=query or '',
                 category_id=filters.get('category'),
@@ -225,7 +501,7 @@ class SearchEngine:
                 max_rooms=filters.get('max_rooms'),
                 min_area=filters.get('min_area'),
                 max_area=filters.get('max_area'),
-                advanced_filters=filters,
+                advanced_filters=dict(filters),
                 results_count=results_count,
                 search_type='form',
                 language=self.language
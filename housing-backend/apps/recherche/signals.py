@@ -0,0 +1,133 @@
+# ============================================
+# 📁 apps/recherche/signals.py
+# ============================================
+"""
+Signaux qui maintiennent les structures de recherche en mémoire
+synchronisées avec la base de données.
+
+Les mises à jour sont différées à la validation de la transaction
+pour ne jamais indexer une écriture annulée.
+"""
+
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from apps.housing.models import Housing, Category
+from apps.location.models import City, District
+from . import fulltext, result_cache
+from .listing_index import listing_index, INDEXED_FIELDS
+from .location_lexicon import location_lexicon
+from .models import NearbyPlace
+from .proximity import invalidate_proximity_table
+from .spatial_index import spatial_index
+
+# Champs dont dépend le document plein texte d'un logement
+FULLTEXT_FIELDS = frozenset({
+    'title', 'title_fr', 'title_en',
+    'description', 'description_fr', 'description_en',
+    'additional_features', 'additional_features_fr', 'additional_features_en',
+    'city', 'city_id', 'district', 'district_id', 'category', 'category_id',
+})
+
+# Champs dont dépend la position d'un logement dans l'index spatial
+SPATIAL_FIELDS = frozenset({'latitude', 'longitude', 'is_visible'})
+
+
+# Compteurs de popularité : n'invalident pas le cache de résultats
+# (le tri par popularité peut avoir jusqu'à SEARCH_RESULT_CACHE_TTL de retard)
+CACHE_NEUTRAL_FIELDS = frozenset({'views_count', 'likes_count'})
+
+
+def _refresh_fulltext(column, value):
+    backend = fulltext.get_backend()
+    if backend is not None:
+        backend.refresh(column, [value])
+
+
+@receiver(pre_save, sender=Housing)
+def housing_will_save(sender, instance, update_fields=None, **kwargs):
+    """Retient la ville d'origine : un déménagement invalide aussi l'ancienne ville"""
+    instance._previous_city_id = None
+    if not instance._state.adding and (not update_fields or 'city' in update_fields or 'city_id' in update_fields):
+        instance._previous_city_id = Housing.objects.filter(pk=instance.pk).values_list(
+            'city_id', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=Housing)
+def housing_saved(sender, instance, update_fields=None, **kwargs):
+    """Met à jour les index de recherche d'un logement et invalide le cache de résultats"""
+    if not update_fields or not CACHE_NEUTRAL_FIELDS.issuperset(update_fields):
+        city_ids = [instance.city_id, getattr(instance, '_previous_city_id', None)]
+        transaction.on_commit(lambda: result_cache.bump_generation(city_ids))
+    if not update_fields or INDEXED_FIELDS.intersection(update_fields):
+        transaction.on_commit(lambda: listing_index.upsert(instance))
+    if not update_fields or SPATIAL_FIELDS.intersection(update_fields):
+        transaction.on_commit(lambda: spatial_index.upsert(instance))
+    if not update_fields or FULLTEXT_FIELDS.intersection(update_fields):
+        pk = instance.pk
+        transaction.on_commit(lambda: _refresh_fulltext('id', pk))
+
+
+@receiver(post_delete, sender=Housing)
+def housing_deleted(sender, instance, **kwargs):
+    """Retire le logement supprimé des index de recherche"""
+    pk, city_id = instance.pk, instance.city_id
+
+    def _remove():
+        result_cache.bump_generation([city_id])
+        listing_index.remove(pk)
+        spatial_index.remove(pk)
+        backend = fulltext.get_backend()
+        if backend is not None:
+            backend.remove([pk])
+
+    transaction.on_commit(_remove)
+
+
+@receiver(post_save, sender=City)
+@receiver(post_save, sender=District)
+@receiver(post_save, sender=Category)
+def location_or_category_saved(sender, instance, created=False, **kwargs):
+    """Un renommage de ville, quartier ou catégorie change le document plein texte"""
+    if created:
+        return
+    column = {City: 'city_id', District: 'district_id', Category: 'category_id'}[sender]
+    pk = instance.pk
+    transaction.on_commit(lambda: _refresh_fulltext(column, pk))
+    # Les recherches par nom (NLP, chatbot) sont indexées sur la génération globale
+    transaction.on_commit(result_cache.bump_generation)
+
+
+@receiver(post_save, sender=City)
+def city_saved_lexicon(sender, instance, **kwargs):
+    """Ajoute ou renomme la ville dans le lexique NLP"""
+    transaction.on_commit(lambda: location_lexicon.upsert_city(instance))
+
+
+@receiver(post_save, sender=District)
+def district_saved_lexicon(sender, instance, **kwargs):
+    """Ajoute ou renomme le quartier dans le lexique NLP"""
+    transaction.on_commit(lambda: location_lexicon.upsert_district(instance))
+
+
+@receiver(post_delete, sender=City)
+def city_deleted(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: location_lexicon.remove_city(pk))
+
+
+@receiver(post_delete, sender=District)
+def district_deleted(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: location_lexicon.remove_district(pk))
+
+
+@receiver(post_save, sender=NearbyPlace)
+@receiver(post_delete, sender=NearbyPlace)
+def nearby_place_changed(sender, instance, **kwargs):
+    """La table de proximité est reconstruite au prochain accès"""
+    city_id = instance.city_id
+    transaction.on_commit(invalidate_proximity_table)
+    transaction.on_commit(lambda: result_cache.bump_generation([city_id]))
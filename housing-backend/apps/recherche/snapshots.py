@@ -0,0 +1,184 @@
+# ============================================
+# 📁 apps/recherche/snapshots.py
+# ============================================
+"""
+Instantanés de recherche : pagination stable des classements instables.
+
+L'algorithme génétique est aléatoire, et les scores NLP dépendent de
+compteurs qui bougent (vues, likes, ancienneté) : reclasser à chaque
+page peut répéter ou sauter des logements, et paie tout le classement à
+chaque fois. La première requête classe donc une seule fois et range la
+liste ordonnée sous un identifiant de recherche (search_id), pour
+SEARCH_SNAPSHOT_TTL secondes ; les pages suivantes la découpent.
+
+Stockage dans le cache Django (SEARCH_SNAPSHOT_ALIAS) :
+  - un en-tête   recherche:snapshot:<id>      {digest, total, size, block, expires}
+  - des blocs    recherche:snapshot:<id>:<n>  SEARCH_SNAPSHOT_BLOCK entrées
+Une page ne lit que l'en-tête et le ou les blocs qui la contiennent :
+O(page), quelle que soit la taille de l'instantané. Une entrée est un
+tuple dont le premier élément est l'id du logement (score, distance…
+ensuite). Au plus SEARCH_SNAPSHOT_MAX_IDS entrées sont gardées ; `total`
+reste le nombre de résultats trouvés.
+
+Un instantané est immuable et lié à l'empreinte des critères : les
+recherches équivalentes le partagent tant que le cache de résultats le
+désigne (shared_snapshot), et l'invalidation de ce cache ne touche pas
+les paginations en cours. Expiré : SnapshotExpired (à relancer).
+"""
+
+import time
+import uuid
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import result_cache
+from .pagination import InvalidCursor, encode_cursor
+
+
+KEY_PREFIX = 'recherche:snapshot'
+
+
+class SnapshotExpired(LookupError):
+    """Instantané inconnu ou expiré : la recherche doit être relancée"""
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class SearchSnapshot:
+    """En-tête d'un instantané (les entrées restent dans le cache)"""
+
+    def __init__(self, snapshot_id: str, digest: str, total: int, size: int, block: int,
+                 expires: float):
+        self.id = snapshot_id
+        self.digest = digest
+        self.total = total
+        self.size = size
+        self.block = block
+        self.expires = expires
+
+    @property
+    def ttl_left(self) -> float:
+        return self.expires - time.time()
+
+    def to_dict(self):
+        return {
+            'digest': self.digest, 'total': self.total, 'size': self.size,
+            'block': self.block, 'expires': self.expires,
+        }
+
+
+class SnapshotStore:
+    """Instantanés de recherche rangés par blocs dans le cache Django"""
+
+    @staticmethod
+    def _cache():
+        return caches[_setting('SEARCH_SNAPSHOT_ALIAS', 'default')]
+
+    @staticmethod
+    def _header_key(snapshot_id: str) -> str:
+        return f'{KEY_PREFIX}:{snapshot_id}'
+
+    @staticmethod
+    def _block_key(snapshot_id: str, n: int) -> str:
+        return f'{KEY_PREFIX}:{snapshot_id}:{n}'
+
+    def create(self, entries: Sequence[Tuple], digest: str, total: Optional[int] = None) -> SearchSnapshot:
+        """
+        Range une liste classée d'entrées (id, ...) et retourne son en-tête
+
+        Args:
+            entries: entrées dans l'ordre du classement
+            digest: empreinte des critères (result_cache.criteria_digest)
+            total: nombre de résultats trouvés, si plus grand que la liste
+        """
+        ttl = _setting('SEARCH_SNAPSHOT_TTL', 900)
+        block = max(1, _setting('SEARCH_SNAPSHOT_BLOCK', 200))
+        entries = [tuple(entry) for entry in entries[:_setting('SEARCH_SNAPSHOT_MAX_IDS', 1000)]]
+
+        snapshot = SearchSnapshot(
+            snapshot_id=uuid.uuid4().hex,
+            digest=digest,
+            total=len(entries) if total is None else max(total, len(entries)),
+            size=len(entries),
+            block=block,
+            expires=time.time() + ttl,
+        )
+        values = {
+            self._block_key(snapshot.id, n): entries[start:start + block]
+            for n, start in enumerate(range(0, len(entries), block))
+        }
+        values[self._header_key(snapshot.id)] = snapshot.to_dict()
+        self._cache().set_many(values, ttl)
+        return snapshot
+
+    def get(self, snapshot_id: str, digest: Optional[str] = None) -> SearchSnapshot:
+        """
+        Raises:
+            SnapshotExpired: instantané inconnu ou expiré
+            InvalidCursor: instantané d'une autre recherche
+        """
+        header = self._cache().get(self._header_key(str(snapshot_id))) if snapshot_id else None
+        if header is None:
+            raise SnapshotExpired('Recherche expirée, relancez-la')
+        if digest is not None and header['digest'] != digest:
+            raise InvalidCursor('search_id émis pour une autre recherche')
+        return SearchSnapshot(snapshot_id, **header)
+
+    def slice(self, snapshot: SearchSnapshot, offset: int, size: int) -> List[Tuple]:
+        """Entrées [offset, offset + size[ : seuls les blocs concernés sont lus"""
+        offset = max(0, offset)
+        end = min(snapshot.size, offset + size)
+        if offset >= end:
+            return []
+        first, last = offset // snapshot.block, (end - 1) // snapshot.block
+        keys = [self._block_key(snapshot.id, n) for n in range(first, last + 1)]
+        found = self._cache().get_many(keys)
+        if len(found) != len(keys):
+            raise SnapshotExpired('Recherche expirée, relancez-la')
+        entries = [entry for key in keys for entry in found[key]]
+        start = offset - first * snapshot.block
+        return entries[start:start + (end - offset)]
+
+
+snapshot_store = SnapshotStore()
+
+
+def shared_snapshot(namespace: str, params, digest: str, city_id: Optional[int],
+                    build: Callable[[], Tuple[Sequence[Tuple], int]]) -> SearchSnapshot:
+    """
+    Instantané d'une recherche, partagé entre recherches équivalentes.
+
+    Le cache de résultats (invalidé par génération) désigne l'instantané
+    courant ; il est réutilisé s'il lui reste au moins la moitié de sa
+    durée de vie, sinon `build()` → (entrées classées, total) est appelé
+    et un nouvel instantané créé.
+    """
+    cached = result_cache.CachedSearch(namespace, params, city_id)
+    payload = cached.get()
+    if payload is not None:
+        try:
+            snapshot = snapshot_store.get(payload['snapshot'], digest)
+            if snapshot.ttl_left >= _setting('SEARCH_SNAPSHOT_TTL', 900) / 2:
+                return snapshot
+        except (SnapshotExpired, InvalidCursor):
+            pass
+
+    entries, total = build()
+    snapshot = snapshot_store.create(entries, digest, total)
+    cached.set({'snapshot': snapshot.id})
+    return snapshot
+
+
+def snapshot_page(snapshot: SearchSnapshot, offset: int, size: int,
+                  page: int) -> Tuple[List[Tuple], Optional[str]]:
+    """Entrées d'une page et curseur de la suivante (None si dernière)"""
+    entries = snapshot_store.slice(snapshot, offset, size)
+    end = offset + len(entries)
+    cursor = None
+    if entries and end < snapshot.size:
+        cursor = encode_cursor((end,), snapshot.digest, page + 1, snapshot=snapshot.id)
+    return entries, cursor
@@ -0,0 +1,262 @@
+# ============================================
+# 📁 apps/recherche/spatial_index.py
+# ============================================
+"""
+Index spatial en mémoire (grille régulière lat/lng) des logements visibles.
+
+Chaque logement géolocalisé est rangé dans une cellule de
+SEARCH_SPATIAL_CELL_DEG degrés de côté (≈ 1,1 km par défaut). Deux
+requêtes sont servies sans toucher la base :
+
+  - within_radius() : logements à moins de R km, triés par distance
+  - nearest()       : k plus proches voisins (recherche par anneaux de
+                      cellules autour du point, arrêtée dès que la k-ième
+                      distance est inférieure à la distance minimale des
+                      cellules non encore visitées)
+
+Les résultats sont des paires (distance, id) triées par distance puis par
+id : l'ordre est stable d'une page à l'autre. La base n'est interrogée
+que pour hydrater la page affichée.
+
+L'index est chargé paresseusement en une requête, tenu à jour par les
+signaux de Housing (voir signals.py) et rechargé après
+SEARCH_SPATIAL_INDEX_TTL secondes.
+"""
+
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from apps.housing.models import Housing
+from .geo import KM_PER_DEGREE, distances_from
+
+
+Cell = Tuple[int, int]
+
+
+class SpatialIndex:
+    """Grille lat/lng : cellule → {id: (lat, lng)}"""
+
+    def __init__(self, cell_deg: Optional[float] = None, ttl: Optional[float] = None):
+        self._cell_deg = cell_deg
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._cells: Dict[Cell, Dict[int, Tuple[float, float]]] = {}
+        self._cell_of: Dict[int, Cell] = {}
+        self._loaded_at: Optional[float] = None
+
+    # ------------------------------------------------------------------
+    # Paramètres
+    # ------------------------------------------------------------------
+
+    @property
+    def cell_deg(self) -> float:
+        if self._cell_deg is not None:
+            return self._cell_deg
+        return getattr(settings, 'SEARCH_SPATIAL_CELL_DEG', 0.01)
+
+    def _get_ttl(self) -> float:
+        if self.ttl is not None:
+            return self.ttl
+        return getattr(settings, 'SEARCH_SPATIAL_INDEX_TTL', 300)
+
+    def _cell(self, lat: float, lng: float) -> Cell:
+        size = self.cell_deg
+        return int(math.floor(lat / size)), int(math.floor(lng / size))
+
+    # ------------------------------------------------------------------
+    # Chargement et mises à jour
+    # ------------------------------------------------------------------
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def load(self, rows=None):
+        """
+        (Re)construit la grille.
+
+        Args:
+            rows: itérable de tuples (id, latitude, longitude)
+                  (par défaut : logements visibles géolocalisés, une requête)
+        """
+        if rows is None:
+            rows = Housing.objects.filter(
+                is_visible=True, latitude__isnull=False, longitude__isnull=False,
+            ).order_by().values_list('id', 'latitude', 'longitude')
+
+        cells, cell_of = {}, {}
+        for pk, lat, lng in rows:
+            cell = self._cell(lat, lng)
+            cells.setdefault(cell, {})[pk] = (lat, lng)
+            cell_of[pk] = cell
+
+        with self._lock:
+            self._cells = cells
+            self._cell_of = cell_of
+            self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self._get_ttl():
+            self.load()
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def _discard(self, housing_id: int):
+        cell = self._cell_of.pop(housing_id, None)
+        if cell is not None:
+            bucket = self._cells.get(cell)
+            if bucket is not None:
+                bucket.pop(housing_id, None)
+                if not bucket:
+                    del self._cells[cell]
+
+    def upsert(self, housing: Housing):
+        """Place, déplace ou retire un logement selon sa visibilité et ses GPS"""
+        with self._lock:
+            if not self.is_loaded:
+                return
+            self._discard(housing.pk)
+            if housing.is_visible and housing.latitude is not None and housing.longitude is not None:
+                cell = self._cell(housing.latitude, housing.longitude)
+                self._cells.setdefault(cell, {})[housing.pk] = (housing.latitude, housing.longitude)
+                self._cell_of[housing.pk] = cell
+
+    def remove(self, housing_id: int):
+        with self._lock:
+            self._discard(housing_id)
+
+    def __len__(self):
+        return len(self._cell_of)
+
+    # ------------------------------------------------------------------
+    # Requêtes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _ranked(lat: float, lng: float, points: List[Tuple[int, Tuple[float, float]]]):
+        """Distances vers les points, triées par (distance, id)"""
+        if not points:
+            return np.empty(0), np.empty(0, dtype=np.int64)
+        ids = np.fromiter((pk for pk, _ in points), dtype=np.int64, count=len(points))
+        lats = [coords[0] for _, coords in points]
+        lngs = [coords[1] for _, coords in points]
+        distances = np.asarray(distances_from(lat, lng, lats, lngs))
+        order = np.lexsort((ids, distances))
+        return distances[order], ids[order]
+
+    def _points_in_cells(self, cells) -> List[Tuple[int, Tuple[float, float]]]:
+        points = []
+        for cell in cells:
+            bucket = self._cells.get(cell)
+            if bucket:
+                points.extend(bucket.items())
+        return points
+
+    def _all_points(self) -> List[Tuple[int, Tuple[float, float]]]:
+        return self._points_in_cells(self._cells.keys())
+
+    def within_radius(self, lat: float, lng: float, radius_km: float) -> List[Tuple[float, int]]:
+        """Logements à moins de radius_km, triés par (distance, id)"""
+        with self._lock:
+            self.ensure_loaded()
+            lat_span = radius_km / KM_PER_DEGREE
+            cos_lat = math.cos(math.radians(min(89.0, abs(lat) + lat_span)))
+            lng_span = 180.0 if cos_lat < 1e-6 else radius_km / (KM_PER_DEGREE * cos_lat)
+            min_cell = self._cell(lat - lat_span, lng - lng_span)
+            max_cell = self._cell(lat + lat_span, lng + lng_span)
+
+            box_cells = (max_cell[0] - min_cell[0] + 1) * (max_cell[1] - min_cell[1] + 1)
+            if box_cells > len(self._cells):
+                # Grand rayon : parcourir les cellules occupées est moins cher
+                cells = [
+                    cell for cell in self._cells
+                    if min_cell[0] <= cell[0] <= max_cell[0] and min_cell[1] <= cell[1] <= max_cell[1]
+                ]
+            else:
+                cells = [
+                    (i, j)
+                    for i in range(min_cell[0], max_cell[0] + 1)
+                    for j in range(min_cell[1], max_cell[1] + 1)
+                ]
+            distances, ids = self._ranked(lat, lng, self._points_in_cells(cells))
+
+        keep = distances <= radius_km
+        return list(zip(distances[keep].tolist(), ids[keep].tolist()))
+
+    def _ring(self, center: Cell, r: int):
+        ci, cj = center
+        if r == 0:
+            yield center
+            return
+        for j in range(cj - r, cj + r + 1):
+            yield ci - r, j
+            yield ci + r, j
+        for i in range(ci - r + 1, ci + r):
+            yield i, cj - r
+            yield i, cj + r
+
+    def nearest(self, lat: float, lng: float, k: int,
+                max_radius_km: Optional[float] = None) -> List[Tuple[float, int]]:
+        """
+        k plus proches logements, triés par (distance, id).
+
+        Args:
+            max_radius_km: limite optionnelle de distance
+        """
+        if k <= 0:
+            return []
+        with self._lock:
+            self.ensure_loaded()
+            if not self._cells:
+                return []
+
+            center = self._cell(lat, lng)
+            rows = [cell[0] for cell in self._cells]
+            cols = [cell[1] for cell in self._cells]
+            max_ring = max(
+                abs(center[0] - min(rows)), abs(center[0] - max(rows)),
+                abs(center[1] - min(cols)), abs(center[1] - max(cols)),
+            )
+
+            points, r = [], 0
+            while True:
+                if (2 * r + 1) ** 2 > len(self._cells):
+                    # Anneaux plus coûteux qu'un balayage complet
+                    points = self._all_points()
+                    break
+                points.extend(self._points_in_cells(self._ring(center, r)))
+                if r >= max_ring:
+                    break
+                # Distance minimale de tout point hors des anneaux 0..r
+                reach_lat = abs(lat) + (r + 1) * self.cell_deg
+                bound_km = r * self.cell_deg * KM_PER_DEGREE * math.cos(math.radians(min(89.0, reach_lat)))
+                if max_radius_km is not None and bound_km >= max_radius_km:
+                    break
+                if len(points) >= k:
+                    kth = np.partition(
+                        np.asarray(distances_from(lat, lng,
+                                                  [c[0] for _, c in points],
+                                                  [c[1] for _, c in points])),
+                        k - 1,
+                    )[k - 1]
+                    if kth <= bound_km:
+                        break
+                r += 1
+
+            distances, ids = self._ranked(lat, lng, points)
+
+        if max_radius_km is not None:
+            keep = distances <= max_radius_km
+            distances, ids = distances[keep], ids[keep]
+        return list(zip(distances[:k].tolist(), ids[:k].tolist()))
+
+
+# Instance partagée par le processus
+spatial_index = SpatialIndex()
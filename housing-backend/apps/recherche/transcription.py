@@ -0,0 +1,269 @@
+# ============================================
+# 📁 apps/recherche/transcription.py
+# ============================================
+"""
+Service de transcription Whisper hors des workers HTTP.
+
+Les transcriptions tournent dans un petit pool de processus
+(WHISPER_WORKERS, lancés en mode « spawn ») :
+
+  - chaque processus charge WHISPER_MODEL à son démarrage et garde ses
+    modèles en mémoire (whisper_worker.py) : une requête ne paie que
+    l'inférence, plus le chargement de plusieurs secondes
+  - le calcul est borné à WHISPER_THREADS threads par processus, avec
+    une priorité abaissée (WHISPER_NICE) : les workers HTTP gardent le CPU
+  - au-delà de WHISPER_MAX_PENDING tâches en attente, les nouvelles sont
+    refusées (TranscriptionBusy) au lieu de s'empiler
+
+API par tâches : submit() rend un identifiant, wait() attend le résultat
+au plus `timeout` secondes (WHISPER_TIMEOUT par défaut). Une tâche pas
+encore commencée est annulée par transcribe() à l'expiration ; une tâche
+en cours se termine dans son processus et reste consultable.
+
+Le pool est créé au premier usage, ou au démarrage si WHISPER_PRELOAD.
+Les tâches sont propres au processus web qui les a reçues.
+"""
+
+import atexit
+import importlib.util
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+from django.conf import settings
+
+from . import whisper_worker
+
+
+class TranscriptionError(Exception):
+    """La transcription a échoué"""
+
+
+class TranscriptionUnavailable(TranscriptionError):
+    """Whisper n'est pas installé ou le pool est hors service"""
+
+
+class TranscriptionBusy(TranscriptionError):
+    """Trop de transcriptions en attente"""
+
+
+class TranscriptionTimeout(TranscriptionError):
+    """Résultat non disponible dans le délai"""
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class TranscriptionJob:
+    """Tâche de transcription soumise au pool"""
+
+    def __init__(self, job_id: str, future, language: str, model_size: str):
+        self.id = job_id
+        self.future = future
+        self.language = language
+        self.model_size = model_size
+        self.submitted_at = time.time()
+
+    @property
+    def status(self) -> str:
+        if self.future.cancelled():
+            return 'cancelled'
+        if not self.future.done():
+            return 'running' if self.future.running() else 'pending'
+        return 'failed' if self.future.exception() is not None else 'done'
+
+    def to_dict(self) -> Dict:
+        data = {
+            'job_id': self.id,
+            'status': self.status,
+            'language': self.language,
+            'model': self.model_size,
+            'age_seconds': round(time.time() - self.submitted_at, 1),
+        }
+        if data['status'] == 'done':
+            data['result'] = self.future.result()
+        elif data['status'] == 'failed':
+            data['error'] = str(self.future.exception())
+        return data
+
+
+class TranscriptionService:
+    """Pool de processus Whisper préchargés et suivi des tâches"""
+
+    # Tâches terminées gardées pour consultation
+    JOB_HISTORY = 200
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._jobs: 'OrderedDict[str, TranscriptionJob]' = OrderedDict()
+
+    # ------------------------------------------------------------------
+    # Paramètres
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def model_size() -> str:
+        return _setting('WHISPER_MODEL', 'base')
+
+    @staticmethod
+    def workers() -> int:
+        return _setting('WHISPER_WORKERS', 1)
+
+    @staticmethod
+    def timeout() -> float:
+        return _setting('WHISPER_TIMEOUT', 60.0)
+
+    @staticmethod
+    def max_pending() -> int:
+        return _setting('WHISPER_MAX_PENDING', 8)
+
+    @staticmethod
+    def available() -> bool:
+        return importlib.util.find_spec('whisper') is not None
+
+    # ------------------------------------------------------------------
+    # Pool
+    # ------------------------------------------------------------------
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers(),
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=whisper_worker.init_worker,
+                        initargs=(
+                            self.model_size(),
+                            _setting('WHISPER_THREADS', 2),
+                            _setting('WHISPER_NICE', 5),
+                        ),
+                    )
+        return self._pool
+
+    def warm(self, timeout: Optional[float] = None) -> int:
+        """Démarre le pool (modèle chargé) ; retourne le nombre de processus ayant répondu"""
+        futures = [self.pool.submit(whisper_worker.ping) for _ in range(self.workers())]
+        pids = {future.result(timeout=timeout or self.timeout()) for future in futures}
+        return len(pids)
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    # Tâches
+    # ------------------------------------------------------------------
+
+    def submit(self, audio, language: str = 'fr', model_size: Optional[str] = None,
+               cleanup: bool = False) -> str:
+        """
+        Soumet une transcription ; retourne l'identifiant de la tâche.
+
+        Args:
+            audio: chemin du fichier, ou échantillons float32 mono 16 kHz
+                (audio_pipeline.whisper_input)
+            cleanup: supprimer le fichier audio une fois la tâche terminée
+
+        Raises:
+            TranscriptionUnavailable: Whisper absent ou pool hors service
+            TranscriptionBusy: WHISPER_MAX_PENDING tâches déjà en attente
+        """
+        if not self.available():
+            raise TranscriptionUnavailable("Whisper n'est pas installé (pip install openai-whisper)")
+        if self.pending() >= self.max_pending():
+            raise TranscriptionBusy(f'{self.max_pending()} transcriptions déjà en attente')
+
+        model_size = model_size or self.model_size()
+        try:
+            future = self.pool.submit(whisper_worker.transcribe, audio, language, model_size)
+        except BrokenProcessPool as e:
+            # Processus tué (mémoire…) : un nouveau pool au prochain appel
+            self.shutdown()
+            raise TranscriptionUnavailable(f'Pool de transcription hors service : {e}') from e
+
+        if cleanup:
+            future.add_done_callback(lambda _: _remove_quietly(audio))
+
+        job = TranscriptionJob(uuid.uuid4().hex, future, language, model_size)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.JOB_HISTORY:
+                self._jobs.popitem(last=False)
+        return job.id
+
+    def job(self, job_id: str) -> Optional[TranscriptionJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Dict:
+        """
+        Résultat d'une tâche, attendu au plus `timeout` secondes.
+
+        Raises:
+            KeyError: tâche inconnue
+            TranscriptionTimeout: pas de résultat dans le délai
+            TranscriptionError: la transcription a échoué
+        """
+        job = self.job(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        try:
+            return job.future.result(timeout=self.timeout() if timeout is None else timeout)
+        except FutureTimeout as e:
+            raise TranscriptionTimeout(f'Transcription {job_id} non terminée') from e
+        except BrokenProcessPool as e:
+            self.shutdown()
+            raise TranscriptionUnavailable(f'Pool de transcription hors service : {e}') from e
+        except ImportError as e:
+            raise TranscriptionUnavailable(str(e)) from e
+        except Exception as e:
+            if isinstance(e, TranscriptionError):
+                raise
+            raise TranscriptionError(str(e)) from e
+
+    def transcribe(self, audio, language: str = 'fr', timeout: Optional[float] = None,
+                   model_size: Optional[str] = None) -> Dict:
+        """Soumet puis attend ; une tâche pas encore commencée est annulée à l'expiration"""
+        job_id = self.submit(audio, language, model_size)
+        try:
+            return self.wait(job_id, timeout)
+        except TranscriptionTimeout:
+            self.job(job_id).future.cancel()
+            raise
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if not job.future.done())
+
+    def stats(self) -> Dict:
+        return {
+            'available': self.available(),
+            'model': self.model_size(),
+            'workers': self.workers(),
+            'started': self._pool is not None,
+            'pending': self.pending(),
+        }
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# Instance partagée par le processus
+transcription_service = TranscriptionService()
+atexit.register(transcription_service.shutdown)
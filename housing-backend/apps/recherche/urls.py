@@ -10,13 +10,23 @@ from .views import (
     # SmartSearchAPIView,
     # MapHousingAPIView,
     NLPSearchAPIView,          # ← NOUVEAU
+    SearchCacheStatsAPIView,
+    LLMStatsAPIView,
 )
 from .chatbot_views import (
     ChatbotQueryAPIView,
+    ChatbotStreamAPIView,
+    ChatbotTranscriptAPIView,
     ChatbotSuggestionsAPIView,
     ChatbotCitiesAPIView,
     ChatbotCategoriesAPIView,
 )
+from .voice_views import VoiceTranscribeAPIView, VoiceJobAPIView
+from .async_views import (
+    AsyncNLPSearchView,
+    AsyncChatbotQueryView,
+    AsyncChatbotConversationView,
+)
 
 urlpatterns = [
     # 🔍 Recherche classique avec filtres
@@ -33,9 +43,24 @@ urlpatterns = [
 
     # 🔤 Recherche en langage naturel (NLP) — NOUVEAU — remplace le chatbot côté frontend
     path('nlp/',       NLPSearchAPIView.as_view(),      name='housing-nlp-search'),
+    path('nlp/async/', AsyncNLPSearchView.as_view(),    name='housing-nlp-search-async'),
+
+    # 📊 Compteurs du cache de résultats (administrateurs)
+    path('cache/stats/', SearchCacheStatsAPIView.as_view(), name='search-cache-stats'),
+
+    # 🤖 Latences et disjoncteurs du client LLM (administrateurs)
+    path('llm/stats/',   LLMStatsAPIView.as_view(),         name='llm-stats'),
+
+    # 🎤 Transcription vocale (Whisper, pool de processus)
+    path('voice/transcribe/',          VoiceTranscribeAPIView.as_view(), name='voice-transcribe'),
+    path('voice/jobs/<str:job_id>/',   VoiceJobAPIView.as_view(),        name='voice-job'),
 
     # 🤖 CHATBOT IA (conservé pour compatibilité)
     path('chatbot/',              ChatbotQueryAPIView.as_view(),        name='chatbot-query'),
+    path('chatbot/async/',        AsyncChatbotQueryView.as_view(),      name='chatbot-query-async'),
+    path('chatbot/conversation/', AsyncChatbotConversationView.as_view(), name='chatbot-conversation'),
+    path('chatbot/conversation/<str:session_id>/', ChatbotTranscriptAPIView.as_view(), name='chatbot-transcript'),
+    path('chatbot/stream/',       ChatbotStreamAPIView.as_view(),       name='chatbot-stream'),
     path('chatbot/suggestions/',  ChatbotSuggestionsAPIView.as_view(),  name='chatbot-suggestions'),
     path('chatbot/cities/',       ChatbotCitiesAPIView.as_view(),       name='chatbot-cities'),
     path('chatbot/categories/',   ChatbotCategoriesAPIView.as_view(),   name='chatbot-categories'),
@@ -5,36 +5,7 @@
 Utilitaires pour le module de recherche
 """
 
-import math
-
-
-def haversine(lat1, lon1, lat2, lon2):
-    """
-    Calcule la distance entre deux points GPS en kilomètres
-    Formule de Haversine
-    
-    Args:
-        lat1, lon1: Coordonnées du point 1
-        lat2, lon2: Coordonnées du point 2
-    
-    Returns:
-        float: Distance en kilomètres
-    """
-    R = 6371  # Rayon de la Terre en km
-    
-    phi1 = math.radians(lat1)
-    phi2 = math.radians(lat2)
-    delta_phi = math.radians(lat2 - lat1)
-    delta_lambda = math.radians(lon2 - lon1)
-
-    a = (
-        math.sin(delta_phi / 2) ** 2
-        + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2) ** 2
-    )
-    
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    
-    return R * c
+from .geo import haversine  # noqa: F401  (implémentation partagée dans geo.py)
 
 
 def validate_coordinates(lat, lng):
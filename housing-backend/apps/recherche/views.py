@@ -7,20 +7,30 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
+from django.conf import settings
 from django.db.models import Q
 
 from apps.housing.models import Housing
 from apps.housing.serializers import HousingListSerializer
-from .utils import haversine, get_distance_category
-from .scoring import compute_smart_score
+from .utils import get_distance_category
+from .geo import housing_distances
+from .scoring import SCORING_FIELDS, compute_smart_score
 from .ai import (
     extract_search_criteria,
     describe_criteria,
     generate_response,
     suggest_alternatives,
 )
-from .models import NearbyPlace, SearchHistory
+from .criteria_cache import criteria_cache
+from .history import history_recorder
+from .llm_client import llm_metrics, llm_stats
+from .llm_health import ollama_health
+from . import fulltext, result_cache
+from .pagination import InvalidCursor, RankedPage, batches, decode_cursor, top_k
+from .snapshots import SnapshotExpired, shared_snapshot, snapshot_page, snapshot_store
+from .proximity import get_proximity_table
+from .search_engine import SearchEngine
 
 
 class NLPSearchAPIView(APIView):
@@ -33,7 +43,10 @@ class NLPSearchAPIView(APIView):
         "language" : "fr",          // 'fr' | 'en'
         "method"   : "simple",      // 'simple' | 'ollama'
         "user_lat" : 3.848,         // optionnel
-        "user_lng" : 11.502         // optionnel
+        "user_lng" : 11.502,        // optionnel
+        "cursor"   : "...",         // optionnel : next_cursor de la page précédente
+        "search_id": "...",         // optionnel : avec "page", accès direct à une page
+        "page"     : 2              // optionnel
     }
 
     Réponse :
@@ -41,7 +54,12 @@ class NLPSearchAPIView(APIView):
         "query"              : "...",
         "criteria_extracted" : { city, category_name, max_price, ... },
         "criteria_summary"   : "Recherche : Studio meublé à Yaoundé • max 50 000 FCFA",
-        "count"              : 5,
+        "count"              : 5,        // résultats servis sur cette page
+        "unavailable"        : 0,        // logements de la page retirés depuis l'instantané
+        "total_count"        : 5,        // toutes pages
+        "page"               : 1,
+        "search_id"          : "…",      // instantané du classement (SEARCH_SNAPSHOT_TTL)
+        "next_cursor"        : null,     // page suivante, null si dernière
         "results"            : [...],
         "suggestions"        : [...]
     }
@@ -58,82 +76,29 @@ class NLPSearchAPIView(APIView):
         if not user_query:
             return Response({'error': 'query requis'}, status=status.HTTP_400_BAD_REQUEST)
 
+        try:
+            page = max(1, int(request.data.get('page', 1)))
+        except (TypeError, ValueError):
+            return Response({'error': 'page doit être un entier'}, status=status.HTTP_400_BAD_REQUEST)
+
         try:
             # 1. Extraction des critères
             criteria = extract_search_criteria(user_query, method=method, language=language)
             criteria['language'] = language
 
-            # 2. Coordonnées GPS (optionnel)
-            if user_lat and user_lng:
-                try:
-                    criteria['lat'] = float(user_lat)
-                    criteria['lng'] = float(user_lng)
-                except (ValueError, TypeError):
-                    pass
-
-            # 3. Résumé lisible pour l'interface
-            summary = describe_criteria(criteria, language=language)
-
-            # 4. Queryset de base
-            queryset = Housing.objects.filter(
-                is_visible=True, status='disponible'
-            ).select_related(
-                'owner', 'category', 'housing_type', 'region', 'city', 'district'
-            ).prefetch_related('images')
-
-            # 5. Application des filtres (CORRIGÉ)
-            queryset = self._apply_filters(queryset, criteria)
-
-            # 6. Scoring + géolocalisation
-            results = []
-            for h in queryset:
-                distance = None
-                if criteria.get('lat') and criteria.get('lng') and h.latitude and h.longitude:
-                    distance   = haversine(criteria['lat'], criteria['lng'],
-                                           h.latitude, h.longitude)
-                    h.distance = round(distance, 2)
-                    h.distance_category = get_distance_category(distance)
-                h.score = compute_smart_score(h, criteria, distance)
-                results.append(h)
-
-            # 7. Tri
-            sort_intent = criteria.get('sort')
-            if sort_intent == 'price_asc':
-                results.sort(key=lambda x: x.price)
-            elif sort_intent == 'price_desc':
-                results.sort(key=lambda x: -x.price)
-            elif sort_intent == 'recent':
-                results.sort(key=lambda x: -x.created_at.timestamp())
-            else:
-                results.sort(key=lambda x: -x.score)
-
-            results = results[:20]
-
-            # 8. Sérialisation
-            serialized = HousingListSerializer(
-                results, many=True, context={'request': request}
-            ).data
-
-            # 9. Suggestions si peu de résultats
-            suggestions = []
-            if len(results) < 3:
-                suggestions = suggest_alternatives(criteria, language=language)
-
-            # 10. Historique
-            if request.user and request.user.is_authenticated:
-                self._save_history(request.user, user_query, criteria, len(results))
+            # 2-10. Recherche et réponse
+            return Response(self._search_payload(
+                request, user_query, criteria, user_lat, user_lng, user=request.user,
+                cursor=request.data.get('cursor'),
+                search_id=request.data.get('search_id'),
+                page=page
+            ))
 
-            return Response({
-                'query':              user_query,
-                'criteria_extracted': {
-                    k: v for k, v in criteria.items()
-                    if k not in ('language', 'text_query')
-                },
-                'criteria_summary': summary,
-                'count':            len(results),
-                'results':          serialized,
-                'suggestions':      suggestions,
-            })
+        except InvalidCursor as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        except SnapshotExpired as e:
+            return Response({'error': str(e)}, status=status.HTTP_410_GONE)
 
         except Exception as e:
             import traceback
@@ -147,6 +112,144 @@ class NLPSearchAPIView(APIView):
 
     # -----------------------------------------------------------------------
 
+    def _search_payload(self, request, user_query, criteria, user_lat, user_lng, user=None,
+                        cursor=None, search_id=None, page=1) -> dict:
+        """
+        Étapes 2 à 10 : filtres, classement, sérialisation et réponse (synchrone, ORM)
+
+        Raises:
+            InvalidCursor: curseur falsifié ou émis pour d'autres critères
+            SnapshotExpired: search_id ou curseur d'une recherche expirée
+        """
+        language = criteria.get('language', 'fr')
+
+        # 2. Coordonnées GPS (optionnel)
+        if user_lat and user_lng:
+            try:
+                criteria['lat'] = float(user_lat)
+                criteria['lng'] = float(user_lng)
+            except (ValueError, TypeError):
+                pass
+
+        # 3. Résumé lisible pour l'interface
+        summary = describe_criteria(criteria, language=language)
+
+        # 4. Queryset de base et page demandée
+        queryset = Housing.objects.filter(
+            is_visible=True, status='disponible'
+        ).select_related(
+            'owner', 'category', 'housing_type', 'region', 'city', 'district'
+        )
+        digest = result_cache.criteria_digest(criteria)
+        state  = decode_cursor(cursor, digest) if cursor else None
+        page   = state.page if state else page
+
+        # 5-7. Filtres, scoring et tri : une fois par recherche, dans un
+        # instantané (les scores bougent avec les vues et les likes)
+        snapshot_id = state.snapshot if state else search_id
+        if snapshot_id:
+            snapshot = snapshot_store.get(snapshot_id, digest)
+        else:
+            snapshot = shared_snapshot(
+                'nlp_snapshot', criteria, digest, criteria.get('city_id'),
+                lambda: self._snapshot_entries(self._apply_filters(queryset, criteria), criteria)
+            )
+        page_size = getattr(settings, 'SEARCH_RESULTS_PER_PAGE', 20)
+        offset    = state.after[0] if state else (page - 1) * page_size
+        entries, next_cursor = snapshot_page(snapshot, offset, page_size, page)
+
+        # Logements complets de la page seulement
+        # Un logement masqué, loué ou supprimé depuis l'instantané disparaît
+        # de l'hydratation : score et distance sont relus par id, jamais par rang
+        ranked  = {pk: (score, distance) for pk, score, distance in entries}
+        results = result_cache.hydrate(queryset.prefetch_related('images'), list(ranked))
+        for h in results:
+            score, distance = ranked[h.pk]
+            h.score = score
+            if distance is not None:
+                h.distance = distance
+                h.distance_category = get_distance_category(distance)
+
+        # 8. Sérialisation
+        serialized = HousingListSerializer(
+            results, many=True, context={'request': request}
+        ).data
+
+        # 9. Suggestions si peu de résultats
+        suggestions = []
+        if snapshot.total < 3:
+            suggestions = suggest_alternatives(criteria, language=language)
+
+        # 10. Historique (première page seulement)
+        if user is not None and user.is_authenticated and state is None and not search_id:
+            self._save_history(user, user_query, criteria, snapshot.total)
+
+        return {
+            'query':              user_query,
+            'criteria_extracted': {
+                k: v for k, v in criteria.items()
+                if k not in ('language', 'text_query')
+            },
+            'criteria_summary': summary,
+            'count':            len(results),
+            'unavailable':      len(entries) - len(results),
+            'total_count':      snapshot.total,
+            'page':             page,
+            'search_id':        snapshot.id,
+            'next_cursor':      next_cursor,
+            'results':          serialized,
+            'suggestions':      suggestions,
+        }
+
+    def _ranked_results(self, queryset, criteria: dict, k=None) -> RankedPage:
+        """
+        Score, distance et tri des logements filtrés : les `k` premiers
+        (SEARCH_RESULTS_PER_PAGE par défaut)
+
+        Le queryset est parcouru par lots, réduit aux colonnes du scoring
+        (distances vectorisées par lot), et seuls les meilleurs logements
+        sont gardés (tas borné, pagination.py) : les logements retournés
+        sont partiels, à recharger pour la sérialisation.
+        """
+        has_point = criteria.get('lat') and criteria.get('lng')
+        rows = queryset.select_related(None).select_related('city', 'housing_type').only(
+            *SCORING_FIELDS, 'latitude', 'longitude'
+        ).order_by()
+
+        def scored():
+            for batch in batches(rows):
+                distances = [None] * len(batch)
+                if has_point:
+                    distances = housing_distances(criteria['lat'], criteria['lng'], batch)
+                for h, distance in zip(batch, distances):
+                    if distance is not None:
+                        h.distance = round(distance, 2)
+                        h.distance_category = get_distance_category(distance)
+                    h.score = compute_smart_score(h, criteria, distance)
+                    yield h
+
+        k = k or getattr(settings, 'SEARCH_RESULTS_PER_PAGE', 20)
+        return top_k(scored(), self._position(criteria.get('sort')), k)
+
+    def _snapshot_entries(self, queryset, criteria: dict):
+        """Classement à ranger en instantané → ([(id, score, distance)], total)"""
+        ranked = self._ranked_results(
+            queryset, criteria, k=getattr(settings, 'SEARCH_SNAPSHOT_MAX_IDS', 1000)
+        )
+        entries = [(h.id, h.score, getattr(h, 'distance', None)) for h in ranked.items]
+        return entries, ranked.total
+
+    @staticmethod
+    def _position(sort_intent):
+        """Position de tri d'un logement (égalités départagées par l'id)"""
+        if sort_intent == 'price_asc':
+            return lambda h: (float(h.price), h.id)
+        if sort_intent == 'price_desc':
+            return lambda h: (-float(h.price), h.id)
+        if sort_intent == 'recent':
+            return lambda h: (-h.created_at.timestamp(), h.id)
+        return lambda h: (-h.score, h.id)
+
     def _apply_filters(self, queryset, criteria: dict):
         """
         Applique les critères extraits au queryset.
@@ -159,11 +262,15 @@ class NLPSearchAPIView(APIView):
         """
 
         # ── Ville ──────────────────────────────────────────────────────────
-        if criteria.get('city'):
+        if criteria.get('city_id'):
+            queryset = queryset.filter(city_id=criteria['city_id'])
+        elif criteria.get('city'):
             queryset = queryset.filter(city__name__icontains=criteria['city'])
 
         # ── Quartier ───────────────────────────────────────────────────────
-        if criteria.get('district_name'):
+        if criteria.get('district_id'):
+            queryset = queryset.filter(district_id=criteria['district_id'])
+        elif criteria.get('district_name'):
             queryset = queryset.filter(district__name__icontains=criteria['district_name'])
 
         # ── Catégorie ──────────────────────────────────────────────────────
@@ -202,25 +309,15 @@ class NLPSearchAPIView(APIView):
                 q_features |= Q(title__icontains=feat)
             queryset = queryset.filter(q_features)
 
-        # ── Lieux à proximité → NearbyPlace ────────────────────────────────
+        # ── Lieux à proximité → table de proximité précalculée ───────────
         if criteria.get('nearby_places'):
-            housing_ids = []
-            for h in queryset:
-                nearby_qs = NearbyPlace.objects.filter(
-                    city=h.city,
-                    place_type__in=criteria['nearby_places']
+            table = get_proximity_table()
+            # Fallback : si aucun lieu de ces types n'est connu → on ne filtre pas
+            if table.has_any(criteria['nearby_places']):
+                # Quartier exact ou ville entière (OR)
+                queryset = queryset.filter(
+                    table.housing_q(criteria['nearby_places'], include_city_wide=True)
                 )
-                if h.district:
-                    # Quartier exact ou ville entière (OR)
-                    nearby_qs = NearbyPlace.objects.filter(
-                        Q(district=h.district) | Q(city=h.city, district__isnull=True),
-                        place_type__in=criteria['nearby_places']
-                    )
-                if nearby_qs.exists():
-                    housing_ids.append(h.id)
-            # Fallback : si NearbyPlace vide → on ne filtre pas
-            if housing_ids:
-                queryset = queryset.filter(id__in=housing_ids)
 
         # ── Termes résiduels (text_query) ──────────────────────────────────
         # Utilisé SEULEMENT si aucun critère structuré n'a été trouvé
@@ -233,20 +330,14 @@ class NLPSearchAPIView(APIView):
 
         if text_q and not has_structured:
             # Recherche fulltext sur les termes résiduels
-            q_text = Q()
-            for term in text_q.split():
-                q_text |= Q(title__icontains=term)
-                q_text |= Q(description__icontains=term)
-                q_text |= Q(city__name__icontains=term)
-                q_text |= Q(district__name__icontains=term)
-                q_text |= Q(additional_features__icontains=term)
-            queryset = queryset.filter(q_text)
+            queryset = fulltext.filter_queryset(queryset, text_q)
 
         return queryset
 
     def _save_history(self, user, query_text, criteria, results_count):
+        # Écriture différée (voir history.py) : hors du temps de réponse
         try:
-            SearchHistory.objects.create(
+            history_recorder.record(
                 user=user,
                 query_text=query_text,
                 min_price=criteria.get('min_price'),
@@ -264,6 +355,56 @@ class NLPSearchAPIView(APIView):
             print(f"⚠️ Historique non sauvegardé : {e}")
 
 
+
+class SearchCacheStatsAPIView(APIView):
+    """
+    📊 Compteurs des caches de recherche (processus courant).
+
+    GET  /api/recherche/cache/stats/          → hits, misses, hit_rate, par vue
+                                                 + criteria : cache des critères extraits
+    POST /api/recherche/cache/stats/ {"reset": true}
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(self._snapshot())
+
+    def post(self, request):
+        if request.data.get('reset'):
+            result_cache.stats.reset()
+            criteria_cache.stats.reset()
+        return Response(self._snapshot())
+
+    @staticmethod
+    def _snapshot():
+        snapshot = result_cache.stats.snapshot()
+        snapshot['criteria'] = criteria_cache.stats.snapshot()
+        return snapshot
+
+class LLMStatsAPIView(APIView):
+    """
+    🤖 État du client LLM (processus courant).
+
+    GET  /api/recherche/llm/stats/   → disjoncteurs, appels, erreurs, refus, p50/p95,
+                                        état de santé d'Ollama
+    POST /api/recherche/llm/stats/ {"reset": true}
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(self._snapshot())
+
+    def post(self, request):
+        if request.data.get('reset'):
+            llm_metrics.reset()
+        return Response(self._snapshot())
+
+    @staticmethod
+    def _snapshot():
+        snapshot = llm_stats()
+        snapshot['health'] = {'ollama': ollama_health.state()}
+        return snapshot
+
 # class HousingSearchAPIView(APIView):
 #     def get(self, request):
 #         return Response({"message": "Search API works"})
@@ -272,6 +413,23 @@ class NLPSearchAPIView(APIView):
 
 
 class HousingSearchAPIView(APIView):
+    """
+    🔍 Recherche par formulaire, paginée par curseur.
+
+    GET /api/recherche/search/?query=&category=&city=&min_price=…
+        ordering  : 'price' | '-price' | 'area' | '-area' | 'created_at' |
+                    '-created_at' | 'popularity'       (optionnel)
+        page_size : 10 par défaut (SEARCH_MAX_RESULTS au plus)
+        ranking   : 'default' | 'genetic' | 'topk_mmr'           (optionnel)
+        cursor    : next_cursor de la page précédente
+        page      : numéro de page, sans curseur (compatibilité)
+        search_id : instantané d'un classement global, avec `page`
+
+    Les classements globaux sont calculés une fois puis paginés dans un
+    instantané (snapshots.py) : pages stables, 410 une fois expiré.
+
+    Réponse : {count, total_pages, page, page_size, search_id, next_cursor, results}
+    """
     permission_classes = [AllowAny]
 
     def get(self, request):
@@ -290,8 +448,21 @@ class HousingSearchAPIView(APIView):
         min_rooms = request.GET.get("min_rooms")
         max_rooms = request.GET.get("max_rooms")
 
-        page = int(request.GET.get("page", 1))
-        page_size = 10
+        ordering = request.GET.get("ordering")
+        ranking = request.GET.get("ranking", "default")
+        cursor = request.GET.get("cursor")
+        search_id = request.GET.get("search_id")
+
+        if ranking not in ('default', 'genetic', 'topk_mmr'):
+            return Response({'error': 'ranking inconnu'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            page = max(1, int(request.GET.get("page", 1)))
+            page_size = int(request.GET.get("page_size", 10))
+        except ValueError:
+            return Response({'error': 'page et page_size doivent être des entiers'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        page_size = min(max(1, page_size), getattr(settings, 'SEARCH_MAX_RESULTS', 100))
 
         filters = {}
 
@@ -322,23 +493,37 @@ class HousingSearchAPIView(APIView):
         if max_rooms:
             filters["max_rooms"] = max_rooms
 
-        engine = SearchEngine()
+        if ordering:
+            filters["ordering"] = ordering
 
-        results = engine.search(
-            query=query,
-            filters=filters
-        )
+        user = request.user if request.user.is_authenticated else None
+        engine = SearchEngine(user=user)
 
-        paginator = Paginator(results, page_size)
-
-        page_obj = paginator.get_page(page)
+        try:
+            result_page = engine.search_page(
+                query=query,
+                filters=filters,
+                page_size=page_size,
+                cursor=cursor,
+                page=page,
+                ranking_mode=ranking,
+                search_id=search_id
+            )
+        except InvalidCursor as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except SnapshotExpired as e:
+            return Response({'error': str(e)}, status=status.HTTP_410_GONE)
 
-        serializer = HousingSerializer(page_obj.object_list, many=True)
+        serializer = HousingListSerializer(
+            result_page.results, many=True, context={'request': request}
+        )
 
         return Response({
-            "count": paginator.count,
-            "total_pages": paginator.num_pages,
-            "page": page,
+            "count": result_page.total,
+            "total_pages": result_page.total_pages,
+            "page": result_page.page,
+            "page_size": page_size,
+            "search_id": result_page.search_id,
+            "next_cursor": result_page.next_cursor,
             "results": serializer.data
         })
-
@@ -2,15 +2,17 @@
 # 📁 apps/recherche/voice_recognition.py
 # ============================================
 
+from .audio_pipeline import AudioDecodeError, prepare_audio
 
+# Le WAV est décodé par audio_pipeline (module wave) ; pydub n'y sert
+# qu'aux autres formats et n'est donc pas requis ici
 try:
     import speech_recognition as sr
-    from pydub import AudioSegment
     DEPENDENCIES_AVAILABLE = True
 except ImportError:
     DEPENDENCIES_AVAILABLE = False
     print("⚠️ Dépendances de reconnaissance vocale non installées")
-    print("   Installez avec: pip install SpeechRecognition pydub")
+    print("   Installez avec: pip install SpeechRecognition")
 
 
 class VoiceRecognition:
@@ -28,7 +30,7 @@ class VoiceRecognition:
         if not DEPENDENCIES_AVAILABLE:
             raise ImportError(
                 "Les dépendances de reconnaissance vocale ne sont pas installées. "
-                "Installez avec: pip install SpeechRecognition pydub"
+                "Installez avec: pip install SpeechRecognition"
             )
         
         self.language = language
@@ -40,27 +42,30 @@ class VoiceRecognition:
             'en': 'en-US'
         }
     
-    def transcribe(self, audio_file_path):
+    def transcribe(self, audio_file):
         """
-        Transcrit un fichier audio en texte
+        Transcrit un message vocal en texte
+        
+        L'audio est préparé en mémoire (audio_pipeline.py) : décodage,
+        mono 16 kHz, puis seuls les segments parlés sont envoyés au
+        moteur de reconnaissance. Aucun fichier intermédiaire sur disque.
         
         Args:
-            audio_file_path: Chemin vers le fichier audio
+            audio_file: chemin, octets ou fichier ouvert (UploadedFile, BytesIO…)
         
         Returns:
             str: Texte transcrit ou None si échec
         """
         try:
-            # Convertir en WAV si nécessaire
-            if not audio_file_path.endswith('.wav'):
-                audio_file_path = self._convert_to_wav(audio_file_path)
+            prepared = prepare_audio(audio_file)
+            if prepared.is_silent:
+                print("⚠️ Aucune parole détectée")
+                return None
             
-            # Charger le fichier audio
-            with sr.AudioFile(audio_file_path) as source:
-                # Ajuster pour le bruit ambiant
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                
-                # Enregistrer l'audio
+            # Pas d'adjust_for_ambient_noise : sur un fichier, il consommait
+            # les 0,5 premières secondes sans régler record() ; le bruit de
+            # fond est déjà estimé par la détection de parole
+            with sr.AudioFile(prepared.wav()) as source:
                 audio_data = self.recognizer.record(source)
             
             # Reconnaissance avec Google Speech Recognition
@@ -82,45 +87,13 @@ class VoiceRecognition:
                 # Fallback sur Sphinx (reconnaissance offline)
                 return self._recognize_with_sphinx(audio_data)
         
-        except Exception as e:
-            print(f"❌ Erreur lors de la transcription: {e}")
+        except AudioDecodeError as e:
+            print(f"⚠️ Erreur décodage audio: {e}")
             return None
-    
-    def _convert_to_wav(self, audio_file_path):
-        """
-        Convertit un fichier audio en WAV
-        
-        Args:
-            audio_file_path: Chemin vers le fichier audio
-        
-        Returns:
-            str: Chemin vers le fichier WAV
-        """
-        try:
-            # Détecter le format
-            format_map = {
-                '.mp3': 'mp3',
-                '.m4a': 'm4a',
-                '.ogg': 'ogg',
-                '.flac': 'flac'
-            }
-            
-            import os
-            _, ext = os.path.splitext(audio_file_path)
-            audio_format = format_map.get(ext.lower(), 'mp3')
-            
-            # Charger et convertir
-            audio = AudioSegment.from_file(audio_file_path, format=audio_format)
-            
-            # Convertir en WAV
-            wav_path = audio_file_path.rsplit('.', 1)[0] + '.wav'
-            audio.export(wav_path, format='wav')
-            
-            return wav_path
         
         except Exception as e:
-            print(f"⚠️ Erreur conversion audio: {e}")
-            return audio_file_path
+            print(f"❌ Erreur lors de la transcription: {e}")
+            return None
     
     def _recognize_with_sphinx(self, audio_data):
         """
@@ -0,0 +1,110 @@
+# ============================================
+# 📁 apps/recherche/voice_views.py
+# ============================================
+"""
+Vues de transcription vocale (Whisper, voir transcription.py)
+"""
+
+import os
+import tempfile
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .audio_pipeline import AudioDecodeError, whisper_input
+from .transcription import (
+    TranscriptionBusy, TranscriptionError, TranscriptionTimeout,
+    TranscriptionUnavailable, transcription_service,
+)
+
+
+class VoiceTranscribeAPIView(APIView):
+    """
+    🎤 Transcription d'un message vocal
+
+    POST /api/recherche/voice/transcribe/   (multipart)
+        audio    : fichier audio (wav, mp3, m4a, ogg, webm…)
+        language : 'fr' | 'en'          (optionnel)
+        wait     : secondes d'attente    (optionnel, WHISPER_REQUEST_WAIT par défaut)
+
+    200 {job_id, status: 'done', result: {text, …}} si la transcription se
+    termine dans le délai, sinon 202 {job_id, status} à suivre sur
+    GET /api/recherche/voice/jobs/<job_id>/. 422 si l'audio ne contient
+    aucune parole, 502 {job_id, status: 'failed', error} si Whisper échoue.
+
+    ⚠️ Les tâches vivent dans la mémoire du processus qui les a créées
+    (TranscriptionService._jobs) : le suivi après un 202 suppose un seul
+    worker web, ou un routage collant vers le même processus ; sinon le
+    GET répond 404. Avec plusieurs workers, passer `wait` au plus long
+    (WHISPER_REQUEST_WAIT) pour obtenir le résultat dans la requête.
+    """
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        audio = request.FILES.get('audio')
+        if audio is None:
+            return Response({'error': 'Fichier audio requis'}, status=status.HTTP_400_BAD_REQUEST)
+
+        language = request.data.get('language', 'fr')
+        max_wait = getattr(settings, 'WHISPER_REQUEST_WAIT', 15.0)
+        try:
+            wait = min(float(request.data.get('wait', max_wait)), max_wait)
+        except (TypeError, ValueError):
+            wait = max_wait
+
+        # Segments parlés décodés en mémoire ; copie temporaire seulement
+        # si le format n'est pas décodable ici (Whisper le lit avec ffmpeg)
+        cleanup = False
+        try:
+            audio_input = whisper_input(audio)
+        except AudioDecodeError:
+            _, ext = os.path.splitext(audio.name or '')
+            with tempfile.NamedTemporaryFile(suffix=ext or '.wav', delete=False) as tmp:
+                for chunk in audio.chunks():
+                    tmp.write(chunk)
+            audio_input, cleanup = tmp.name, True
+        if audio_input is None:
+            return Response({'error': 'Aucune parole détectée'}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        try:
+            job_id = transcription_service.submit(audio_input, language=language, cleanup=cleanup)
+        except TranscriptionBusy as e:
+            if cleanup:
+                os.remove(audio_input)
+            return Response({'error': str(e)}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        except TranscriptionUnavailable as e:
+            if cleanup:
+                os.remove(audio_input)
+            return Response({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        try:
+            transcription_service.wait(job_id, timeout=wait)
+        except TranscriptionTimeout:
+            return Response(transcription_service.job(job_id).to_dict(), status=status.HTTP_202_ACCEPTED)
+        except TranscriptionError as e:
+            print(f"❌ Erreur transcription: {e}")
+            return Response(
+                dict(transcription_service.job(job_id).to_dict(), error=str(e)),
+                status=status.HTTP_502_BAD_GATEWAY
+            )
+        return Response(transcription_service.job(job_id).to_dict())
+
+
+class VoiceJobAPIView(APIView):
+    """
+    🎤 État d'une transcription
+
+    GET /api/recherche/voice/jobs/<job_id>/
+
+    404 si la tâche est inconnue de ce processus (voir VoiceTranscribeAPIView).
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, job_id):
+        job = transcription_service.job(job_id)
+        if job is None:
+            return Response({'error': 'Tâche inconnue'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job.to_dict())
@@ -0,0 +1,69 @@
+# ============================================
+# 📁 apps/recherche/whisper_worker.py
+# ============================================
+"""
+Code exécuté dans les processus de transcription (voir transcription.py).
+
+Aucun import Django : les processus sont lancés en mode « spawn » et
+n'ont besoin que de Whisper. Chaque processus garde ses modèles chargés
+(un par taille) pour toute sa durée de vie : une transcription ne paie
+que l'inférence.
+"""
+
+import os
+import time
+
+# taille ('tiny', 'base', …) → modèle Whisper chargé dans ce processus
+_models = {}
+
+
+def init_worker(model_size: str, threads: int, nice: int):
+    """Initialisation du processus : priorité, threads de calcul, modèle par défaut"""
+    if nice:
+        try:
+            os.nice(nice)
+        except (AttributeError, OSError):
+            pass
+    try:
+        import torch
+        torch.set_num_threads(max(1, threads))
+    except ImportError:
+        pass
+    try:
+        get_model(model_size)
+    except ImportError:
+        # Whisper absent : chaque tâche lèvera ImportError, signalée à l'appelant
+        pass
+
+
+def get_model(model_size: str):
+    model = _models.get(model_size)
+    if model is None:
+        import whisper
+        model = _models[model_size] = whisper.load_model(model_size)
+    return model
+
+
+def ping() -> int:
+    """Tâche vide : force le démarrage (et le préchargement) d'un processus"""
+    return os.getpid()
+
+
+def transcribe(audio, language: str, model_size: str) -> dict:
+    """
+    Transcrit un audio avec le modèle préchargé : chemin de fichier, ou
+    échantillons float32 mono 16 kHz déjà en mémoire.
+
+    Returns:
+        {text, language, model, inference_ms, pid}
+    """
+    model = get_model(model_size)
+    start = time.perf_counter()
+    result = model.transcribe(audio, language=language, fp16=False)
+    return {
+        'text': result.get('text', '').strip(),
+        'language': result.get('language', language),
+        'model': model_size,
+        'inference_ms': round((time.perf_counter() - start) * 1000, 1),
+        'pid': os.getpid(),
+    }
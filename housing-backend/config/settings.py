@@ -284,10 +284,35 @@ FILE_UPLOAD_MAX_MEMORY_SIZE = 52428800
 OLLAMA_API_URL = 'http://localhost:11434'
 OLLAMA_MODEL = 'mistral'  # ou 'llama2', 'phi'
 
+# Client LLM partagé (apps/recherche/llm_client.py)
+LLM_POOL_SIZE = 8                     # connexions persistantes par backend
+LLM_MAX_CONCURRENCY = 4               # appels simultanés par backend
+LLM_QUEUE_TIMEOUT = 0.5               # attente max d'un emplacement (secondes)
+LLM_BUDGETS = {'extract': 8.0, 'chat': 20.0, 'health': 2.0}  # secondes par appel
+LLM_BREAKER_FAILURES = 3              # échecs consécutifs avant ouverture
+LLM_BREAKER_RESET = 30.0              # secondes avant un appel d'essai
+LLM_HEALTH_TTL = 30.0                 # secondes avant une nouvelle sonde d'Ollama (arrière-plan)
+
 # Configuration reconnaissance vocale
 SPEECH_RECOGNITION_ENGINE = 'google'  # ou 'whisper'
 WHISPER_MODEL = 'base'  # 'tiny', 'base', 'small', 'medium', 'large'
 
+# Service de transcription Whisper (apps/recherche/transcription.py)
+WHISPER_PRELOAD = False               # True : pool démarré (modèle chargé) au lancement du serveur
+WHISPER_WORKERS = 1                   # processus de transcription (un modèle chargé chacun)
+WHISPER_THREADS = 2                   # threads de calcul par processus
+WHISPER_NICE = 5                      # priorité abaissée : le CPU reste aux workers HTTP
+WHISPER_TIMEOUT = 60.0                # secondes d'attente max d'une transcription
+WHISPER_REQUEST_WAIT = 15.0           # secondes d'attente dans la requête avant réponse 202 (tâche)
+WHISPER_MAX_PENDING = 8               # transcriptions en attente avant refus
+
+# Préparation audio en mémoire (apps/recherche/audio_pipeline.py)
+VOICE_VAD_FRAME_MS = 30               # durée d'une trame d'analyse
+VOICE_VAD_MARGIN_DB = 10.0            # écart au bruit de fond pour qu'une trame soit parlée
+VOICE_VAD_FLOOR_DB = -55.0            # niveau (dBFS) toujours considéré comme silence
+VOICE_VAD_MIN_SPEECH_MS = 120         # segments plus courts ignorés (clics, souffle)
+VOICE_VAD_PADDING_MS = 200            # contexte gardé autour de chaque segment parlé
+
 # Algorithme génétique
 GENETIC_ALGORITHM_ENABLED = True
 GENETIC_POPULATION_SIZE = 50
@@ -296,6 +321,71 @@ GENETIC_GENERATIONS = 30
 # Recherche
 SEARCH_RESULTS_PER_PAGE = 20
 SEARCH_MAX_RESULTS = 100
+SEARCH_STREAM_CHUNK_SIZE = 2000       # lignes lues par lot pour le classement en flux (pagination.py)
+
+# Instantanés de recherche (apps/recherche/snapshots.py)
+SEARCH_SNAPSHOT_ALIAS = 'default'     # cache qui range les instantanés
+SEARCH_SNAPSHOT_TTL = 900             # secondes de pagination stable par recherche
+SEARCH_SNAPSHOT_MAX_IDS = 1000        # entrées classées gardées par instantané
+SEARCH_SNAPSHOT_BLOCK = 200           # entrées par clé de cache (une page lit 1 ou 2 blocs)
+
+# Index colonnaire en mémoire (apps/recherche/listing_index.py)
+SEARCH_LISTING_INDEX_ENABLED = True
+SEARCH_LISTING_INDEX_TTL = 300        # secondes avant rechargement complet
+SEARCH_LISTING_INDEX_MAX_IDS = 5000   # au-delà, ids passés en un paramètre JSON
+
+# Facettes des listes (apps/recherche/facets.py) : bornes basses des tranches de prix
+SEARCH_FACET_PRICE_BINS = [0, 25000, 50000, 100000, 150000, 250000, 500000, 1000000]
+
+# Table de proximité (ville, quartier) → types de lieux (apps/recherche/proximity.py)
+SEARCH_PROXIMITY_TABLE_TTL = 300      # secondes avant reconstruction (cache par processus)
+
+# Index spatial en mémoire pour /api/housings/nearby/ (apps/recherche/spatial_index.py)
+SEARCH_SPATIAL_CELL_DEG = 0.01        # côté d'une cellule de la grille (≈ 1,1 km)
+SEARCH_SPATIAL_INDEX_TTL = 300        # secondes avant rechargement complet
+
+# Cache des résultats de recherche (apps/recherche/result_cache.py)
+# Alias de CACHES à utiliser : locmem (par processus) ou fichiers / Redis (partagé)
+SEARCH_RESULT_CACHE_ENABLED = True
+SEARCH_RESULT_CACHE_ALIAS = 'default'
+SEARCH_RESULT_CACHE_TTL = 300         # secondes
+
+# Historique de recherche en écriture différée (apps/recherche/history.py)
+SEARCH_HISTORY_SYNC = False           # True : écriture immédiate (tests)
+SEARCH_HISTORY_FLUSH_SIZE = 50        # entrées par lot
+SEARCH_HISTORY_FLUSH_INTERVAL = 5.0   # secondes avant écriture d'un lot partiel
+
+# Fenêtre des conversations du chatbot (apps/recherche/conversation_window.py)
+CHATBOT_HISTORY_TURNS = 5             # tours (question + réponse) gardés comme contexte du LLM
+CHATBOT_WINDOW_TTL = 3600             # secondes d'inactivité avant oubli de la fenêtre
+CHATBOT_WINDOW_CACHE_ALIAS = 'default'
+CHATBOT_MESSAGES_SYNC = False         # True : messages écrits immédiatement (tests)
+CHATBOT_MESSAGES_FLUSH_SIZE = 50      # messages par lot
+CHATBOT_MESSAGES_FLUSH_INTERVAL = 2.0 # secondes avant écriture d'un lot partiel
+
+# Lexiques NLP des villes et quartiers de la base (apps/recherche/location_lexicon.py)
+SEARCH_LOCATION_LEXICON_TTL = 300     # secondes avant rechargement complet
+
+# Cache des critères extraits du langage naturel (apps/recherche/criteria_cache.py)
+SEARCH_CRITERIA_CACHE_ENABLED = True
+SEARCH_CRITERIA_LRU_SIZE = 2048               # entrées en mémoire par processus
+SEARCH_CRITERIA_CACHE_TTL = 7 * 24 * 3600     # secondes
+SEARCH_CRITERIA_PERSIST_METHODS = ('ollama', 'openai')  # méthodes stockées en base
+
+# Profils d'affinité utilisateur en cache (apps/housing/affinity.py)
+AFFINITY_PROFILE_TTL = 3600           # secondes
+
+# Moteur de l'algorithme génétique (apps/recherche/genetic_algorithm.py)
+# 'numpy' : population en matrice NumPy — 'python' : implémentation d'origine
+SEARCH_GENETIC_ENGINE = 'numpy'
+
+# Classement top-k + MMR (apps/recherche/ranking.py)
+SEARCH_RANKING_TOPK = 20              # places diversifiées
+SEARCH_RANKING_MMR_LAMBDA = 0.7       # 1 = pertinence seule, 0 = diversité seule
+
+# Recherche plein texte (apps/recherche/fulltext.py)
+# 'auto' : FTS5 sous SQLite, tsvector sous PostgreSQL — 'none' : ancien LIKE
+SEARCH_FULLTEXT_BACKEND = 'auto'
 
 # # configuration OSGeo4W
 # import os